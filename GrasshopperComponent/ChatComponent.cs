@@ -49,6 +49,21 @@ namespace GH.Copilot
         //private static PopupChatForm _chatForm = null;
         private string _lastResponse = "";
 
+        private const string ComponentsFile = @"C: \Users\VWarule\Documents\GitHub\GH.Copilot\GrasshopperComponent\PythonScripts\grasshopper_components.json";
+
+        // Environment variable holding the Anthropic API key, so no key is compiled in
+        private const string ApiKeyVariable = "ANTHROPIC_API_KEY";
+
+        // Milliseconds between solves that poll a running finder job
+        private const int JobPollInterval = 250;
+
+        // Finder job of the query being answered (see finder_jobs.py) and its prompt
+        private dynamic _job = null;
+        private string _jobPrompt = null;
+
+        // The finder module, imported once: solves poll a running job several times a second
+        private static dynamic _finder = null;
+
         public ChatComponent() : base(
             "Chat",
             "Chat",
@@ -58,13 +73,20 @@ namespace GH.Copilot
         {
             try
             {
-                string pythonDllPath = @"C:\Program Files\Python313\python313.dll";
+                if (!PythonEngine.IsInitialized)
+                {
+                    string pythonDllPath = @"C:\Program Files\Python313\python313.dll";
 
-                // Set the Python DLL path before initializing the runtime
-                Runtime.PythonDLL = pythonDllPath;
+                    // Set the Python DLL path before initializing the runtime
+                    Runtime.PythonDLL = pythonDllPath;
 
-                // Initialize the Python runtime
-                PythonEngine.Initialize();
+                    // Initialize the Python runtime
+                    PythonEngine.Initialize();
+
+                    // Release the GIL between calls so the finder's background
+                    // warm-up can run while Grasshopper is idle
+                    PythonEngine.BeginAllowThreads();
+                }
             }
             catch (Exception ex)
             {
@@ -82,6 +104,56 @@ namespace GH.Copilot
             pManager.AddTextParameter("Response", "R", "The response from the chat interface.", GH_ParamAccess.item);
         }
 
+        public override void AddedToDocument(GH_Document document)
+        {
+            base.AddedToDocument(document);
+
+            // Load the catalog and build the finder's indexes in the background
+            // when the component is placed, so the first prompt does not pay for them
+            try
+            {
+                using (PyNet.GIL())
+                {
+                    ImportFinder().warm_up(ComponentsFile);
+                }
+            }
+            catch (Exception)
+            {
+                // The warm-up is optional, the first solve does the same work
+            }
+        }
+
+        private static dynamic ImportFinder()
+        {
+            if (_finder != null)
+            {
+                return _finder;
+            }
+
+            dynamic sys = PyNet.Import("sys");
+            // Resolve %AppData% to its full path
+            string appDataPath = Environment.GetFolderPath(Environment.SpecialFolder.ApplicationData);
+
+            // Construct the full path to the TT folder
+            string ttPath = System.IO.Path.Combine(appDataPath, @"Grasshopper\Libraries\PythonScripts");
+
+            // Append the resolved path to Python's sys.path, once
+            if (!((PyObject)sys.path).Contains(new PyString(ttPath)))
+            {
+                sys.path.append(ttPath);
+            }
+
+            _finder = PyNet.Import("grasshopper_component_finder");
+            return _finder;
+        }
+
+        private static string GetApiKey()
+        {
+            // The process environment first, then the variable saved for the user account
+            return Environment.GetEnvironmentVariable(ApiKeyVariable)
+                ?? Environment.GetEnvironmentVariable(ApiKeyVariable, EnvironmentVariableTarget.User);
+        }
+
         //public override void AddedToDocument(GH_Document document)
         //{
         //    base.AddedToDocument(document);
@@ -177,21 +249,19 @@ namespace GH.Copilot
             string query = "";
             if (!DA.GetData(2, ref query)) { return; }
 
+            // Grasshopper solves again with an unchanged query on many canvas
+            // events; reuse the last answer instead of asking the LLM again
+            if (query == previousPrompt && !allowDupPrompt && !string.IsNullOrEmpty(_lastResponse))
+            {
+                DA.SetData(0, _lastResponse);
+                return;
+            }
+
             try
             {
                 using (PyNet.GIL()) // Acquire the Global Interpreter Lock
                 {
-                    dynamic sys = PyNet.Import("sys");
-                    // Resolve %AppData% to its full path
-                    string appDataPath = Environment.GetFolderPath(Environment.SpecialFolder.ApplicationData);
-
-                    // Construct the full path to the TT folder
-                    string ttPath = System.IO.Path.Combine(appDataPath, @"Grasshopper\Libraries\PythonScripts");
-
-                    // Append the resolved path to Python's sys.path
-                    sys.path.append(ttPath);
-
-                    dynamic _ghScript = PyNet.Import("grasshopper_component_finder");
+                    dynamic _ghScript = ImportFinder();
 
                     if (_ghScript == null)
                     {
@@ -199,9 +269,47 @@ namespace GH.Copilot
                         return;
                     }
 
-                    dynamic ghScriptClass = _ghScript.GetAttr("grasshopper_component_finder");
-                    dynamic ghScriptInstance = ghScriptClass.Invoke();
-                    _lastResponse = ghScriptInstance.main(query, @"C: \Users\VWarule\Documents\GitHub\GH.Copilot\GrasshopperComponent\PythonScripts\grasshopper_components.json", "sk-ant-REDACTED", @"C: \Users\VWarule\Documents\GitHub\GH.Copilot\GrasshopperComponent\PythonScripts\response.json");
+                    // Run the prompt as a job on a Python worker thread so the canvas
+                    // stays responsive; a new query supersedes the pending one
+                    if (_job == null || _jobPrompt != query)
+                    {
+                        if (_job != null)
+                        {
+                            _job.cancel();
+                        }
+                        string apiKey = GetApiKey();
+                        if (string.IsNullOrEmpty(apiKey))
+                        {
+                            _job = null;
+                            _jobPrompt = null;
+                            AddRuntimeMessage(GH_RuntimeMessageLevel.Error, "Set the " + ApiKeyVariable + " environment variable to your Anthropic API key.");
+                            return;
+                        }
+                        dynamic jobs = PyNet.Import("finder_jobs");
+                        _job = jobs.submit(query, ComponentsFile, apiKey, InstanceGuid.ToString());
+                        _jobPrompt = query;
+                    }
+
+                    string state = _job.poll()["state"].ToString();
+                    if (state == "pending" || state == "running")
+                    {
+                        // Solve again shortly to pick up the result
+                        AddRuntimeMessage(GH_RuntimeMessageLevel.Remark, "Waiting for the LLM response...");
+                        OnPingDocument()?.ScheduleSolution(JobPollInterval, document => ExpireSolution(false));
+                        return;
+                    }
+
+                    // The result is a dict; hand it on as JSON, not as its Python repr
+                    PyObject result = _job.result(0);
+                    dynamic json = PyNet.Import("json");
+                    _lastResponse = json.dumps(result).ToString();
+                    _job = null;
+                    _jobPrompt = null;
+
+                    // Only a successful answer is reused for the same query; after an
+                    // error, expiry or supersession the next solve asks again
+                    bool succeeded = state == "done" && !new PyDict(result).HasKey("error");
+                    previousPrompt = succeeded ? query : string.Empty;
                 }
             }
             catch (Exception ex)
@@ -2,15 +2,35 @@
 Grasshopper Component Information Extractor
 This script extracts metadata from Grasshopper components and saves it to a JSON file.
 Designed to run inside a Grasshopper Python component.
+
+Scans are incremental and streamed. Every assembly gets a fingerprint (name,
+version and module version id, or file size and time), and its components are
+written one JSON line at a time to its own shard file. A manifest records the
+fingerprint and shard of each assembly, so a re-run only rescans assemblies
+that changed and reuses the shards of the others. The merged catalog read by
+grasshopper_component_finder is then streamed from the shards.
+
+Output layout:
+    grasshopper_components/manifest.json
+    grasshopper_components/shards/<assembly>.jsonl
+    grasshopper_components.json          (merged catalog)
+
+The scanning functions take the assemblies, the component base type and the
+instantiation function as arguments, so they run outside Rhino with fake
+assembly and type objects; .NET is only imported by dotnet_environment().
 """
 
 import sys
 import os
 import json
+import re
+import time
 import traceback
-import System
-from System import AppDomain
-from Grasshopper.Kernel import GH_Component
+
+MANIFEST_NAME = "manifest.json"
+SHARD_DIRECTORY = "shards"
+MANIFEST_FORMAT = 1
+
 
 class CustomJSONEncoder(json.JSONEncoder):
     """Custom JSON encoder to handle non-serializable GH objects."""
@@ -23,180 +43,269 @@ class CustomJSONEncoder(json.JSONEncoder):
             # If that fails, convert to string
             return str(obj)
 
-def get_component_info():
-    """Extract information about all available Grasshopper components."""
-    
-    # List to store all component information
-    all_components = []
-    error_count = 0
-    success_count = 0
-    
-    print("Looking for Grasshopper assemblies...")
-    
-    # Get relevant assemblies
-    grasshopper_assemblies = []
-    for assembly in AppDomain.CurrentDomain.GetAssemblies():
+
+def dotnet_environment():
+    """Return (loaded assemblies, GH_Component type, instantiation function) from the running Rhino"""
+    import System
+    from System import AppDomain
+    from Grasshopper.Kernel import GH_Component
+    return list(AppDomain.CurrentDomain.GetAssemblies()), GH_Component, System.Activator.CreateInstance
+
+
+def is_relevant_assembly(name):
+    """Filter for Grasshopper-related assemblies"""
+    return "Grasshopper" in name or name.startswith("Gh") or "Components" in name
+
+
+def assembly_fingerprint(assembly):
+    """
+    Identify the build of an assembly: its version plus the module version id,
+    which changes with every compilation, or else the size and time of its file.
+    """
+    parts = [str(assembly.GetName().Version)]
+    try:
+        parts.append(str(assembly.ManifestModule.ModuleVersionId))
+    except Exception:
+        try:
+            stat = os.stat(assembly.Location)
+            parts.append(f"{stat.st_size}:{int(stat.st_mtime)}")
+        except Exception:
+            pass
+    return "|".join(parts)
+
+
+def shard_name(assembly_name):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", assembly_name) + ".jsonl"
+
+
+def describe_parameters(params):
+    """Get input or output parameters"""
+    described = []
+    for i in range(params.Count):
+        param = params[i]
+        described.append({
+            "name": param.Name,
+            "nickname": param.NickName,
+            "description": param.Description,
+            "type_hint": str(param.TypeHint),  # Convert to string
+            "param_type": param.GetType().Name
+        })
+    return described
+
+
+def describe_component(assembly_name, component_type, create_instance):
+    """Return the catalog record of a component type, instantiating it for details"""
+    # Try to get information without instantiation first
+    component_info = {
+        "assembly": assembly_name,
+        "type_name": component_type.Name,
+        "type_full_name": component_type.FullName,
+        "inputs": [],
+        "outputs": []
+    }
+
+    # Try to instantiate the component to get detailed info
+    try:
+        component = create_instance(component_type)
+
+        # Add detailed information
+        component_info.update({
+            "name": component.Name,
+            "nickname": component.NickName,
+            "description": component.Description,
+            "category": component.Category,
+            "subcategory": component.SubCategory,
+            "guid": str(component.ComponentGuid)
+        })
+        component_info["inputs"] = describe_parameters(component.Params.Input)
+        component_info["outputs"] = describe_parameters(component.Params.Output)
+    except Exception as inst_error:
+        # Failed to instantiate but we still have basic info
+        component_info["instantiation_error"] = str(inst_error)
+    return component_info
+
+
+def scan_assembly(assembly, component_base, create_instance):
+    """Yield the record of every concrete component type in an assembly"""
+    assembly_name = assembly.GetName().Name
+    for component_type in assembly.GetTypes():
+        try:
+            # Check if it's a Grasshopper component
+            if (component_type.IsSubclassOf(component_base) and
+                    not component_type.IsAbstract and
+                    not component_type.IsInterface):
+                yield describe_component(assembly_name, component_type, create_instance)
+        except Exception:
+            continue  # Skip problematic types
+
+
+def load_manifest(output_dir):
+    """Return the manifest of a previous scan, or an empty one"""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), 'r') as f:
+            manifest = json.load(f)
+        if manifest.get("format") == MANIFEST_FORMAT:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"format": MANIFEST_FORMAT, "assemblies": {}}
+
+
+def save_manifest(output_dir, manifest):
+    """Write the manifest atomically, so an interrupted scan keeps the shards already done"""
+    manifest["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path + ".tmp", 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def write_shard(path, records):
+    """Stream records to a JSONL shard; returns (components, instantiation errors)"""
+    count = errors = 0
+    with open(path + ".tmp", 'w') as f:
+        for record in records:
+            f.write(json.dumps(record, cls=CustomJSONEncoder) + "\n")
+            count += 1
+            if "instantiation_error" in record:
+                errors += 1
+    os.replace(path + ".tmp", path)
+    return count, errors
+
+
+def scrape(assemblies, output_dir, component_base, create_instance, keep_missing=False, log=print):
+    """
+    Scan the relevant assemblies into per-assembly shards under output_dir.
+    Assemblies whose fingerprint matches the previous manifest (and whose shard
+    still exists) are not scanned again. Assemblies of the previous scan that
+    are no longer loaded are dropped unless keep_missing is True.
+    Returns a summary with the scanned, reused and dropped assembly names.
+    """
+    shard_dir = os.path.join(output_dir, SHARD_DIRECTORY)
+    if not os.path.exists(shard_dir):
+        os.makedirs(shard_dir)
+    previous = load_manifest(output_dir)["assemblies"]
+    manifest = {"format": MANIFEST_FORMAT, "assemblies": {}}
+    summary = {"scanned": [], "reused": [], "dropped": [], "failed": []}
+
+    for assembly in assemblies:
         try:
             name = assembly.GetName().Name
-            # Filter for Grasshopper-related assemblies
-            if ("Grasshopper" in name or 
-                name.startswith("Gh") or 
-                "Components" in name):
-                grasshopper_assemblies.append(assembly)
-                print(f"Found assembly: {name}")
         except Exception as e:
-            print(f"Error checking assembly: {str(e)}")
-    
-    print(f"Found {len(grasshopper_assemblies)} potentially relevant assemblies")
-    
-    # Process each assembly to find components
-    for assembly in grasshopper_assemblies:
+            log(f"Error checking assembly: {str(e)}")
+            continue
+        if not is_relevant_assembly(name) or name in manifest["assemblies"]:
+            continue
+
+        fingerprint = assembly_fingerprint(assembly)
+        entry = previous.get(name)
+        if (entry and entry.get("fingerprint") == fingerprint
+                and os.path.exists(os.path.join(shard_dir, entry["shard"]))):
+            manifest["assemblies"][name] = entry
+            summary["reused"].append(name)
+            continue
+
+        log(f"Processing assembly: {name}")
+        shard = shard_name(name)
         try:
-            assembly_name = assembly.GetName().Name
-            print(f"Processing assembly: {assembly_name}")
-            
-            # Try to get all types
-            try:
-                types = assembly.GetTypes()
-            except Exception as e:
-                print(f"  Cannot get types from {assembly_name}: {str(e)}")
-                continue
-                
-            # Look for component types
-            component_count = 0
-            for type in types:
+            count, errors = write_shard(os.path.join(shard_dir, shard),
+                                        scan_assembly(assembly, component_base, create_instance))
+        except Exception as e:
+            # Cannot get types; keep the previous shard if there is one
+            log(f"  Cannot get types from {name}: {str(e)}")
+            summary["failed"].append(name)
+            if entry:
+                manifest["assemblies"][name] = entry
+            continue
+        log(f"  Found {count} components in {name}")
+        manifest["assemblies"][name] = {"fingerprint": fingerprint, "shard": shard, "components": count,
+                                        "instantiation_errors": errors}
+        summary["scanned"].append(name)
+        save_manifest(output_dir, dict(manifest, assemblies=dict(previous, **manifest["assemblies"])))
+
+    for name, entry in previous.items():
+        if name not in manifest["assemblies"]:
+            if keep_missing:
+                manifest["assemblies"][name] = entry
+            else:
+                summary["dropped"].append(name)
                 try:
-                    # Check if it's a Grasshopper component
-                    if (type.IsSubclassOf(GH_Component) and 
-                        not type.IsAbstract and 
-                        not type.IsInterface):
-                        
-                        # Try to get information without instantiation first
-                        component_info = {
-                            "assembly": assembly_name,
-                            "type_name": type.Name,
-                            "type_full_name": type.FullName,
-                            "inputs": [],
-                            "outputs": []
-                        }
-                        
-                        # Try to instantiate the component to get detailed info
-                        try:
-                            component = System.Activator.CreateInstance(type)
-                            
-                            # Add detailed information
-                            component_info.update({
-                                "name": component.Name,
-                                "nickname": component.NickName,
-                                "description": component.Description,
-                                "category": component.Category,
-                                "subcategory": component.SubCategory,
-                                "guid": str(component.ComponentGuid)
-                            })
-                            
-                            # Get input parameters
-                            for i in range(component.Params.Input.Count):
-                                input_param = component.Params.Input[i]
-                                param_info = {
-                                    "name": input_param.Name,
-                                    "nickname": input_param.NickName,
-                                    "description": input_param.Description,
-                                    "type_hint": str(input_param.TypeHint),  # Convert to string
-                                    "param_type": input_param.GetType().Name
-                                }
-                                component_info["inputs"].append(param_info)
-                            
-                            # Get output parameters
-                            for i in range(component.Params.Output.Count):
-                                output_param = component.Params.Output[i]
-                                param_info = {
-                                    "name": output_param.Name,
-                                    "nickname": output_param.NickName,
-                                    "description": output_param.Description,
-                                    "type_hint": str(output_param.TypeHint),  # Convert to string
-                                    "param_type": output_param.GetType().Name
-                                }
-                                component_info["outputs"].append(param_info)
-                                
-                            success_count += 1
-                            
-                        except Exception as inst_error:
-                            # Failed to instantiate but we still have basic info
-                            component_info["instantiation_error"] = str(inst_error)
-                            error_count += 1
-                        
-                        # Add component to our collection
-                        all_components.append(component_info)
-                        component_count += 1
-                        
-                except Exception as type_error:
-                    continue  # Skip problematic types
-                    
-            print(f"  Found {component_count} components in {assembly_name}")
-                
-        except Exception as asm_error:
-            print(f"Error processing assembly {assembly_name}: {str(asm_error)}")
-    
-    print(f"Processing complete. Found {len(all_components)} components.")
-    print(f"Successfully instantiated: {success_count}")
-    print(f"Failed to instantiate: {error_count}")
-    
-    return all_components
-
-def export_to_json(components_data):
-    """Export the component data to a JSON file."""
-    # Try several possible locations
-    locations = [
-        os.path.join(os.path.expanduser("~"), "Desktop", "grasshopper_components.json"),
-        os.path.join(os.environ.get("TEMP", ""), "grasshopper_components.json"),
-        "C:\\grasshopper_components.json"  # Root directory (likely to have write permissions)
+                    os.remove(os.path.join(shard_dir, entry["shard"]))
+                except OSError:
+                    pass
+
+    save_manifest(output_dir, manifest)
+    summary["components"] = sum(entry.get("components", 0) for entry in manifest["assemblies"].values())
+    return summary
+
+
+def iter_catalog(output_dir):
+    """Yield the records of every shard listed in the manifest"""
+    shard_dir = os.path.join(output_dir, SHARD_DIRECTORY)
+    for name, entry in sorted(load_manifest(output_dir)["assemblies"].items()):
+        with open(os.path.join(shard_dir, entry["shard"]), 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def write_catalog(output_dir, catalog_path):
+    """Stream the shards into one JSON array file and return the number of components"""
+    count = 0
+    with open(catalog_path + ".tmp", 'w') as f:
+        f.write("[")
+        for record in iter_catalog(output_dir):
+            f.write((",\n" if count else "\n") + json.dumps(record, cls=CustomJSONEncoder))
+            count += 1
+        f.write("\n]\n")
+    os.replace(catalog_path + ".tmp", catalog_path)
+    return count
+
+
+def output_locations():
+    """Candidate folders for the output, in order of preference"""
+    return [
+        os.path.join(os.path.expanduser("~"), "Desktop"),
+        os.environ.get("TEMP", ""),
+        "C:\\"  # Root directory (likely to have write permissions)
     ]
-    
-    error_msgs = []
-    
-    for file_path in locations:
-        try:
-            # Ensure path exists
-            directory = os.path.dirname(file_path)
-            if directory and not os.path.exists(directory):
-                os.makedirs(directory)
-                
-            # Write the file using the custom encoder
-            with open(file_path, 'w') as f:
-                json.dump(components_data, f, indent=2, cls=CustomJSONEncoder)
-                
-            print(f"Successfully wrote JSON to: {file_path}")
-            return file_path
-            
-        except Exception as e:
-            error_msg = f"Failed to write to {file_path}: {str(e)}"
-            error_msgs.append(error_msg)
-            print(error_msg)
-    
-    # If we get here, all attempts failed
-    raise Exception(f"Failed to write to any location. Errors: {'; '.join(error_msgs)}")
+
 
 # Main execution
 def main():
     try:
         print("Starting Grasshopper component extraction...")
         print(f"Python version: {sys.version}")
-        
-        # Extract component information
-        components_data = get_component_info()
-        
-        # Export to JSON
-        if components_data:
-            file_path = export_to_json(components_data)
-            print(f"Component information exported to: {file_path}")
-            print(f"Total components extracted: {len(components_data)}")
-        else:
-            print("No component data was extracted.")
-            
+
+        assemblies, component_base, create_instance = dotnet_environment()
+
+        error_msgs = []
+        for location in output_locations():
+            if not location:
+                continue
+            output_dir = os.path.join(location, "grasshopper_components")
+            catalog_path = os.path.join(location, "grasshopper_components.json")
+            try:
+                summary = scrape(assemblies, output_dir, component_base, create_instance)
+                count = write_catalog(output_dir, catalog_path)
+            except OSError as e:
+                error_msg = f"Failed to write to {location}: {str(e)}"
+                error_msgs.append(error_msg)
+                print(error_msg)
+                continue
+            print(f"Scanned {len(summary['scanned'])} assemblies, reused {len(summary['reused'])} unchanged, "
+                  f"dropped {len(summary['dropped'])}")
+            print(f"Component information exported to: {catalog_path}")
+            print(f"Total components extracted: {count}")
+            return catalog_path
+
+        # If we get here, all attempts failed
+        raise Exception(f"Failed to write to any location. Errors: {'; '.join(error_msgs)}")
+
     except Exception as e:
         print(f"Critical error in main execution: {str(e)}")
         print(traceback.format_exc())
 
 # Run the script
 if __name__ == "__main__" or not __name__:
-    main()
\ No newline at end of file
+    main()
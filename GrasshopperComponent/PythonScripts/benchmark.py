@@ -0,0 +1,310 @@
+"""
+Grasshopper Component Finder - Benchmark
+
+Measures where the time of a prompt goes, end to end, against a local fake
+LLM endpoint (fake_llm_server.py) so that runs are repeatable and free. For
+each catalog size it reports p50/p95/p99 of every stage:
+
+    load      parsing the catalog file (cold, cache cleared)
+    index     building the ranking index, prompt snippets and validator
+              lookups of a freshly loaded catalog
+    rank      ranking the catalog against a prompt
+    assemble  fitting the candidates into the prompt and building the payload
+    first_byte / http
+              time to the first streamed byte / to the complete response
+    parse     parsing, validating and laying out the returned graph
+
+Catalogs larger than the bundled one are synthesized by copying it 10x, 100x
+and 1000x with renamed entries (the 1000x run needs several GB of memory and
+minutes per load; pick smaller --scales for quick checks). Results are written as JSON so runs on
+different commits can be compared (--baseline prints the change per stage).
+
+Usage:
+    python benchmark.py --components grasshopper_components.json --scales 1,10,100 --output bench.json
+    python benchmark.py --components grasshopper_components.json --baseline bench.json --latency 0.2 --stream
+
+Requirements:
+    - requests
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import fake_llm_server
+import grasshopper_component_finder as finder
+from catalog_canonical import get_rank_weights
+from component_catalog import get_catalog, clear_catalogs
+from component_index import get_bm25_index
+from graph_validator import get_lookup
+from llm_stream import IncrementalGraphParser, iter_sse_events, iter_text_deltas
+from llm_transport import configure_transport
+from param_compatibility import get_compatibility
+from prompt_builder import get_snippet_table
+import semantic_index
+
+DEFAULT_SCALES = (1, 10, 100, 1000)
+PERCENTILES = (50, 95, 99)
+STAGES = ("load", "index", "rank", "assemble", "first_byte", "http", "parse")
+
+# Fixed prompt corpus, so runs are comparable
+DEFAULT_PROMPTS = [
+    "Create a grid of circles",
+    "Divide a curve into equal segments and place points",
+    "Loft between three curves",
+    "Extrude a closed curve upwards",
+    "Make a random point cloud inside a box",
+    "Rotate geometry around the Z axis by a slider angle",
+    "Create a surface from boundary curves",
+    "Intersect two breps and show the curves",
+    "Color a mesh by vertex height with a gradient",
+    "Move points along a vector",
+    "Scale objects from their center",
+    "Create a voronoi pattern on a plane",
+    "Offset a curve and fillet the corners",
+    "Boolean difference of two solids",
+    "Create a hexagonal grid and extrude the cells",
+    "Make a series of numbers and build lines from them",
+    "Attract circles to a point by distance",
+    "Panel showing the length of a curve",
+    "Populate a surface with points and connect them",
+    "Text tag at each point with its index",
+]
+
+
+def percentile(sorted_values, p):
+    """Linear-interpolated percentile of already sorted values"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * p / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(samples):
+    """Summary statistics in milliseconds for a list of durations in seconds"""
+    values = sorted(samples)
+    if not values:
+        return None
+    summary = {f"p{p}": round(percentile(values, p) * 1000.0, 3) for p in PERCENTILES}
+    summary["mean"] = round(sum(values) / len(values) * 1000.0, 3)
+    summary["n"] = len(values)
+    return summary
+
+
+def scale_catalog(source_file, factor, directory):
+    """
+    Write the source catalog copied factor times to directory and return its
+    path. Copies get a numbered name and GUID so every entry stays distinct.
+    """
+    with open(source_file, 'r') as f:
+        components = json.load(f)
+    if factor == 1:
+        return source_file
+    path = os.path.join(directory, f"components_x{factor}.json")
+    with open(path, 'w') as f:
+        f.write("[")
+        first = True
+        for copy in range(factor):
+            for comp in components:
+                if copy:
+                    comp = dict(comp, name=f"{comp.get('name', '')} {copy}",
+                                guid=f"{comp.get('guid', '')[:-8]}{copy:08x}")
+                f.write(("" if first else ",") + json.dumps(comp))
+                first = False
+        f.write("]")
+    return path
+
+
+def timed(samples, stage, function, *args, **kwargs):
+    """Call function, add its duration to samples[stage] and return its result"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    samples[stage].append(time.perf_counter() - start)
+    return result
+
+
+def build_indexes(catalog, ranker="bm25"):
+    """Build everything a prompt needs from a freshly loaded catalog"""
+    if ranker == "semantic" and semantic_index.is_available():
+        semantic_index.get_semantic_index(catalog)
+    else:
+        get_bm25_index(catalog)
+    get_rank_weights(catalog)
+    get_snippet_table(catalog)
+    get_lookup(catalog)
+    get_compatibility(catalog)
+
+
+def request_completion(transport, data, api_key, stream, samples):
+    """Send a request and return the completion text, timing first byte and total"""
+    start = time.perf_counter()
+    if not stream:
+        response = transport.post(data, api_key)
+        content = response.json()["content"][0]["text"]
+        samples["http"].append(time.perf_counter() - start)
+        return content
+
+    response = transport.post(dict(data, stream=True), api_key, stream=True)
+    parser = IncrementalGraphParser()
+    try:
+        for text in iter_text_deltas(iter_sse_events(response.iter_lines(decode_unicode=True))):
+            if not parser.text:
+                samples["first_byte"].append(time.perf_counter() - start)
+            parser.feed(text)
+    finally:
+        response.close()
+    samples["http"].append(time.perf_counter() - start)
+    return parser.text
+
+
+def run_scale(components_file, prompts, api_key, repeat=1, load_runs=3, ranker="bm25", stream=False,
+              schema=finder.DEFAULT_SCHEMA, layout=finder.DEFAULT_LAYOUT):
+    """Benchmark one catalog file and return {"components": count, "stages": {stage: summary}}"""
+    samples = {stage: [] for stage in STAGES}
+
+    catalog = None
+    for _ in range(max(load_runs, 1)):
+        clear_catalogs()
+        catalog = timed(samples, "load", get_catalog, components_file)
+        timed(samples, "index", build_indexes, catalog, ranker)
+
+    components_data = {"components": catalog.components, "catalog": catalog}
+    transport = finder.get_transport()
+    if schema == "compact":
+        layout = "local"
+    for _ in range(repeat):
+        for prompt in prompts:
+            doc_ids = timed(samples, "rank", finder.rank_components, catalog.components, prompt,
+                            catalog=catalog, ranker=ranker)
+            data, candidates = timed(samples, "assemble", finder.build_llm_request, prompt, components_data,
+                                     ranker, layout=layout, schema=schema, doc_ids=doc_ids)
+            content = request_completion(transport, data, api_key, stream, samples)
+
+            start = time.perf_counter()
+            result = finder.expand_result(finder.parse_llm_content(content), candidates)
+            finder.layout_result(finder.validate_result(result, components_data), layout)
+            samples["parse"].append(time.perf_counter() - start)
+
+    stages = {stage: summarize(values) for stage, values in samples.items() if values}
+    return {"components": len(catalog), "stages": stages}
+
+
+def run_benchmark(components_file, scales=DEFAULT_SCALES, prompts=None, repeat=1, load_runs=3, ranker="bm25",
+                  stream=False, latency=0.0, token_delay=0.0, responses=None, schema=finder.DEFAULT_SCHEMA,
+                  layout=finder.DEFAULT_LAYOUT, progress=None):
+    """
+    Run the benchmark for every scale against a fresh fake server.
+    Returns a JSON-serialisable dict with the settings and one result per scale.
+    """
+    prompts = prompts or DEFAULT_PROMPTS
+    server = fake_llm_server.start(latency=latency, token_delay=token_delay, responses=responses)
+    configure_transport(base_url=server.url)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for factor in scales:
+                if progress:
+                    progress(f"Scale {factor}x: writing catalog...")
+                path = scale_catalog(components_file, factor, directory)
+                if progress:
+                    progress(f"Scale {factor}x: running {len(prompts) * repeat} prompts...")
+                result = run_scale(path, prompts, "benchmark", repeat=repeat, load_runs=load_runs, ranker=ranker,
+                                   stream=stream, schema=schema, layout=layout)
+                result["scale"] = factor
+                results.append(result)
+                clear_catalogs()
+                if path != components_file:
+                    os.remove(path)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        "settings": {
+            "components_file": os.path.basename(components_file), "prompts": len(prompts), "repeat": repeat,
+            "load_runs": load_runs, "ranker": ranker, "stream": stream, "latency": latency,
+            "token_delay": token_delay, "schema": schema, "layout": layout,
+        },
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")},
+        "results": results,
+    }
+
+
+def format_report(report, baseline=None):
+    """Human-readable table of a benchmark report, with changes against a baseline report"""
+    previous = {}
+    for result in (baseline or {}).get("results", []):
+        previous[result["scale"]] = result["stages"]
+
+    lines = []
+    for result in report["results"]:
+        lines.append(f"Scale {result['scale']}x ({result['components']} components)")
+        lines.append(f"  {'stage':<11}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}  change p50")
+        for stage in STAGES:
+            summary = result["stages"].get(stage)
+            if summary is None:
+                continue
+            change = ""
+            before = previous.get(result["scale"], {}).get(stage)
+            if before and before.get("p50"):
+                change = f"{(summary['p50'] - before['p50']) / before['p50'] * 100.0:+.1f}%"
+            lines.append(f"  {stage:<11}{summary['p50']:>11.3f}{summary['p95']:>11.3f}{summary['p99']:>11.3f}  {change}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Grasshopper Component Finder benchmark')
+    parser.add_argument('--components', type=str, required=True, help='Path to the component database JSON file')
+    parser.add_argument('--scales', type=str, default=",".join(str(s) for s in DEFAULT_SCALES),
+                        help='Comma-separated catalog size multipliers')
+    parser.add_argument('--prompts', type=str, help='JSONL file of {"prompt"} lines (default is the built-in corpus)')
+    parser.add_argument('--repeat', type=int, default=1, help='Times the prompt corpus is run per scale')
+    parser.add_argument('--load-runs', type=int, default=3, help='Cold catalog loads per scale')
+    parser.add_argument('--ranker', type=str, choices=['bm25', 'semantic'], default='bm25', help='Component ranking method')
+    parser.add_argument('--schema', type=str, choices=finder.SCHEMAS, default=finder.DEFAULT_SCHEMA, help='Reply format')
+    parser.add_argument('--layout', type=str, choices=finder.LAYOUTS, default=finder.DEFAULT_LAYOUT, help='Component placement')
+    parser.add_argument('--stream', action='store_true', help='Stream the responses')
+    parser.add_argument('--latency', type=float, default=0.0, help='Fake server delay before the first byte, in seconds')
+    parser.add_argument('--token-delay', type=float, default=0.0, help='Fake server delay per generated chunk, in seconds')
+    parser.add_argument('--responses', type=str, help='JSON or JSONL file of canned completions for the fake server')
+    parser.add_argument('--output', type=str, help='Write the JSON report to this file (default is stdout)')
+    parser.add_argument('--baseline', type=str, help='Earlier JSON report to compare against')
+    parser.add_argument('--json-only', action='store_true', help='Only print the JSON report')
+    args = parser.parse_args()
+
+    prompts = None
+    if args.prompts:
+        import finder_batch
+        prompts = [prompt for prompt_id, prompt in finder_batch.read_batch_prompts(args.prompts)]
+    responses = fake_llm_server.load_responses(args.responses) if args.responses else None
+    progress = None if args.json_only else (lambda message: print(message, file=sys.stderr))
+
+    report = run_benchmark(args.components, [int(s) for s in args.scales.split(",") if s.strip()], prompts,
+                           repeat=args.repeat, load_runs=args.load_runs, ranker=args.ranker, stream=args.stream,
+                           latency=args.latency, token_delay=args.token_delay, responses=responses,
+                           schema=args.schema, layout=args.layout, progress=progress)
+
+    if not args.json_only:
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+        print(format_report(report, baseline), file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+"""
+Grasshopper Binary Component Catalog
+
+Compiles grasshopper_components.json into a compact binary file that can be
+memory-mapped and read without parsing any JSON. The components are
+canonicalized first (see catalog_canonical.py). The file holds:
+
+    - a header with section offsets and the size/mtime of the source JSON
+    - a string table where every distinct string is stored once
+    - fixed-width component records and parameter records (string table ids)
+    - the prebuilt BM25 index (terms, postings and document norms)
+    - the rank weight of every component (see catalog_canonical.rank_weight)
+    - the rendered prompt snippets of every component at each detail level
+
+Component dicts are only decoded when they are accessed, so a loaded catalog
+costs little more than the mapped pages that are actually touched.
+
+Usage:
+    python binary_catalog.py --components "path/to/grasshopper_components.json"
+
+    import binary_catalog
+    mapped = binary_catalog.open_catalog("path/to/grasshopper_components.ghcat")
+    print(mapped.components[0]["name"])
+"""
+
+import json
+import mmap
+import os
+import struct
+from collections import namedtuple
+from collections.abc import Sequence
+
+from catalog_canonical import canonicalize, rank_weights
+from component_index import BM25Index
+from prompt_builder import DETAIL_LEVELS, SNIPPET_VERSION, render_snippets
+
+MAGIC = b"GHCATLG\x00"
+FORMAT_VERSION = 4
+BINARY_EXTENSION = ".ghcat"
+
+# Marks a missing string (e.g. a component without a name)
+NO_STRING = 0xFFFFFFFF
+
+# Fixed-size file header; the fields are named by Header
+HEADER = struct.Struct("<8sIIIIIIIQQdd10Q")
+Header = namedtuple("Header", [
+    "magic", "version", "snippet_version",
+    "component_count", "param_count", "string_count", "term_count", "posting_count",
+    "source_size", "source_mtime_ns", "k1", "b",
+    # section offsets
+    "string_index", "string_data", "components", "params", "terms",
+    "posting_docs", "posting_frequencies", "norms", "snippets", "weights",
+])
+
+# Component string fields, in the order they appear in the JSON records
+COMPONENT_FIELDS = ("assembly", "type_name", "type_full_name", "name", "nickname",
+                    "description", "category", "subcategory", "guid", "instantiation_error")
+# string ids of COMPONENT_FIELDS, string id of extra keys as JSON, first param, input and output count
+COMPONENT_RECORD = struct.Struct("<%dIIIHH" % len(COMPONENT_FIELDS))
+NAME_OFFSET = 4 * COMPONENT_FIELDS.index("name")
+
+PARAM_FIELDS = ("name", "nickname", "description", "type_hint", "param_type")
+# string ids of PARAM_FIELDS, flags
+PARAM_RECORD = struct.Struct("<%dII" % len(PARAM_FIELDS))
+PARAM_IS_STRING = 1
+
+# term string id, first posting, posting count, idf
+TERM_RECORD = struct.Struct("<IIId")
+
+# string id of the snippet at each detail level, then its estimated tokens
+SNIPPET_RECORD = struct.Struct("<%dI%dI" % (len(DETAIL_LEVELS), len(DETAIL_LEVELS)))
+
+
+def binary_path_for(file_path):
+    """Return the binary catalog path that belongs to a JSON catalog path"""
+    root, ext = os.path.splitext(file_path)
+    if ext == BINARY_EXTENSION:
+        return file_path
+    return root + BINARY_EXTENSION
+
+
+class _StringTable:
+    """Collects distinct strings and hands out their ids"""
+
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def add(self, value):
+        if value is None:
+            return NO_STRING
+        value = str(value)
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.ids[value] = string_id
+            self.strings.append(value)
+        return string_id
+
+
+def _align(buffer, boundary=8):
+    buffer.extend(b"\x00" * (-len(buffer) % boundary))
+    return len(buffer)
+
+
+def compile_catalog(file_path, output_path=None):
+    """
+    Compile a JSON component catalog into the binary format.
+
+    Args:
+        file_path (str): Path to the component database JSON file
+        output_path (str, optional): Output path (default is next to the JSON file)
+
+    Returns:
+        str: Path of the written binary catalog
+    """
+    output_path = output_path or binary_path_for(file_path)
+    stat = os.stat(file_path)
+    with open(file_path, 'r') as f:
+        components = json.load(f)
+    if not isinstance(components, list) or len(components) == 0:
+        raise ValueError("Invalid component data structure")
+    components = canonicalize(components)[0]
+
+    strings = _StringTable()
+    component_records = bytearray()
+    param_records = bytearray()
+    param_count = 0
+
+    for component in components:
+        params = [p for p in component.get("inputs", [])] + [p for p in component.get("outputs", [])]
+        for param in params:
+            if isinstance(param, dict):
+                ids = [strings.add(param.get(field)) for field in PARAM_FIELDS]
+                param_records += PARAM_RECORD.pack(*ids, 0)
+            else:
+                ids = [strings.add(param)] + [NO_STRING] * (len(PARAM_FIELDS) - 1)
+                param_records += PARAM_RECORD.pack(*ids, PARAM_IS_STRING)
+
+        extra = {key: value for key, value in component.items()
+                 if key not in COMPONENT_FIELDS and key not in ("inputs", "outputs")}
+        extra_id = strings.add(json.dumps(extra)) if extra else NO_STRING
+        ids = [strings.add(component.get(field)) for field in COMPONENT_FIELDS]
+        component_records += COMPONENT_RECORD.pack(
+            *ids, extra_id, param_count,
+            len(component.get("inputs", [])), len(component.get("outputs", [])))
+        param_count += len(params)
+
+    # Prebuilt BM25 index, terms sorted so they can be found by binary search
+    index = BM25Index(components)
+    term_records = bytearray()
+    posting_docs = []
+    posting_frequencies = []
+    terms = sorted(index.postings)
+    for term in terms:
+        doc_ids, frequencies = index.postings[term]
+        term_records += TERM_RECORD.pack(strings.add(term), len(posting_docs), len(doc_ids), index.idf[term])
+        posting_docs.extend(doc_ids)
+        posting_frequencies.extend(frequencies)
+
+    # Prompt snippets, rendered once here instead of on every request
+    snippet_records = bytearray()
+    for component in components:
+        snippets = render_snippets(component)
+        snippet_records += SNIPPET_RECORD.pack(*[strings.add(text) for text, tokens in snippets],
+                                               *[tokens for text, tokens in snippets])
+
+    encoded = [value.encode("utf-8") for value in strings.strings]
+    string_index = bytearray()
+    offset = 0
+    for data in encoded:
+        string_index += struct.pack("<II", offset, len(data))
+        offset += len(data)
+
+    body = bytearray(b"\x00" * HEADER.size)
+    offsets = []
+    for section in (string_index, b"".join(encoded), component_records, param_records, term_records,
+                    struct.pack("<%dI" % len(posting_docs), *posting_docs),
+                    struct.pack("<%dd" % len(posting_frequencies), *posting_frequencies),
+                    struct.pack("<%dd" % len(index.norms), *index.norms),
+                    snippet_records,
+                    struct.pack("<%dd" % len(components), *rank_weights(components))):
+        offsets.append(_align(body))
+        body += section
+
+    body[:HEADER.size] = HEADER.pack(
+        MAGIC, FORMAT_VERSION, SNIPPET_VERSION, len(components), param_count, len(encoded), len(terms),
+        len(posting_docs), stat.st_size, stat.st_mtime_ns, index.k1, index.b, *offsets)
+
+    temp_path = output_path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(body)
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+def read_header(binary_path):
+    """Return the unpacked header of a binary catalog, or None if it is not one"""
+    with open(binary_path, 'rb') as f:
+        data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        return None
+    header = Header(*HEADER.unpack(data))
+    if header.magic != MAGIC or header.version != FORMAT_VERSION:
+        return None
+    return header
+
+
+def is_current(binary_path, file_path):
+    """Check that a binary catalog exists and was compiled from the current JSON file"""
+    if not os.path.exists(binary_path):
+        return False
+    header = read_header(binary_path)
+    if header is None or header.snippet_version != SNIPPET_VERSION:
+        return False
+    if not os.path.exists(file_path):
+        # Deployed without the JSON source, the binary is all we have
+        return True
+    stat = os.stat(file_path)
+    return header.source_size == stat.st_size and header.source_mtime_ns == stat.st_mtime_ns
+
+
+class MappedCatalog:
+    """A memory-mapped binary catalog"""
+
+    def __init__(self, binary_path):
+        self.path = binary_path
+        with open(binary_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        header = Header(*HEADER.unpack_from(view, 0))
+        if header.magic != MAGIC or header.version != FORMAT_VERSION:
+            raise ValueError(f"Not a binary component catalog: {binary_path}")
+
+        self.component_count = header.component_count
+        self.source_size = header.source_size
+        self.source_mtime_ns = header.source_mtime_ns
+        self.k1 = header.k1
+        self.b = header.b
+        self.term_count = header.term_count
+
+        self._view = view
+        self._string_index = view[header.string_index:header.string_index + 8 * header.string_count].cast("I")
+        self._string_data = header.string_data
+        self._components = header.components
+        self._params = header.params
+        self._terms = header.terms
+        self._snippets = header.snippets
+        posting_count = header.posting_count
+        self.posting_docs = view[header.posting_docs:header.posting_docs + 4 * posting_count].cast("I")
+        self.posting_frequencies = view[header.posting_frequencies:header.posting_frequencies + 8 * posting_count].cast("d")
+        self.norms = view[header.norms:header.norms + 8 * self.component_count].cast("d")
+        # Rank weights read without decoding any component
+        self.weights = view[header.weights:header.weights + 8 * self.component_count].cast("d")
+        self.components = MappedComponents(self)
+        self.names = MappedNames(self)
+
+    def string(self, string_id):
+        """Decode one entry of the string table"""
+        if string_id == NO_STRING:
+            return None
+        start = self._string_data + self._string_index[2 * string_id]
+        return str(self._view[start:start + self._string_index[2 * string_id + 1]], "utf-8")
+
+    def _param(self, param_id):
+        values = PARAM_RECORD.unpack_from(self._view, self._params + param_id * PARAM_RECORD.size)
+        if values[-1] & PARAM_IS_STRING:
+            return self.string(values[0])
+        return {field: self.string(string_id)
+                for field, string_id in zip(PARAM_FIELDS, values) if string_id != NO_STRING}
+
+    def component(self, doc_id):
+        """Decode one component record into the same dict the JSON file holds"""
+        if not 0 <= doc_id < self.component_count:
+            raise IndexError("component index out of range")
+        values = COMPONENT_RECORD.unpack_from(self._view, self._components + doc_id * COMPONENT_RECORD.size)
+        string_ids = values[:len(COMPONENT_FIELDS)]
+        extra_id, first_param, input_count, output_count = values[len(COMPONENT_FIELDS):]
+
+        fields = [self.string(string_id) if string_id != NO_STRING else None for string_id in string_ids]
+        component = {}
+        for field, value in zip(COMPONENT_FIELDS[:3], fields[:3]):
+            if value is not None:
+                component[field] = value
+        component["inputs"] = [self._param(first_param + i) for i in range(input_count)]
+        component["outputs"] = [self._param(first_param + input_count + i) for i in range(output_count)]
+        for field, value in zip(COMPONENT_FIELDS[3:], fields[3:]):
+            if value is not None:
+                component[field] = value
+        if extra_id != NO_STRING:
+            component.update(json.loads(self.string(extra_id)))
+        return component
+
+    def name(self, doc_id):
+        """Decode only the name of a component"""
+        if not 0 <= doc_id < self.component_count:
+            raise IndexError("component index out of range")
+        string_id, = struct.unpack_from("<I", self._view, self._components + doc_id * COMPONENT_RECORD.size + NAME_OFFSET)
+        return self.string(string_id)
+
+    def term(self, term_id):
+        """Return (term, first posting, posting count, idf) for a term record"""
+        string_id, first, count, idf = TERM_RECORD.unpack_from(self._view, self._terms + term_id * TERM_RECORD.size)
+        return self.string(string_id), first, count, idf
+
+    def bm25_index(self):
+        """Return a BM25 index that reads its postings straight from the mapped file"""
+        return MappedBM25Index(self)
+
+    def snippets(self, doc_id):
+        """Return the [(text, estimated tokens)] prompt snippets of a component"""
+        values = SNIPPET_RECORD.unpack_from(self._view, self._snippets + doc_id * SNIPPET_RECORD.size)
+        levels = len(DETAIL_LEVELS)
+        return [(self.string(values[i]), values[levels + i]) for i in range(levels)]
+
+    def snippet_table(self):
+        """Return a snippet table that reads from the mapped file"""
+        return MappedSnippetTable(self)
+
+
+class MappedComponents(Sequence):
+    """Read-only list of component dicts decoded on access"""
+
+    def __init__(self, mapped):
+        self._mapped = mapped
+
+    def __len__(self):
+        return self._mapped.component_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._mapped.component(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self._mapped.component(index)
+
+
+class MappedNames(Sequence):
+    """Read-only list of component names, without decoding the rest of the records"""
+
+    def __init__(self, mapped):
+        self._mapped = mapped
+
+    def __len__(self):
+        return self._mapped.component_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._mapped.name(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self._mapped.name(index)
+
+
+class MappedBM25Index(BM25Index):
+    """BM25Index backed by the prebuilt index section of a binary catalog"""
+
+    def __init__(self, mapped):
+        self.fields = None
+        self.k1 = mapped.k1
+        self.b = mapped.b
+        self.size = mapped.component_count
+        self.norms = mapped.norms
+        self._mapped = mapped
+
+    def lookup(self, term):
+        # Binary search over the sorted term records
+        mapped = self._mapped
+        low, high = 0, mapped.term_count
+        while low < high:
+            middle = (low + high) // 2
+            value, first, count, idf = mapped.term(middle)
+            if value == term:
+                return (idf, mapped.posting_docs[first:first + count],
+                        mapped.posting_frequencies[first:first + count])
+            if value < term:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+
+class MappedSnippetTable:
+    """Same interface as prompt_builder.SnippetTable, backed by the snippet section"""
+
+    def __init__(self, mapped):
+        self._mapped = mapped
+
+    def get(self, doc_id):
+        return self._mapped.snippets(doc_id)
+
+
+def open_catalog(binary_path):
+    """Memory-map a binary catalog"""
+    return MappedCatalog(binary_path)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Compile the Grasshopper component database to the binary catalog format')
+    parser.add_argument('--components', type=str, required=True, help='Path to the component database JSON file')
+    parser.add_argument('--output', type=str, help='Output file path (optional, default is next to the JSON file)')
+    args = parser.parse_args()
+
+    output_path = compile_catalog(args.components, args.output)
+    print(f"Binary catalog written to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Grasshopper Catalog Canonicalization
+
+Cleans the scraped component database before it is indexed. The raw catalog
+lists obsolete variants next to their replacements (GH_Cluster_OBSOLETE and
+GH_Cluster are both "Cluster"), repeats names and keeps the instantiation
+errors of the scraper. Canonicalizing it:
+
+    - collapses entries with the same name and category into one, preferring
+      non-obsolete types and then types with parameter data
+    - drops scraper-only fields such as instantiation_error
+    - flags entries without any inputs or outputs with "no_parameters"
+
+Catalogs are canonicalized when they are loaded, so the rankers only index
+the canonical entries. rank_weight gives the factor rankers multiply the
+score of obsolete and parameterless entries by, so they sink below usable
+ones; binary catalogs store it so it is read without decoding the entries. The command line writes the slim catalog to a file, which loads faster.
+
+Usage:
+    python catalog_canonical.py --components "path/to/grasshopper_components.json"
+
+    import catalog_canonical
+    components, report = catalog_canonical.canonicalize(components)
+"""
+
+import json
+import os
+from array import array
+
+# Scraper fields the finder and the host never use
+DROPPED_FIELDS = ("instantiation_error",)
+
+# Score factors applied by the rankers
+OBSOLETE_WEIGHT = 0.5
+NO_PARAMETERS_WEIGHT = 0.8
+
+
+def is_obsolete(component):
+    """Check whether a catalog entry is an obsolete variant kept for old files"""
+    return (component.get("type_name", "").endswith("_OBSOLETE")
+            or "[OBSOLETE]" in (component.get("name") or ""))
+
+
+def has_parameters(component):
+    return bool(component.get("inputs") or component.get("outputs"))
+
+
+def canonical_key(component):
+    """Entries with the same key describe the same component"""
+    name = component.get("name") or component.get("type_name") or ""
+    return (name.strip().lower(), (component.get("category") or "").strip().lower())
+
+
+def _preference(component):
+    # Lower is better
+    return (is_obsolete(component), not has_parameters(component), "name" not in component)
+
+
+def slim_entry(component):
+    """Return the entry without scraper-only fields, flagged when it has no parameters"""
+    entry = {key: value for key, value in component.items() if key not in DROPPED_FIELDS}
+    if not has_parameters(entry):
+        entry["no_parameters"] = True
+    else:
+        entry.pop("no_parameters", None)
+    return entry
+
+
+def canonicalize(components):
+    """
+    Collapse duplicate entries and slim the rest, keeping catalog order.
+    Returns (canonical components, report) where the report counts the
+    entries read, kept, collapsed, obsolete and without parameters.
+    """
+    best = {}
+    order = []
+    for component in components:
+        key = canonical_key(component)
+        current = best.get(key)
+        if current is None:
+            order.append(key)
+            best[key] = component
+        elif _preference(component) < _preference(current):
+            best[key] = component
+
+    canonical = [slim_entry(best[key]) for key in order]
+    report = {
+        "input": len(components),
+        "output": len(canonical),
+        "collapsed": len(components) - len(canonical),
+        "obsolete": sum(1 for component in canonical if is_obsolete(component)),
+        "no_parameters": sum(1 for component in canonical if component.get("no_parameters")),
+    }
+    return canonical, report
+
+
+def rank_weight(component):
+    """Factor applied to the ranking score of a catalog entry"""
+    weight = 1.0
+    if is_obsolete(component):
+        weight *= OBSOLETE_WEIGHT
+    if component.get("no_parameters") or not has_parameters(component):
+        weight *= NO_PARAMETERS_WEIGHT
+    return weight
+
+
+def rank_weights(components):
+    return array('d', (rank_weight(component) for component in components))
+
+
+def get_rank_weights(catalog):
+    """
+    Return the rank weights of a ComponentCatalog: stored in a binary catalog,
+    otherwise computed on first use
+    """
+    return catalog.derived("weights", lambda c: rank_weights(c.components))
+
+
+def canonical_path_for(file_path):
+    root, ext = os.path.splitext(file_path)
+    return root + ".canonical" + ext
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Write the canonical (deduplicated, slim) component catalog')
+    parser.add_argument('--components', type=str, required=True, help='Path to the component database JSON file')
+    parser.add_argument('--output', type=str, help='Output file path (optional, default is <name>.canonical.json)')
+    args = parser.parse_args()
+
+    with open(args.components, 'r') as f:
+        components = json.load(f)
+    canonical, report = canonicalize(components)
+
+    output_path = args.output or canonical_path_for(args.components)
+    with open(output_path, 'w') as f:
+        json.dump(canonical, f, separators=(',', ':'))
+    print(f"Kept {report['output']} of {report['input']} components ({report['collapsed']} duplicates collapsed, "
+          f"{report['obsolete']} obsolete, {report['no_parameters']} without parameters)")
+    print(f"Canonical catalog written to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Grasshopper Compact Response Schema
+
+Opt-in terse reply format that cuts the output tokens of a response, which
+dominate generation time. Candidates are numbered in the prompt ("[3] Component:
+...") and the model answers with list positions instead of repeating names,
+categories and verbose connection objects:
+
+    {"e": "explanation",
+     "n": [[3], [7, {"Radius": 5}]],
+     "w": [[0, "P", 1, "C"]]}
+
+"n" holds [candidate number, optional input values] per component and "w"
+holds [source node, output, target node, input] per connection, nodes counted
+from 0 in "n". expand_graph turns this into the regular components/connections
+JSON the C# host reads. Positions are never part of it; compact replies are
+always laid out locally.
+
+Usage:
+    import compact_schema
+    json_data = compact_schema.expand_graph(json_data, candidates)
+"""
+
+COMPACT_INSTRUCTIONS = """You are an assistant that helps users find and use the right Grasshopper components.
+When given a task description, choose the Grasshopper components from the numbered list that accomplish it
+and connect them. A C# program creates and connects the components on the canvas from your reply.
+
+Reply with only a compact JSON object like this:
+
+{"e": "A brief explanation of the approach", "n": [[3], [7, {"Radius": 5}]], "w": [[0, "Point", 1, "Plane"]]}
+
+Follow these guidelines:
+1. "n" lists the components to create, each as [number of the component in the list] or [number, {"InputName": value}] to set simple input values
+2. "w" lists the connections, each as [source, "OutputName", target, "InputName"] where source and target are positions in "n" counting from 0
+3. Only use components from the numbered list
+4. Make sure all connections are valid (outputs connect to appropriate inputs)
+5. Do not include positions, the components are laid out on the canvas automatically
+
+The entire response must be a single valid JSON object, with no text before or after it.
+"""
+
+
+def label(number):
+    """Prefix that numbers a candidate in the prompt (numbers start at 1)"""
+    return f"[{number}] "
+
+
+def is_compact(json_data):
+    """Check whether a parsed reply uses the compact schema"""
+    return isinstance(json_data, dict) and "n" in json_data and "components" not in json_data
+
+
+def node_id(index):
+    return f"n{index}"
+
+
+def expand_graph(json_data, candidates):
+    """
+    Expand a compact reply into {"explanation", "components", "connections"}.
+    candidates is the numbered component list of the prompt, in order. Entries
+    that cannot be expanded are kept with what they name, so the validator
+    reports them.
+    """
+    components = []
+    for index, node in enumerate(json_data.get("n") or []):
+        if not isinstance(node, list):
+            node = [node]
+        number = node[0] if node else None
+        component = {"id": node_id(index)}
+        if isinstance(number, int) and not isinstance(number, bool) and 1 <= number <= len(candidates):
+            candidate = candidates[number - 1]
+            component["name"] = candidate.get("name")
+            component["category"] = candidate.get("category")
+            component["subcategory"] = candidate.get("subcategory")
+        else:
+            component["name"] = f"#{number}"
+        values = node[1] if len(node) > 1 else None
+        if isinstance(values, dict) and values:
+            component["parameters"] = [{"name": name, "value": value} for name, value in values.items()]
+        components.append(component)
+
+    connections = []
+    for edge in json_data.get("w") or []:
+        source, output, target, input_name = (list(edge) + [None] * 4)[:4] if isinstance(edge, list) else [None] * 4
+        connections.append({
+            "fromComponent": node_id(source) if isinstance(source, int) else source,
+            "fromOutput": output,
+            "toComponent": node_id(target) if isinstance(target, int) else target,
+            "toInput": input_name,
+        })
+
+    return {"explanation": json_data.get("e", ""), "components": components, "connections": connections}
@@ -0,0 +1,134 @@
+"""
+Grasshopper Component Catalog
+
+Keeps the component database parsed once per interpreter so that every call from
+the Grasshopper host or the command line reuses the same warm copy. The file is
+only read again when its modification time or size changes.
+
+When a compiled binary catalog (see binary_catalog.py) sits next to the JSON
+file and was built from its current version, it is memory-mapped instead of
+parsing the JSON. Either way the components are canonicalized (see
+catalog_canonical.py): duplicates are collapsed and scraper-only fields dropped.
+
+Usage:
+    import component_catalog
+    catalog = component_catalog.get_catalog("path/to/components.json")
+    print(len(catalog.components))
+"""
+
+import json
+import os
+import threading
+
+import binary_catalog
+from catalog_canonical import canonicalize
+
+# Catalogs loaded in this interpreter, keyed by absolute file path
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def file_signature(file_path):
+    """Return the (mtime, size) pair used to detect changes to a catalog file"""
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def catalog_signature(file_path):
+    """
+    Return the signatures of a catalog file and its compiled binary (None for
+    whichever does not exist). Either one changing means the catalog is reloaded.
+    """
+    binary_path = binary_catalog.binary_path_for(file_path)
+    json_signature = file_signature(file_path) if os.path.exists(file_path) else None
+    binary_signature = file_signature(binary_path) if os.path.exists(binary_path) else None
+    if json_signature is None and binary_signature is None:
+        raise FileNotFoundError(f"File not found: {file_path}")
+    return (json_signature, binary_signature)
+
+
+class ComponentCatalog:
+    """A parsed component database and the file signature it was loaded from"""
+
+    def __init__(self, file_path, components, signature, derived=None, source="json"):
+        self.file_path = file_path
+        self.components = components
+        self.signature = signature
+        self.source = source
+        # Structures built from the components (indexes, lookups, ...)
+        self._derived = dict(derived or {})
+        self._derived_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.components)
+
+    @property
+    def version(self):
+        """Identifier that changes whenever the underlying files change"""
+        return "-".join(f"{part[0]}.{part[1]}" if part else "none" for part in self.signature)
+
+    def derived(self, key, factory):
+        """
+        Return a structure built from this catalog, building it on first use.
+        The result lives as long as the catalog, so it is rebuilt automatically
+        when the file changes and a new catalog replaces this one.
+        """
+        value = self._derived.get(key)
+        if value is None:
+            with self._derived_lock:
+                value = self._derived.get(key)
+                if value is None:
+                    value = factory(self)
+                    self._derived[key] = value
+        return value
+
+
+def read_catalog_file(file_path):
+    """Parse a component database file into a list of canonical component dicts"""
+    with open(file_path, 'r') as f:
+        components = json.load(f)
+
+    if not isinstance(components, list) or len(components) == 0:
+        raise ValueError("Invalid component data structure")
+    return canonicalize(components)[0]
+
+
+def load_catalog(file_path, signature):
+    """Load a catalog, preferring an up-to-date binary catalog over the JSON file"""
+    binary_path = binary_catalog.binary_path_for(file_path)
+    if binary_catalog.is_current(binary_path, file_path):
+        mapped = binary_catalog.open_catalog(binary_path)
+        return ComponentCatalog(file_path, mapped.components, signature,
+                                derived={"bm25": mapped.bm25_index(), "snippets": mapped.snippet_table(),
+                                         "weights": mapped.weights, "component_names": mapped.names, "mapped": mapped},
+                                source="binary")
+    return ComponentCatalog(file_path, read_catalog_file(file_path), signature)
+
+
+def get_catalog(file_path):
+    """
+    Return the catalog for file_path, loading it only if it has not been loaded
+    yet or if the file changed since the last load.
+
+    Raises FileNotFoundError if the file does not exist and ValueError if it
+    does not contain a list of components.
+    """
+    key = os.path.abspath(file_path)
+    signature = catalog_signature(key)
+
+    catalog = _catalogs.get(key)
+    if catalog is not None and catalog.signature == signature:
+        return catalog
+
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None or catalog.signature != signature:
+            catalog = load_catalog(key, signature)
+            _catalogs[key] = catalog
+    return catalog
+
+
+def clear_catalogs():
+    """Forget every cached catalog so the next call reloads from disk"""
+    with _catalogs_lock:
+        _catalogs.clear()
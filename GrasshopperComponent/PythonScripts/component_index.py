@@ -0,0 +1,182 @@
+"""
+Grasshopper Component Index
+
+Search structures built once per catalog and reused for every query.
+
+BM25Index is a tokenized inverted index over the text fields of each component.
+A query only touches the postings of its own terms and the best matches are
+taken from a heap, so the cost no longer grows with the size of the catalog.
+
+BM25 favours components whose description repeats the query words, which can
+push the component the user named below its neighbours ("rotate geometry"
+ranks Orient above Rotate). boost_name_matches rescores the best results so a
+component whose whole name is written in the query comes first.
+
+Usage:
+    import component_index
+    index = component_index.BM25Index(components)
+    for score, doc_id in index.search("divide a curve into points", k=10):
+        print(score, components[doc_id]["name"])
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+# Fields that are indexed, with the weight each occurrence contributes
+SEARCH_FIELDS = {
+    "name": 3.0,
+    "nickname": 2.0,
+    "category": 1.0,
+    "subcategory": 1.0,
+    "description": 1.0,
+}
+
+# Score factor of a component whose whole name is written in the query
+NAME_MATCH_BOOST = 1.5
+
+# Search results rescored by boost_name_matches, however few are wanted
+NAME_MATCH_POOL = 50
+
+# Words that carry no meaning for component search
+STOPWORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "for", "from",
+    "have", "i", "in", "into", "is", "it", "me", "my", "of", "on", "or",
+    "please", "some", "that", "the", "this", "to", "want", "with", "you",
+])
+
+_WORD_RE = re.compile(r"[A-Za-z]+|\d+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def stem(word):
+    """Very small suffix stripper so that 'circles' matches 'Circle'"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Split text into lowercase, stemmed search terms (camelCase is split too)"""
+    if not text:
+        return []
+    tokens = []
+    for word in _WORD_RE.findall(str(text)):
+        parts = _CAMEL_RE.findall(word) or [word]
+        if len(parts) > 1:
+            parts.append(word)
+        for part in parts:
+            part = part.lower()
+            if part in STOPWORDS:
+                continue
+            tokens.append(stem(part))
+    return tokens
+
+
+class BM25Index:
+    """Inverted index over component text fields scored with Okapi BM25"""
+
+    def __init__(self, components, fields=None, k1=1.2, b=0.75):
+        self.fields = fields or SEARCH_FIELDS
+        self.k1 = k1
+        self.b = b
+        self.size = len(components)
+
+        # term -> ([doc_id, ...], [weighted term frequency, ...])
+        postings = defaultdict(lambda: ([], []))
+        lengths = []
+        for doc_id, component in enumerate(components):
+            frequencies = defaultdict(float)
+            for field, weight in self.fields.items():
+                for token in tokenize(component.get(field, "")):
+                    frequencies[token] += weight
+            for token, frequency in frequencies.items():
+                doc_ids, term_frequencies = postings[token]
+                doc_ids.append(doc_id)
+                term_frequencies.append(frequency)
+            lengths.append(sum(frequencies.values()))
+
+        average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        self.postings = dict(postings)
+        self.idf = {
+            term: math.log(1.0 + (self.size - len(docs[0]) + 0.5) / (len(docs[0]) + 0.5))
+            for term, docs in self.postings.items()
+        }
+        # Per-document length normalisation, precomputed for the scoring loop
+        self.norms = [
+            k1 * (1.0 - b + b * (length / average_length if average_length else 0.0))
+            for length in lengths
+        ]
+
+    def lookup(self, term):
+        """Return (idf, doc_ids, frequencies) for a term, or None if it is not indexed"""
+        docs = self.postings.get(term)
+        if docs is None:
+            return None
+        return self.idf[term], docs[0], docs[1]
+
+    def search(self, query, k=15, extra_terms=None, weights=None):
+        """
+        Return up to k (score, doc_id) pairs with a positive score, best first.
+
+        Args:
+            query (str): Free text to search for
+            k (int): Maximum number of results
+            extra_terms (dict, optional): Additional term -> weight pairs, e.g. expansions
+            weights (sequence, optional): Per-document factors applied to the scores
+        """
+        term_weights = defaultdict(float)
+        for term in tokenize(query):
+            term_weights[term] = 1.0
+        for term, weight in (extra_terms or {}).items():
+            term_weights[term] = max(term_weights[term], weight)
+
+        scores = defaultdict(float)
+        k1 = self.k1
+        norms = self.norms
+        for term, weight in term_weights.items():
+            entry = self.lookup(term)
+            if entry is None:
+                continue
+            idf, doc_ids, frequencies = entry
+            idf *= weight
+            for doc_id, frequency in zip(doc_ids, frequencies):
+                scores[doc_id] += idf * frequency * (k1 + 1.0) / (frequency + norms[doc_id])
+        if weights is not None:
+            scores = {doc_id: score * weights[doc_id] for doc_id, score in scores.items()}
+
+        # Highest score first, lower doc id first on ties so results are stable
+        best = heapq.nsmallest(k, ((doc_id, score) for doc_id, score in scores.items() if score > 0),
+                               key=lambda item: (-item[1], item[0]))
+        return [(score, doc_id) for doc_id, score in best]
+
+
+def name_matches(name, query_terms):
+    """Check whether every word of a name is among query_terms (a Counter), as often as the name repeats it"""
+    needed = Counter(tokenize(name))
+    return bool(needed) and all(query_terms[term] >= count for term, count in needed.items())
+
+
+def boost_name_matches(results, query, names, k=15):
+    """
+    Rescore (score, doc_id) search results whose component name (names[doc_id])
+    is written in the query by NAME_MATCH_BOOST and return the best k
+    """
+    query_terms = Counter(tokenize(query))
+    rescored = [(score * NAME_MATCH_BOOST if name_matches(names[doc_id], query_terms) else score, doc_id)
+                for score, doc_id in results]
+    rescored.sort(key=lambda item: (-item[0], item[1]))
+    return rescored[:k]
+
+
+def get_component_names(catalog):
+    """Return the name of every component of a ComponentCatalog, read on first use"""
+    return catalog.derived("component_names", lambda c: [component.get("name") for component in c.components])
+
+
+def get_bm25_index(catalog):
+    """Return the BM25 index for a ComponentCatalog, building it on first use"""
+    return catalog.derived("bm25", lambda c: BM25Index(c.components))
@@ -0,0 +1,219 @@
+"""
+Grasshopper Fake LLM Server
+
+Local stand-in for Anthropic's messages endpoint, for benchmarks and offline
+development. It answers POST /v1/messages with canned completions, either as
+one JSON response or as a server-sent event stream, after a configurable
+delay. By default every reply is a small valid graph built from the first
+candidates of the request, so validation and layout have real work to do.
+
+Point the finder at it with ANTHROPIC_BASE_URL (or llm_transport's base_url).
+
+Usage:
+    python fake_llm_server.py --port 8089 --latency 0.5 --token-delay 0.01
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8089 python grasshopper_component_finder.py --prompt "..." ...
+
+    import fake_llm_server
+    server = fake_llm_server.start(latency=0.2)
+    ...
+    server.shutdown()
+"""
+
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Characters sent per streamed text delta, roughly one token
+CHUNK_SIZE = 4
+
+_CANDIDATE_RE = re.compile(r"^(?:\[\d+\] )?Component: (.+?) \(Category: ([^,)]+)", re.MULTILINE)
+
+
+def default_completion(payload):
+    """A valid graph connecting the first two candidates of the request, in the format it asks for"""
+    system = payload.get("system", [])
+    if isinstance(system, str):
+        system = [{"text": system}]
+    instructions = system[0].get("text", "") if system else ""
+    candidates = _CANDIDATE_RE.findall(system[-1].get("text", "") if system else "")[:2]
+
+    if '"n":' in instructions:
+        nodes = [[number] for number in range(1, len(candidates) + 1)]
+        edges = [[0, "Out", 1, "In"]] if len(candidates) > 1 else []
+        return json.dumps({"e": "Canned reply", "n": nodes, "w": edges})
+
+    components = [{"id": f"c{i}", "name": name, "category": category} for i, (name, category) in enumerate(candidates)]
+    connections = []
+    if len(components) > 1:
+        connections.append({"fromComponent": "c0", "fromOutput": "Out", "toComponent": "c1", "toInput": "In"})
+    return json.dumps({"explanation": "Canned reply", "components": components, "connections": connections},
+                      indent=2)
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.count_connection()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("content-length", 0)))
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self.send_json(400, {"type": "error", "error": {"type": "invalid_request_error", "message": "Bad JSON"}})
+            return
+
+        server = self.server
+        server.count_request()
+        failure = server.next_failure()
+        if failure is not None:
+            status, retry_after = failure
+            self.send_json(status, {"type": "error", "error": {"type": "api_error", "message": f"Canned {status}"}},
+                           {"retry-after": retry_after} if retry_after is not None else None)
+            return
+        text = server.completion(payload)
+        usage = {"input_tokens": len(body) // 4, "output_tokens": max(1, len(text) // CHUNK_SIZE)}
+        time.sleep(server.latency)
+
+        if payload.get("stream"):
+            self.stream(text, usage)
+        else:
+            time.sleep(server.token_delay * usage["output_tokens"])
+            self.send_json(200, {
+                "id": "msg_fake", "type": "message", "role": "assistant", "model": payload.get("model"),
+                "content": [{"type": "text", "text": text}], "stop_reason": "end_turn", "usage": usage,
+            })
+
+    def send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream(self, text, usage):
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("connection", "close")
+        self.end_headers()
+
+        def event(kind, data):
+            self.wfile.write(f"event: {kind}\ndata: {json.dumps(dict(data, type=kind))}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        event("message_start", {"message": {"id": "msg_fake", "usage": {"input_tokens": usage["input_tokens"]}}})
+        event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+        for start in range(0, len(text), CHUNK_SIZE):
+            event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": text[start:start + CHUNK_SIZE]}})
+            if self.server.token_delay:
+                time.sleep(self.server.token_delay)
+        event("content_block_stop", {"index": 0})
+        event("message_delta", {"delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": usage["output_tokens"]}})
+        event("message_stop", {})
+        self.close_connection = True
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """
+    Threaded fake server.
+    latency is the delay before the first byte of every reply and token_delay
+    the delay per generated chunk. responses, when given, is a list of canned
+    completion texts used in turn instead of default_completion. failures is
+    a list of (status, retry_after) error replies sent, in order, before any
+    completion; retry_after is the Retry-After header value or None.
+    requests and connections count the requests and TCP connections served.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency=0.0, token_delay=0.0, responses=None, failures=None):
+        super().__init__(address, FakeLLMHandler)
+        self.latency = latency
+        self.token_delay = token_delay
+        self._responses = itertools.cycle(responses) if responses else None
+        self._failures = list(failures or [])
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def next_failure(self):
+        with self._lock:
+            return self._failures.pop(0) if self._failures else None
+
+    def completion(self, payload):
+        if self._responses is None:
+            return default_completion(payload)
+        with self._lock:
+            return next(self._responses)
+
+
+def load_responses(file_path):
+    """Read canned completions: a JSON list of strings or of graphs, or JSONL with one per line"""
+    with open(file_path, 'r') as f:
+        text = f.read()
+    try:
+        entries = json.loads(text)
+        if not isinstance(entries, list):
+            entries = [entries]
+    except ValueError:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [entry if isinstance(entry, str) else json.dumps(entry) for entry in entries]
+
+
+def start(host="127.0.0.1", port=0, **options):
+    """Start a FakeLLMServer on a background thread and return it (see FakeLLMServer for options)"""
+    server = FakeLLMServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake Anthropic messages endpoint')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8089, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds before the first byte of each reply')
+    parser.add_argument('--token-delay', type=float, default=0.0, help='Seconds per generated chunk of text')
+    parser.add_argument('--responses', type=str, help='JSON or JSONL file of canned completions (optional)')
+    args = parser.parse_args()
+
+    responses = load_responses(args.responses) if args.responses else None
+    server = FakeLLMServer((args.host, args.port), latency=args.latency, token_delay=args.token_delay,
+                           responses=responses)
+    print(f"Fake LLM server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Grasshopper Component Finder - Batch Mode
+
+Runs many prompts concurrently on asyncio. Prompts are read from a JSONL file
+(one {"id": ..., "prompt": ...} object per line) and every result is appended
+to a JSONL output file as soon as it completes, tagged with the input id. The
+catalog, its ranking index, the response cache and the HTTP pool are shared by
+the whole batch.
+
+Usage:
+    python grasshopper_component_finder.py --batch prompts.jsonl --output results.jsonl --components "path/to/components.json" --api-key "your_api_key" --concurrency 8 --rate-limit 4
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import grasshopper_component_finder as finder
+import semantic_index
+from component_index import get_bm25_index
+from llm_transport import get_transport
+
+
+def read_batch_prompts(file_path):
+    """Read (id, prompt) pairs from a JSONL file; lines without an id use their line number"""
+    prompts = []
+    with open(file_path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if isinstance(entry, str):
+                entry = {"prompt": entry}
+            prompts.append((entry.get("id", line_number), entry["prompt"]))
+    return prompts
+
+
+class RateLimiter:
+    """Spaces request starts so that no more than rate of them begin per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def run_batch_async(prompts, component_data, api_key, output_file, concurrency=4, rate_limit=None,
+                          ranker="bm25", cache=None, **request_options):
+    """
+    Run every (id, prompt) pair and append each result to output_file in
+    completion order. request_options (input_budget, max_tokens, max_repairs,
+    repair_budget, layout, schema) are passed to call_llm_api. Returns counts of completed and failed prompts.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate_limit)
+    # Same settings as the shared transport, with enough connections for every worker
+    transport = get_transport().copy(pool_size=max(concurrency, 1))
+    executor = ThreadPoolExecutor(max_workers=max(concurrency, 1))
+    counts = {"completed": 0, "errors": 0}
+    loop = asyncio.get_running_loop()
+
+    def call(prompt):
+        return finder.call_llm_api(prompt, component_data, api_key, ranker=ranker, cache=cache, transport=transport,
+                                   **request_options)
+
+    async def run_one(prompt_id, prompt, output):
+        async with semaphore:
+            await limiter.wait()
+            # The request itself is blocking, so it runs on a worker thread
+            result = await loop.run_in_executor(executor, call, prompt)
+        # Results are written from the event loop thread only, one line each
+        output.write(json.dumps(dict({"id": prompt_id}, **result)) + "\n")
+        output.flush()
+        counts["errors" if "error" in result else "completed"] += 1
+
+    try:
+        with open(output_file, 'w') as output:
+            await asyncio.gather(*(run_one(prompt_id, prompt, output) for prompt_id, prompt in prompts))
+    finally:
+        executor.shutdown(wait=False)
+        transport.close()
+    return counts
+
+
+def run_batch(batch_file, component_data, api_key, output_file, concurrency=4, rate_limit=None,
+              ranker="bm25", cache=None, **request_options):
+    """Synchronous entry point for run_batch_async that reads the prompts from batch_file"""
+    prompts = read_batch_prompts(batch_file)
+
+    # Build the ranking index once, before the workers start
+    catalog = component_data.get("catalog")
+    if catalog is not None:
+        if ranker == "semantic" and semantic_index.is_available():
+            semantic_index.get_semantic_index(catalog)
+        else:
+            get_bm25_index(catalog)
+
+    counts = asyncio.run(run_batch_async(prompts, component_data, api_key, output_file,
+                                         concurrency=concurrency, rate_limit=rate_limit,
+                                         ranker=ranker, cache=cache, **request_options))
+    counts["prompts"] = len(prompts)
+    counts["output"] = output_file
+    return counts
@@ -0,0 +1,138 @@
+"""
+Grasshopper Component Finder - Client
+
+Thin JSON-RPC client for the resident finder server (finder_server.py). It only
+imports the standard library so that calling it costs little more than one
+localhost round trip; the catalog, indexes, HTTP pool and caches stay warm in
+the server process. Every request carries the session token the server wrote
+to a file only this user can read (see default_token_path), so other users of
+a shared machine cannot call it.
+
+Usage:
+    import finder_client
+    result = finder_client.find("Create a grid of circles")
+
+    python finder_client.py --prompt "Create a grid of circles"
+"""
+
+import argparse
+import itertools
+import json
+import os
+import socket
+import sys
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47810
+
+# JSON-RPC error code of a request without the right session token
+UNAUTHORIZED = -32001
+
+_request_ids = itertools.count(1)
+
+
+class ServerError(Exception):
+    """Raised when the server answers a request with a JSON-RPC error"""
+
+    def __init__(self, code, message):
+        super().__init__(f"{message} (code {code})")
+        self.code = code
+
+
+def server_address(address=None):
+    """Return (host, port) from "host:port", a tuple, or GH_COPILOT_SERVER"""
+    if isinstance(address, tuple):
+        return address
+    address = address or os.environ.get("GH_COPILOT_SERVER") or f"{DEFAULT_HOST}:{DEFAULT_PORT}"
+    host, _, port = address.rpartition(":")
+    return (host or DEFAULT_HOST, int(port))
+
+
+def default_token_path():
+    """Return the session token file: GH_COPILOT_TOKEN_FILE, or one in the user's local cache folder"""
+    if os.environ.get("GH_COPILOT_TOKEN_FILE"):
+        return os.environ["GH_COPILOT_TOKEN_FILE"]
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "GrasshopperCopilot", "finder_server.token")
+
+
+def read_token(token_file=None):
+    """Return the token of the running server, or None when no server wrote one"""
+    try:
+        with open(token_file or default_token_path(), 'r') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def call(method, params=None, address=None, timeout=300.0, token=None):
+    """
+    Send one JSON-RPC request and return its result (raises ServerError or OSError).
+    token defaults to the one in the token file.
+    """
+    request_id = next(_request_ids)
+    message = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {},
+               "token": token or read_token()}
+    with socket.create_connection(server_address(address), timeout=timeout) as connection:
+        connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        with connection.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("The finder server closed the connection without answering")
+    response = json.loads(line)
+    if "error" in response:
+        raise ServerError(response["error"].get("code"), response["error"].get("message"))
+    return response.get("result")
+
+
+def is_running(address=None, token=None):
+    """Check whether a finder server answers on the address and accepts the token"""
+    try:
+        return call("ping", address=address, timeout=1.0, token=token).get("pong", False)
+    except (OSError, ValueError, ServerError):
+        return False
+
+
+def find(prompt, components_file=None, api_key=None, address=None, fallback=False, token=None, **options):
+    """
+    Ask the server for component suggestions.
+    components_file and api_key default to the ones the server was started with;
+    the server only accepts a components_file in its catalog directory.
+    With fallback=True the prompt is run in this process when no server answers,
+    coalesced with the other prompts of this process (see finder_coalesce).
+    Returns the same dict as grasshopper_component_finder.call_llm_api.
+    """
+    params = dict(options, prompt=prompt)
+    if components_file is not None:
+        params["components_file"] = components_file
+    if api_key is not None:
+        params["api_key"] = api_key
+    try:
+        return call("find", params, address=address, token=token)
+    except ServerError as e:
+        return {"error": str(e)}
+    except OSError as e:
+        if not fallback or components_file is None or api_key is None:
+            return {"error": f"Finder server unavailable: {str(e)}"}
+    import finder_coalesce
+    return finder_coalesce.find(prompt, components_file, api_key, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Grasshopper Component Finder client')
+    parser.add_argument('--prompt', type=str, required=True, help='Natural language prompt describing the task')
+    parser.add_argument('--components', type=str, help='Path to the component database JSON file (default is the server\'s)')
+    parser.add_argument('--api-key', type=str, help='LLM API key (default is the server\'s)')
+    parser.add_argument('--server', type=str, help=f'Server address as host:port (default is {DEFAULT_HOST}:{DEFAULT_PORT})')
+    parser.add_argument('--ranker', type=str, choices=['bm25', 'semantic'], default='bm25', help='Component ranking method')
+    parser.add_argument('--token-file', type=str, help='File holding the server\'s session token (default is GH_COPILOT_TOKEN_FILE or the user cache folder)')
+    args = parser.parse_args()
+
+    token = read_token(args.token_file) if args.token_file else None
+    result = find(args.prompt, args.components, args.api_key, address=args.server, token=token, ranker=args.ranker)
+    print(json.dumps(result.get("json_data", result), indent=2))
+    return 1 if "error" in result else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
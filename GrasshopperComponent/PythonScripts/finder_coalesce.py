@@ -0,0 +1,240 @@
+"""
+Grasshopper Component Finder - Request Coalescing
+
+Single-flight requests for hosts that trigger the same prompt several times in
+quick succession. Identical prompts (same normalized text, catalog and
+options) that are pending or in flight share one Future, so only one LLM call
+is made and every caller gets its result.
+
+A prompt submitted on a channel (one per host component, e.g. its instance
+id) supersedes that channel's previous prompt. With a debounce window the
+prompt waits that long before it starts, so a burst of edits collapses into
+its last value: the superseded prompts are cancelled and dropped before they
+reach the network. A prompt other callers are still waiting for is kept, and
+one that has already started runs to completion.
+
+Usage:
+    import finder_coalesce
+    finder_coalesce.configure_coalescer(debounce=0.3)
+    future = finder_coalesce.submit("Create a grid of circles", "path/to/components.json", api_key,
+                                    channel="component-1")
+    result = finder_coalesce.find("Create a grid of circles", "path/to/components.json", api_key)
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from response_cache import normalize_prompt
+
+# Seconds a channel's prompt waits for a newer one before it starts
+DEFAULT_DEBOUNCE = 0.0
+
+# Prompts running at once
+DEFAULT_WORKERS = 4
+
+SUPERSEDED_ERROR = "Superseded by a newer prompt"
+
+
+def make_key(prompt, components_file, options):
+    """Identity of a request: prompts that only differ in case or spacing are the same"""
+    return json.dumps([normalize_prompt(prompt), os.path.abspath(components_file) if components_file else None,
+                       sorted(options.items())], default=str)
+
+
+class _Flight:
+    """One pending or running request and the number of callers waiting for it"""
+
+    __slots__ = ("key", "future", "waiters", "timer")
+
+    def __init__(self, key):
+        self.key = key
+        self.future = Future()
+        self.waiters = 1
+        self.timer = None
+
+
+class Coalescer:
+    """Shares identical in-flight requests and debounces the prompts of each channel"""
+
+    def __init__(self, run=None, debounce=DEFAULT_DEBOUNCE, max_workers=DEFAULT_WORKERS):
+        if run is None:
+            import grasshopper_component_finder as finder
+            run = finder.find_components
+        self.run = run
+        self.debounce = debounce
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="finder-coalesce")
+        self._lock = threading.Lock()
+        # Requests that have not finished, by key
+        self._flights = {}
+        # Latest request of each channel
+        self._channels = {}
+        self.counts = {"submitted": 0, "coalesced": 0, "superseded": 0, "started": 0}
+
+    def submit(self, prompt, components_file, api_key, channel=None, debounce=None, deadline=None, **options):
+        """
+        Return the Future of a find_components call (options as for it), shared
+        with any identical request that has not finished. On a channel the
+        request supersedes the channel's previous one and starts after the
+        debounce window (default self.debounce); a superseded Future is
+        cancelled if nobody else waits for it and it has not started yet.
+        deadline (a time.monotonic() value) is passed on to the call; a request
+        that is joined keeps the deadline it was submitted with.
+        """
+        key = make_key(prompt, components_file, options)
+        if deadline is not None:
+            options = dict(options, deadline=deadline)
+        with self._lock:
+            self.counts["submitted"] += 1
+            previous = self._channels.get(channel) if channel is not None else None
+            flight = self._flights.get(key)
+            if flight is not None and flight is previous:
+                # The channel repeats its own pending prompt
+                self.counts["coalesced"] += 1
+                return flight.future
+            if previous is not None:
+                self._release(previous)
+            if flight is not None:
+                flight.waiters += 1
+                self.counts["coalesced"] += 1
+            else:
+                flight = self._flights[key] = _Flight(key)
+                call = (flight, prompt, components_file, api_key, options)
+                delay = self.debounce if debounce is None else debounce
+                if channel is not None and delay > 0:
+                    flight.timer = threading.Timer(delay, self._start, call)
+                    flight.timer.daemon = True
+                    flight.timer.start()
+                else:
+                    self._start(*call)
+            if channel is not None:
+                self._channels[channel] = flight
+        return flight.future
+
+    def cancel(self, channel):
+        """Drop the pending request of a channel; returns whether it was cancelled"""
+        with self._lock:
+            flight = self._channels.pop(channel, None)
+            return flight is not None and self._release(flight)
+
+    def withdraw(self, future, channel=None):
+        """
+        Stop waiting for a Future returned by submit (pass the channel it was
+        submitted on, if any); the request is cancelled when nobody else waits
+        for it and it has not started. Returns whether it was cancelled.
+        """
+        with self._lock:
+            if channel is not None:
+                flight = self._channels.get(channel)
+                if flight is None or flight.future is not future:
+                    return False  # Already superseded on the channel
+                del self._channels[channel]
+                return self._release(flight)
+            flight = next((flight for flight in self._flights.values() if flight.future is future), None)
+            return flight is not None and self._release(flight)
+
+    def find(self, prompt, components_file, api_key, channel=None, timeout=None, **options):
+        """
+        Blocking submit: return the result dict, or an error dict when the
+        request was superseded or did not finish within timeout seconds
+        """
+        future = self.submit(prompt, components_file, api_key, channel=channel, **options)
+        try:
+            return future.result(timeout)
+        except CancelledError:
+            return {"error": SUPERSEDED_ERROR, "superseded": True}
+        except FutureTimeoutError:
+            return {"error": f"No result within {timeout} seconds"}
+        except Exception as e:
+            return {"error": f"Error finding components: {str(e)}"}
+
+    def pending(self):
+        """Number of requests that have not finished"""
+        with self._lock:
+            return len(self._flights)
+
+    def _release(self, flight):
+        # Called with the lock held
+        if self._flights.get(flight.key) is not flight:
+            return False  # Already finished
+        flight.waiters -= 1
+        if flight.waiters > 0 or not flight.future.cancel():
+            return False  # Others still wait for it, or it is running
+        if flight.timer is not None:
+            flight.timer.cancel()
+        del self._flights[flight.key]
+        self.counts["superseded"] += 1
+        return True
+
+    def _start(self, flight, prompt, components_file, api_key, options):
+        if flight.future.cancelled():
+            return
+        self._executor.submit(self._execute, flight, prompt, components_file, api_key, options)
+
+    def _execute(self, flight, prompt, components_file, api_key, options):
+        # The last chance to drop a superseded request before it hits the network
+        if not flight.future.set_running_or_notify_cancel():
+            return
+        with self._lock:
+            self.counts["started"] += 1
+        try:
+            result = self.run(prompt, components_file, api_key, **options)
+        except Exception as e:
+            self._finish(flight)
+            flight.future.set_exception(e)
+        else:
+            self._finish(flight)
+            flight.future.set_result(result)
+
+    def _finish(self, flight):
+        # Later identical prompts start a new request instead of reusing this result
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+            for channel in [channel for channel, current in self._channels.items() if current is flight]:
+                del self._channels[channel]
+
+    def shutdown(self, wait=True):
+        """Cancel the requests waiting for their debounce window and stop the workers"""
+        with self._lock:
+            for flight in list(self._flights.values()):
+                if flight.timer is not None and flight.future.cancel():
+                    flight.timer.cancel()
+                    del self._flights[flight.key]
+        self._executor.shutdown(wait=wait)
+
+
+_coalescer = None
+_coalescer_lock = threading.Lock()
+
+
+def get_coalescer():
+    """Return the module-level coalescer shared by every caller in this process"""
+    global _coalescer
+    if _coalescer is None:
+        with _coalescer_lock:
+            if _coalescer is None:
+                _coalescer = Coalescer()
+    return _coalescer
+
+
+def configure_coalescer(**options):
+    """Replace the shared coalescer with one built from the given Coalescer options"""
+    global _coalescer
+    with _coalescer_lock:
+        if _coalescer is not None:
+            _coalescer.shutdown(wait=False)
+        _coalescer = Coalescer(**options)
+    return _coalescer
+
+
+def submit(prompt, components_file, api_key, channel=None, **options):
+    """Coalescer.submit on the shared coalescer"""
+    return get_coalescer().submit(prompt, components_file, api_key, channel=channel, **options)
+
+
+def find(prompt, components_file, api_key, channel=None, timeout=None, **options):
+    """Coalescer.find on the shared coalescer"""
+    return get_coalescer().find(prompt, components_file, api_key, channel=channel, timeout=timeout, **options)
@@ -0,0 +1,168 @@
+"""
+Grasshopper Component Finder - Jobs
+
+Non-blocking entry point for hosts that must not wait on the LLM, such as a
+Grasshopper component solving on the UI thread. submit returns a Job at once;
+the prompt runs on a worker thread of the shared coalescer (finder_coalesce),
+which releases the GIL while it waits on the network, so identical and
+superseded prompts are coalesced and dropped as there. The host polls the job
+on later solves (or is told through on_done) and fetches the result without
+blocking.
+
+Every job has a deadline: requests are not started or retried past it and the
+read timeout is shortened to meet it. A job still running at its deadline
+reports "expired" and is withdrawn.
+
+Jobs are kept by id for hosts that only hold on to a string; the least
+recently used are dropped beyond MAX_JOBS.
+
+Usage:
+    import finder_jobs
+    job = finder_jobs.submit("Create a grid of circles", "path/to/components.json", api_key)
+    job.poll()              # {"id": ..., "state": "running", "seconds": 0.4}
+    result = job.result(0)  # {"error": ..., "pending": True} until the job is done
+    job.cancel()
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from finder_coalesce import SUPERSEDED_ERROR, get_coalescer
+
+# Seconds a job may take from submission
+DEFAULT_DEADLINE = 120.0
+
+MAX_JOBS = 256
+
+# Job states reported by poll
+STATES = ("pending", "running", "done", "cancelled", "superseded", "expired")
+
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+class Job:
+    """Handle of one submitted prompt"""
+
+    def __init__(self, job_id, prompt, future, deadline, channel=None, coalescer=None):
+        self.id = job_id
+        self.prompt = prompt
+        self.future = future
+        self.submitted = time.monotonic()
+        self.deadline = self.submitted + deadline
+        self.channel = channel
+        self._coalescer = coalescer
+        # "cancelled" or "expired" once the job was given up
+        self._ended = None
+
+    @property
+    def state(self):
+        if self._ended is not None:
+            return self._ended
+        if self.future.cancelled():
+            return "superseded"
+        if self.future.done():
+            return "done"
+        if time.monotonic() >= self.deadline:
+            self._end("expired")
+            return self._ended
+        return "running" if self.future.running() else "pending"
+
+    def done(self):
+        """Check whether the job will not change any more"""
+        return self.state not in ("pending", "running")
+
+    def poll(self):
+        """Return {"id", "state", "seconds"} without waiting"""
+        return {"id": self.id, "state": self.state, "seconds": round(time.monotonic() - self.submitted, 3)}
+
+    def result(self, timeout=None):
+        """
+        Return the result dict of the job, waiting at most timeout seconds (and
+        never past the deadline; None waits until then). An unfinished job
+        returns {"error", "pending": True}; a cancelled, superseded or expired
+        one an error dict flagged the same way.
+        """
+        remaining = self.deadline - time.monotonic()
+        wait = remaining if timeout is None else min(timeout, remaining)
+        try:
+            if self._ended is None:
+                return self.future.result(max(0.0, wait))
+        except CancelledError:
+            return {"error": SUPERSEDED_ERROR, "superseded": True}
+        except FutureTimeoutError:
+            if self.state != "expired":
+                return {"error": "Job is not finished", "pending": True}
+        except Exception as e:
+            return {"error": f"Error finding components: {str(e)}"}
+        if self._ended == "expired":
+            return {"error": f"Job exceeded its deadline of {round(self.deadline - self.submitted, 3)} seconds",
+                    "expired": True}
+        return {"error": "Job was cancelled", "cancelled": True}
+
+    def cancel(self):
+        """Give up the job; its request is dropped if nobody else waits for it. Returns False once done"""
+        if self.done():
+            return False
+        self._end("cancelled")
+        return True
+
+    def add_done_callback(self, callback):
+        """Call callback(job) on a worker thread when the request finishes (at once if it has)"""
+        self.future.add_done_callback(lambda future: callback(self))
+
+    def _end(self, state):
+        self._ended = state
+        if self._coalescer is not None:
+            self._coalescer.withdraw(self.future, self.channel)
+
+
+def submit(prompt, components_file, api_key, channel=None, deadline=DEFAULT_DEADLINE, on_done=None, **options):
+    """
+    Start a prompt and return its Job at once. options are passed to
+    find_components; channel supersedes that channel's pending prompt (see
+    finder_coalesce); deadline is in seconds from now; on_done(job) is called
+    on a worker thread when the request finishes.
+    """
+    coalescer = get_coalescer()
+    future = coalescer.submit(prompt, components_file, api_key, channel=channel,
+                              deadline=time.monotonic() + deadline, **options)
+    job = Job(uuid.uuid4().hex, prompt, future, deadline, channel, coalescer)
+    with _jobs_lock:
+        _jobs[job.id] = job
+        while len(_jobs) > MAX_JOBS:
+            _jobs.popitem(last=False)
+    if on_done is not None:
+        job.add_done_callback(on_done)
+    return job
+
+
+def get_job(job_id):
+    """Return a job by id, or None"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            _jobs.move_to_end(job_id)
+        return job
+
+
+def poll(job_id):
+    """Job.poll by id; unknown ids report {"error"}"""
+    job = get_job(job_id)
+    return job.poll() if job is not None else {"error": f"Unknown job {job_id}"}
+
+
+def result(job_id, timeout=None):
+    """Job.result by id; unknown ids report {"error"}"""
+    job = get_job(job_id)
+    return job.result(timeout) if job is not None else {"error": f"Unknown job {job_id}"}
+
+
+def cancel(job_id):
+    """Job.cancel by id; returns whether the job was cancelled"""
+    job = get_job(job_id)
+    return job is not None and job.cancel()
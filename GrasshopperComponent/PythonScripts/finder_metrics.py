@@ -0,0 +1,175 @@
+"""
+Grasshopper Component Finder - Metrics
+
+Lightweight per-prompt instrumentation. A Metrics object collects the time
+spent in each stage (monotonic clock) and counters such as cache hits,
+candidate count and the token usage reported by the API. Every finished
+prompt returns them under the "metrics" key of its result and hands them to
+the registered sinks:
+
+    - JsonlSink appends one JSON line per prompt to a log file
+    - PrometheusSink aggregates them and renders the Prometheus text
+      exposition format, optionally rewriting a file for node_exporter's
+      textfile collector
+
+Stages: load, select, format, request, first_byte, parse, validate, repair, layout
+
+Usage:
+    import finder_metrics
+    finder_metrics.add_sink(finder_metrics.JsonlSink("metrics.jsonl"))
+
+    metrics = finder_metrics.Metrics()
+    with metrics.stage("select"):
+        ...
+    metrics.count("candidates", 15)
+    finder_metrics.record(metrics.as_dict())
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Token counts of the API "usage" object that are added to the counters
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+class Metrics:
+    """Stage durations and counters of one prompt"""
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as stage name (repeated stages add up)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_usage(self, usage):
+        """Add the token counts of an API usage object"""
+        for field in USAGE_FIELDS:
+            value = (usage or {}).get(field)
+            if isinstance(value, int):
+                self.count(field, value)
+
+    def as_dict(self):
+        """{"stages_ms": {stage: milliseconds}, "counters": {name: value}}"""
+        return {
+            "stages_ms": {name: round(seconds * 1000.0, 3) for name, seconds in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+
+class JsonlSink:
+    """Appends every recorded prompt as one JSON line"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, metrics):
+        line = json.dumps(dict(metrics, time=round(time.time(), 3))) + "\n"
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line)
+
+
+class PrometheusSink:
+    """
+    Aggregates recorded prompts into counters and per-stage summaries.
+    render() returns the Prometheus text exposition; when path is given the
+    file is rewritten atomically after every prompt.
+    """
+
+    def __init__(self, path=None, prefix="gh_copilot"):
+        self.path = path
+        self.prefix = prefix
+        self.prompts = 0
+        self.stage_seconds = {}
+        self.stage_counts = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, metrics):
+        with self._lock:
+            self.prompts += 1
+            for name, milliseconds in metrics.get("stages_ms", {}).items():
+                self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + milliseconds / 1000.0
+                self.stage_counts[name] = self.stage_counts.get(name, 0) + 1
+            for name, value in metrics.get("counters", {}).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            text = self.render_locked() if self.path else None
+        if text is not None:
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, 'w') as f:
+                f.write(text)
+            os.replace(temporary, self.path)
+
+    def render(self):
+        with self._lock:
+            return self.render_locked()
+
+    def render_locked(self):
+        prefix = self.prefix
+        lines = [
+            f"# HELP {prefix}_prompts_total Prompts handled",
+            f"# TYPE {prefix}_prompts_total counter",
+            f"{prefix}_prompts_total {self.prompts}",
+            f"# HELP {prefix}_stage_seconds Time spent per stage",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for name in sorted(self.stage_seconds):
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {self.stage_seconds[name]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {self.stage_counts[name]}')
+        for name in sorted(self.counters):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {self.counters[name]}")
+        return "\n".join(lines) + "\n"
+
+
+_sinks = []
+_sinks_lock = threading.Lock()
+# ids of the sinks whose failure was already reported
+_failed_sinks = set()
+
+
+def add_sink(sink):
+    """Register a sink (any object with record(metrics_dict)) and return it"""
+    with _sinks_lock:
+        _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+        _failed_sinks.discard(id(sink))
+
+
+def record(metrics):
+    """Hand the metrics of a finished prompt to every sink; a failing sink never fails the prompt"""
+    with _sinks_lock:
+        sinks = list(_sinks)
+    for sink in sinks:
+        try:
+            sink.record(metrics)
+        except Exception as e:
+            with _sinks_lock:
+                if id(sink) in _failed_sinks:
+                    continue
+                _failed_sinks.add(id(sink))
+            print(f"Metrics sink {type(sink).__name__} failed: {e}", file=sys.stderr)
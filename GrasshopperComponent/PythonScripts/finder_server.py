@@ -0,0 +1,287 @@
+"""
+Grasshopper Component Finder - Server
+
+Resident finder process. The catalog, ranking indexes, HTTP connection pool and
+response cache are loaded once and stay warm, so each prompt only costs the LLM
+call itself. Requests are newline-delimited JSON-RPC 2.0 messages over
+localhost TCP; every connection and every request on it is handled
+concurrently, and responses carry the id of their request.
+
+Localhost is shared by every user of a terminal server, so each request must
+carry a "token" member with the random session token the server writes on
+start to a file only the current user can read (finder_client reads it; see
+finder_client.default_token_path). A components_file sent by a client must be
+inside the catalog directory, by default the folder of --components.
+
+Methods:
+    ping                                   -> {"pong": true, "pid": ...}
+    find {prompt, components_file?, api_key?, ranker?, use_cache?, session_id?, channel?}
+                                           -> result dict of call_llm_api; with session_id
+                                              the prompt refines that session's graph.
+                                              Identical prompts in flight share one call, and
+                                              a newer prompt on the same channel supersedes
+                                              a pending one (see finder_coalesce)
+    close_session {session_id}             -> {"closed": bool}
+    warm {components_file?, ranker?}       -> {"components": count, "seconds": ...}
+    resolve {name, k?, components_file?}   -> {"matches": [{score, name, category, ...}]}
+                                              closest catalog names to a misspelled one
+    metrics                                -> {"prometheus": text} of every prompt served
+    shutdown                               -> {"stopping": true}
+
+Usage:
+    python finder_server.py --components "path/to/components.json" --api-key "your_api_key"
+    python finder_server.py --catalog-dir "path/to/catalogs" --token-file "path/to/finder_server.token"
+
+    import finder_client
+    finder_client.find("Create a grid of circles")
+"""
+
+import argparse
+import hmac
+import json
+import os
+import secrets
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import finder_coalesce
+import finder_metrics
+import finder_session
+import grasshopper_component_finder as finder
+from finder_client import DEFAULT_HOST, DEFAULT_PORT, UNAUTHORIZED, default_token_path, server_address
+from name_index import get_name_index
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class FinderService:
+    """The methods served over JSON-RPC, with the defaults the server was started with"""
+
+    METHODS = ("ping", "warm", "find", "close_session", "resolve", "metrics", "shutdown")
+
+    def __init__(self, components_file=None, api_key=None, ranker="bm25", use_cache=True, cache_file=None,
+                 debounce=finder_coalesce.DEFAULT_DEBOUNCE, token=None, catalog_dir=None):
+        self.components_file = components_file
+        if catalog_dir is None and components_file is not None:
+            catalog_dir = os.path.dirname(os.path.abspath(components_file))
+        self.catalog_dir = catalog_dir
+        # Requests must carry this token; None accepts any request (in-process use only)
+        self.token = token
+        self.api_key = api_key
+        self.ranker = ranker
+        self.use_cache = use_cache
+        self.cache_file = cache_file
+        self.coalescer = finder_coalesce.Coalescer(finder.find_components, debounce=debounce)
+        self.stop = None
+        self.prometheus = finder_metrics.add_sink(finder_metrics.PrometheusSink())
+
+    def catalog_path(self, components_file):
+        """Return the catalog a client asked for, which must be inside the catalog directory"""
+        if components_file is None:
+            return self.components_file
+        if self.catalog_dir is None:
+            raise ValueError("This server has no catalog directory, components_file cannot be given")
+        root = os.path.realpath(self.catalog_dir)
+        path = os.path.realpath(os.path.join(root, components_file))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f"components_file must be inside the catalog directory {root}")
+        return path
+
+    def ping(self):
+        return {"pong": True, "pid": os.getpid()}
+
+    def warm(self, components_file=None, ranker=None):
+        """Load the catalog and build its indexes ahead of the first prompt"""
+        return finder.warm_up(self.catalog_path(components_file), ranker or self.ranker,
+                              self.use_cache, self.cache_file, background=False)
+
+    def find(self, prompt, components_file=None, api_key=None, ranker=None, use_cache=None, session_id=None,
+             channel=None):
+        components_file = self.catalog_path(components_file)
+        api_key = api_key or self.api_key
+        if components_file is None or api_key is None:
+            raise ValueError("components_file and api_key are required when the server has no defaults")
+        return self.coalescer.find(prompt, components_file, api_key, channel=channel, ranker=ranker or self.ranker,
+                                   use_cache=self.use_cache if use_cache is None else use_cache,
+                                   cache_file=self.cache_file, session_id=session_id)
+
+    def close_session(self, session_id):
+        return {"closed": finder_session.close_session(session_id)}
+
+    def resolve(self, name, k=5, components_file=None):
+        component_data = finder.load_component_database(self.catalog_path(components_file))
+        if "error" in component_data:
+            return component_data
+        return {"matches": get_name_index(component_data["catalog"]).resolve(name, k)}
+
+    def metrics(self):
+        return {"prometheus": self.prometheus.render()}
+
+    def shutdown(self):
+        if self.stop is not None:
+            # Stop from another thread, serve_forever waits for this handler otherwise
+            threading.Thread(target=self.stop, daemon=True).start()
+        return {"stopping": True}
+
+    def dispatch(self, message):
+        """Run one JSON-RPC request and return its response message"""
+        request_id = message.get("id") if isinstance(message, dict) else None
+        if self.token is not None and not (isinstance(message, dict) and is_token(message.get("token"), self.token)):
+            return error_response(request_id, UNAUTHORIZED, "Missing or wrong session token")
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            return error_response(request_id, INVALID_REQUEST, "Invalid request")
+        method = message["method"]
+        if method not in self.METHODS:
+            return error_response(request_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+        params = message.get("params") or {}
+        try:
+            if isinstance(params, list):
+                result = getattr(self, method)(*params)
+            else:
+                result = getattr(self, method)(**params)
+        except (TypeError, ValueError) as e:
+            return error_response(request_id, INVALID_PARAMS, str(e))
+        except Exception as e:
+            return error_response(request_id, INTERNAL_ERROR, str(e))
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+def is_token(value, token):
+    """Compare a request's token in constant time"""
+    return isinstance(value, str) and hmac.compare_digest(value.encode("utf-8"), token.encode("utf-8"))
+
+
+def write_token(path):
+    """Write a new random session token to a file only this user can read and return it"""
+    token = secrets.token_hex(32)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Create the file afresh so it gets the user-only mode (on Windows the per-user
+    # LocalAppData folder restricts access instead)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(descriptor, 'w') as f:
+        f.write(token)
+    return token
+
+
+def remove_token(path, token):
+    """Delete the token file unless a newer server has replaced it"""
+    try:
+        with open(path, 'r') as f:
+            if f.read().strip() != token:
+                return
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def error_response(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class FinderRequestHandler(socketserver.StreamRequestHandler):
+    """Reads requests line by line and answers each one as soon as it finishes"""
+
+    def handle(self):
+        write_lock = threading.Lock()
+        pending = []
+
+        def send(response):
+            data = json.dumps(response).encode("utf-8") + b"\n"
+            with write_lock:
+                try:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+                except OSError:
+                    pass  # Client went away
+
+        def answer(message):
+            response = self.server.service.dispatch(message)
+            if message.get("id") is None and "error" not in response:
+                return  # Notification, no response expected
+            send(response)
+
+        for line in self.rfile:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError as e:
+                send(error_response(None, PARSE_ERROR, f"Parse error: {str(e)}"))
+                continue
+            if not isinstance(message, dict):
+                message = {"id": None, "method": None}
+            pending.append(self.server.executor.submit(answer, message))
+
+        # Keep the connection open until every request on it has been answered
+        for future in pending:
+            future.result()
+
+
+class FinderServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, service, workers=8):
+        super().__init__(address, FinderRequestHandler)
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        service.stop = self.shutdown
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+
+def serve(components_file=None, api_key=None, address=None, ranker="bm25", use_cache=True, cache_file=None,
+          workers=8, warm=True, debounce=finder_coalesce.DEFAULT_DEBOUNCE, catalog_dir=None, token_file=None):
+    """Run the server until a shutdown request arrives"""
+    token_file = token_file or default_token_path()
+    service = FinderService(components_file, api_key, ranker=ranker, use_cache=use_cache, cache_file=cache_file,
+                            debounce=debounce, token=write_token(token_file), catalog_dir=catalog_dir)
+    try:
+        if warm and components_file is not None:
+            service.warm()
+        with FinderServer(server_address(address), service, workers=workers) as server:
+            host, port = server.server_address[:2]
+            print(f"Grasshopper component finder listening on {host}:{port}, token in {token_file}")
+            server.serve_forever()
+    finally:
+        remove_token(token_file, service.token)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Grasshopper Component Finder server')
+    parser.add_argument('--components', type=str, help='Default path to the component database JSON file')
+    parser.add_argument('--api-key', type=str, help='Default LLM API key')
+    parser.add_argument('--host', type=str, default=DEFAULT_HOST, help='Address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('--ranker', type=str, choices=['bm25', 'semantic'], default='bm25', help='Default ranking method')
+    parser.add_argument('--no-cache', action='store_true', help='Always call the API, ignoring stored responses')
+    parser.add_argument('--cache-file', type=str, help='Response cache database path (optional)')
+    parser.add_argument('--workers', type=int, default=8, help='Requests handled concurrently')
+    parser.add_argument('--debounce', type=float, default=finder_coalesce.DEFAULT_DEBOUNCE,
+                        help='Seconds a prompt sent with a channel waits for a newer one before it starts')
+    parser.add_argument('--catalog-dir', type=str, help='Folder the catalogs clients ask for must be in (default is the folder of --components)')
+    parser.add_argument('--token-file', type=str, help='Where to write the session token (default is GH_COPILOT_TOKEN_FILE or the user cache folder)')
+    args = parser.parse_args()
+
+    serve(args.components, args.api_key, address=(args.host, args.port), ranker=args.ranker,
+          use_cache=not args.no_cache, cache_file=args.cache_file, workers=args.workers, debounce=args.debounce,
+          catalog_dir=args.catalog_dir, token_file=args.token_file)
+
+
+if __name__ == "__main__":
+    main()
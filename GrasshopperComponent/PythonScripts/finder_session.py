@@ -0,0 +1,226 @@
+"""
+Grasshopper Component Finder - Sessions
+
+Multi-turn refinement of one graph. A session keeps the system blocks of its
+first turn, a condensed conversation, the current graph and the candidates
+already sent. The first turn is a regular request. Follow-up turns reuse the
+same system blocks (so the prompt cache applies), send only candidates the
+model has not seen yet plus a compact summary of the current graph, and ask
+for a graph diff (see graph_diff.py) that is applied locally, validated,
+repaired and laid out like a whole graph.
+
+The condensed conversation keeps every earlier user turn with the candidates
+it introduced and the model's explanation, not the graphs it returned: the
+graph summary in the new turn is the authoritative state, including local
+corrections made by the validator.
+
+Sessions live in this process; the host keeps the id and passes it with every
+prompt (grasshopper_component_finder.main(session_id=...) or the finder
+server's find). The least recently used sessions are dropped beyond
+MAX_SESSIONS. Sessions always use the full reply schema and no response cache.
+
+Usage:
+    import finder_session
+    session = finder_session.create_session("path/to/components.json")
+    result = session.ask("Create a grid of circles", api_key)
+    result = session.ask("Now make the circles bigger", api_key)
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+
+import grasshopper_component_finder as finder
+from finder_metrics import Metrics
+from graph_diff import DIFF_INSTRUCTIONS, apply_diff, is_diff, summarize_graph
+from graph_repair import DEFAULT_MAX_REPAIRS, DEFAULT_REPAIR_BUDGET
+from llm_transport import get_transport
+from prompt_builder import fit_components, get_snippet_table, DEFAULT_INPUT_BUDGET, DEFAULT_MAX_TOKENS
+
+MAX_SESSIONS = 64
+
+# Estimated tokens the candidates new to a follow-up turn may use
+FOLLOW_UP_CANDIDATE_BUDGET = 1000
+
+FOLLOW_UP_HEADER = "Additional Grasshopper components that might be relevant:\n\n"
+
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
+
+def _candidate_key(component):
+    return component.get("guid") or (component.get("name"), component.get("category"))
+
+
+def _with_cache_marker(message):
+    """Copy of a message whose content is marked as the end of the cacheable prefix"""
+    return {"role": message["role"],
+            "content": [{"type": "text", "text": message["content"], "cache_control": {"type": "ephemeral"}}]}
+
+
+class Session:
+    """Conversation state of one graph being refined over several prompts"""
+
+    def __init__(self, components_file, session_id=None, ranker="bm25", input_budget=DEFAULT_INPUT_BUDGET,
+                 max_tokens=DEFAULT_MAX_TOKENS, max_repairs=DEFAULT_MAX_REPAIRS,
+                 repair_budget=DEFAULT_REPAIR_BUDGET, layout=finder.DEFAULT_LAYOUT):
+        self.id = session_id or uuid.uuid4().hex
+        self.components_file = components_file
+        self.ranker = ranker
+        self.input_budget = input_budget
+        self.max_tokens = max_tokens
+        self.max_repairs = max_repairs
+        self.repair_budget = repair_budget
+        self.layout = layout
+        # System blocks of the first turn, reused by every follow-up
+        self.system = None
+        # Condensed earlier turns, alternating user and assistant messages
+        self.history = []
+        self.graph = None
+        self.sent = set()
+        self.turns = 0
+        self._deadline = None
+        self._lock = threading.Lock()
+
+    def ask(self, prompt, api_key, transport=None, metrics=None, deadline=None):
+        """
+        Run one turn and return a result like call_llm_api's, plus "session"
+        ({"id", "turn"}) and, for follow-ups, "diff" with what was changed.
+        The session graph only changes when the turn produced a graph.
+        deadline is an optional time.monotonic() value no request may run past.
+        """
+        with self._lock:
+            metrics = metrics if metrics is not None else Metrics()
+            with metrics.stage("load"):
+                components_data = finder.load_component_database(self.components_file)
+            if "error" in components_data:
+                return {"error": components_data["error"]}
+            transport = transport or get_transport()
+            self._deadline = deadline
+            if self.graph is None:
+                result = self._first_turn(prompt, components_data, api_key, transport, metrics)
+            else:
+                result = self._follow_up(prompt, components_data, api_key, transport, metrics)
+            result["session"] = {"id": self.id, "turn": self.turns}
+            return finder.attach_metrics(result, metrics)
+
+    def _first_turn(self, prompt, components_data, api_key, transport, metrics):
+        data, relevant_components = finder.build_llm_request(prompt, components_data, self.ranker,
+                                                             self.input_budget, self.max_tokens, self.layout,
+                                                             "full", metrics=metrics)
+        metrics.count("candidates", len(relevant_components))
+        result = self._complete(data, components_data, api_key, transport, metrics)
+        if self._commit(data["messages"][-1]["content"], result):
+            self.system = data["system"]
+            self.sent.update(_candidate_key(comp) for comp in relevant_components)
+        return result
+
+    def _follow_up(self, prompt, components_data, api_key, transport, metrics):
+        catalog = components_data.get("catalog")
+        all_components = catalog.components if catalog is not None else components_data.get("components", [])
+        with metrics.stage("select"):
+            doc_ids = finder.rank_components(all_components, prompt, catalog=catalog, ranker=self.ranker)
+            doc_ids = [doc_id for doc_id in doc_ids if _candidate_key(all_components[doc_id]) not in self.sent]
+        with metrics.stage("format"):
+            snippets = None
+            if catalog is not None:
+                table = get_snippet_table(catalog)
+                snippets = [table.get(doc_id) for doc_id in doc_ids]
+            fitted = fit_components([all_components[doc_id] for doc_id in doc_ids], FOLLOW_UP_CANDIDATE_BUDGET,
+                                    snippets=snippets)
+            turn = f"I want to change the graph in Grasshopper: {prompt}"
+            if fitted:
+                turn = FOLLOW_UP_HEADER + "\n".join(text for comp, text in fitted) + "\n\n" + turn
+            question = f"The current graph is:\n{summarize_graph(self.graph)}\n\n{turn}\n\n{DIFF_INSTRUCTIONS}"
+        metrics.count("candidates", len(fitted))
+
+        messages = list(self.history)
+        if messages:
+            messages[-1] = _with_cache_marker(messages[-1])
+        messages.append({"role": "user", "content": question})
+        data = {"model": finder.MODEL, "system": self.system, "messages": messages, "max_tokens": self.max_tokens}
+        result = self._complete(data, components_data, api_key, transport, metrics)
+        if self._commit(turn, result):
+            self.sent.update(_candidate_key(comp) for comp, text in fitted)
+        return result
+
+    def _complete(self, data, components_data, api_key, transport, metrics):
+        """Send a request and turn the reply into the new graph: diff applied, validated, repaired, laid out"""
+        try:
+            with metrics.stage("request"):
+                response = transport.post(data, api_key, deadline=self._deadline)
+                response_data = response.json()
+            metrics.add_time("first_byte", response.elapsed.total_seconds())
+            metrics.add_usage(response_data.get("usage"))
+            content = response_data["content"][0]["text"]
+
+            with metrics.stage("parse"):
+                result = finder.parse_llm_content(content)
+                if is_diff(result.get("json_data")):
+                    graph, notes = apply_diff(self.graph, result["json_data"])
+                    result["diff"] = {key: len(result["json_data"].get(key) or []) for key in
+                                      ("add_components", "remove_components", "modify_components",
+                                       "add_connections", "remove_connections")}
+                    if notes:
+                        result["diff"]["notes"] = notes
+                    result["json_data"] = graph
+            if "json_data" not in result:
+                return result
+            with metrics.stage("validate"):
+                result = finder.validate_result(result, components_data)
+            with metrics.stage("repair"):
+                # Repairs re-ask with the current turn only, which carries the graph summary
+                request = dict(data, messages=[{"role": "user", "content": data["messages"][-1]["content"]}])
+                result = finder.repair_llm_result(result, request, components_data, api_key, transport,
+                                                  self.max_repairs, self.repair_budget, "full", metrics,
+                                                  self._deadline)
+            with metrics.stage("layout"):
+                result = finder.layout_result(result, self.layout)
+            return result
+
+        except Exception as e:
+            metrics.count("errors")
+            return {"error": f"Error calling LLM API: {str(e)}"}
+
+    def _commit(self, user_turn, result):
+        """Make the graph of a turn the session graph; False when the turn produced none"""
+        if not isinstance(result.get("json_data"), dict):
+            return False
+        self.graph = result["json_data"]
+        self.turns += 1
+        explanation = self.graph.get("explanation") or "Done."
+        self.history += [{"role": "user", "content": user_turn}, {"role": "assistant", "content": explanation}]
+        return True
+
+
+def create_session(components_file, session_id=None, **settings):
+    """Create and register a session (settings as for Session) and return it"""
+    session = Session(components_file, session_id, **settings)
+    with _sessions_lock:
+        _sessions[session.id] = session
+        while len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
+    return session
+
+
+def get_session(session_id):
+    """Return a registered session, or None"""
+    with _sessions_lock:
+        session = _sessions.get(session_id)
+        if session is not None:
+            _sessions.move_to_end(session_id)
+        return session
+
+
+def close_session(session_id):
+    """Forget a session; returns whether it existed"""
+    with _sessions_lock:
+        return _sessions.pop(session_id, None) is not None
+
+
+def ask(session_id, prompt, components_file, api_key, transport=None, metrics=None, deadline=None, **settings):
+    """Run a prompt in the session with this id, creating the session on first use"""
+    session = get_session(session_id)
+    if session is None:
+        session = create_session(components_file, session_id, **settings)
+    return session.ask(prompt, api_key, transport=transport, metrics=metrics, deadline=deadline)
@@ -0,0 +1,159 @@
+"""
+Grasshopper Graph Diff
+
+Reply format for follow-up turns of a session (see finder_session.py). Instead
+of regenerating the whole graph, the model answers with the changes to the
+current one, which apply_diff applies locally:
+
+    {"explanation": "...",
+     "add_components": [{"id": "c5", "name": "...", "category": "...", "parameters": [...]}],
+     "remove_components": ["c2"],
+     "modify_components": [{"id": "c1", "parameters": [{"name": "Radius", "value": 10}]}],
+     "add_connections": [{"fromComponent": "c1", "fromOutput": "...", "toComponent": "c5", "toInput": "..."}],
+     "remove_connections": [{"fromComponent": "c0", "fromOutput": "...", "toComponent": "c1", "toInput": "..."}]}
+
+Removing a component also removes its connections. Modified parameters are
+merged by name into the existing ones, and connections of modified or
+replaced components lose their parameter indices.
+
+Usage:
+    import graph_diff
+    if graph_diff.is_diff(json_data):
+        graph, notes = graph_diff.apply_diff(current_graph, json_data)
+"""
+
+import copy
+import json
+
+from graph_validator import id_key
+
+DIFF_KEYS = ("add_components", "remove_components", "modify_components", "add_connections", "remove_connections")
+
+DIFF_INSTRUCTIONS = """Reply with only the changes to the current graph, as a single JSON object in this format:
+
+{
+  "explanation": "A brief explanation of the change",
+  "add_components": [{"id": "new unique id", "name": "Component name", "category": "Category", "subcategory": "Subcategory", "parameters": [{"name": "InputName", "value": "value"}]}],
+  "remove_components": ["id of a component to remove"],
+  "modify_components": [{"id": "existing id", "parameters": [{"name": "InputName", "value": "new value"}]}],
+  "add_connections": [{"fromComponent": "id", "fromOutput": "OutputName", "toComponent": "id", "toInput": "InputName"}],
+  "remove_connections": [{"fromComponent": "id", "fromOutput": "OutputName", "toComponent": "id", "toInput": "InputName"}]
+}
+
+Leave out the keys you do not need. Keep the ids of existing components, only use components from the lists you were given, and do not include positions.
+"""
+
+
+def is_diff(json_data):
+    """Check whether a parsed reply is a graph diff rather than a whole graph"""
+    return isinstance(json_data, dict) and "components" not in json_data and any(key in json_data for key in DIFF_KEYS)
+
+
+def _connection_key(connection):
+    return tuple(str(connection.get(field, "")).strip().lower()
+                 for field in ("fromComponent", "fromOutput", "toComponent", "toInput"))
+
+
+def _list(json_data, key):
+    value = json_data.get(key)
+    return value if isinstance(value, list) else []
+
+
+def apply_diff(graph, diff):
+    """
+    Return (new graph, notes) with the diff applied to a copy of graph. notes
+    lists the changes that could not be applied, e.g. removing a missing id.
+    """
+    graph = copy.deepcopy(graph) if isinstance(graph, dict) else {}
+    components = [comp for comp in graph.get("components", []) if isinstance(comp, dict)]
+    connections = [conn for conn in graph.get("connections", []) if isinstance(conn, dict)]
+    notes = []
+
+    removed = set()
+    existing = {id_key(comp.get("id")) for comp in components}
+    for component_id in _list(diff, "remove_components"):
+        if id_key(component_id) in existing:
+            removed.add(id_key(component_id))
+        else:
+            notes.append(f"Cannot remove missing component {component_id}")
+    if removed:
+        components = [comp for comp in components if id_key(comp.get("id")) not in removed]
+        connections = [conn for conn in connections
+                       if id_key(conn.get("fromComponent")) not in removed
+                       and id_key(conn.get("toComponent")) not in removed]
+
+    by_id = {id_key(comp.get("id")): comp for comp in components}
+    changed = set()
+    for change in _list(diff, "modify_components"):
+        component = by_id.get(id_key(change.get("id"))) if isinstance(change, dict) else None
+        if component is None:
+            notes.append(f"Cannot modify missing component {change.get('id') if isinstance(change, dict) else change}")
+            continue
+        changed.add(id_key(component.get("id")))
+        for key, value in change.items():
+            if key == "parameters" and isinstance(value, list):
+                parameters = {str(param.get("name")).lower(): param
+                              for param in component.get("parameters", []) if isinstance(param, dict)}
+                for param in value:
+                    if not isinstance(param, dict):
+                        continue
+                    current = parameters.get(str(param.get("name")).lower())
+                    if current is not None:
+                        current.update(param)
+                        current.pop("inputIndex", None)
+                    else:
+                        component.setdefault("parameters", []).append(dict(param))
+            elif key != "id":
+                component[key] = value
+                if key in ("name", "category", "subcategory"):
+                    component.pop("guid", None)
+
+    for component in _list(diff, "add_components"):
+        if not isinstance(component, dict):
+            continue
+        if id_key(component.get("id")) in by_id:
+            notes.append(f"Component id {component.get('id')} already exists, replaced")
+            components = [comp for comp in components if id_key(comp.get("id")) != id_key(component.get("id"))]
+            changed.add(id_key(component.get("id")))
+        component = dict(component)
+        components.append(component)
+        by_id[id_key(component.get("id"))] = component
+
+    # Parameter indices of changed components are resolved again by the validator
+    for connection in connections:
+        if id_key(connection.get("fromComponent")) in changed or id_key(connection.get("toComponent")) in changed:
+            connection.pop("fromOutputIndex", None)
+            connection.pop("toInputIndex", None)
+
+    removals = {_connection_key(conn) for conn in _list(diff, "remove_connections") if isinstance(conn, dict)}
+    if removals:
+        kept = [conn for conn in connections if _connection_key(conn) not in removals]
+        if len(connections) - len(kept) < len(removals):
+            notes.append("Some connections to remove were not in the graph")
+        connections = kept
+    present = {_connection_key(conn) for conn in connections}
+    for connection in _list(diff, "add_connections"):
+        if isinstance(connection, dict) and _connection_key(connection) not in present:
+            connections.append(dict(connection))
+            present.add(_connection_key(connection))
+
+    graph["components"] = components
+    graph["connections"] = connections
+    if diff.get("explanation"):
+        graph["explanation"] = diff["explanation"]
+    return graph, notes
+
+
+def summarize_graph(graph):
+    """The current graph as compact JSON for the prompt: ids, names, values and connections only"""
+    components = []
+    for comp in graph.get("components", []):
+        entry = {key: comp[key] for key in ("id", "name", "category") if key in comp}
+        parameters = [{"name": param.get("name"), "value": param.get("value")}
+                      for param in comp.get("parameters", []) if isinstance(param, dict)]
+        if parameters:
+            entry["parameters"] = parameters
+        components.append(entry)
+    connections = [{key: conn.get(key) for key in ("fromComponent", "fromOutput", "toComponent", "toInput")}
+                   for conn in graph.get("connections", []) if isinstance(conn, dict)]
+    return json.dumps({"components": components, "connections": connections})
@@ -0,0 +1,165 @@
+"""
+Grasshopper Graph Layout
+
+Places the components of an LLM graph on the canvas locally, so the model does
+not have to spend output tokens inventing positions. It is a small layered
+(Sugiyama style) layout of the "connections" data flow:
+
+    1. layering: longest path in topological order (Kahn), so every connection
+       runs left to right; connections that close a cycle are ignored
+    2. connections spanning several layers get placeholder nodes in between
+    3. crossing minimization: alternating barycenter sweeps, keeping the
+       ordering with the fewest crossings
+    4. coordinates: one column per layer, one row per node, the first
+       component at (0, 0)
+
+Usage:
+    import graph_layout
+    graph_layout.layout_graph(json_data)  # sets "position" on every component
+"""
+
+from collections import defaultdict, deque
+
+from graph_validator import id_key
+
+DEFAULT_COLUMN_SPACING = 200
+DEFAULT_ROW_SPACING = 100
+DEFAULT_SWEEPS = 4
+
+
+def assign_layers(count, edges):
+    """
+    Return the layer of nodes 0..count-1 for edges [(source, target)].
+    Each node sits one layer right of its furthest predecessor; when only
+    cycles are left the first remaining node is placed as if it had none.
+    """
+    outgoing = defaultdict(list)
+    indegree = [0] * count
+    for source, target in edges:
+        outgoing[source].append(target)
+        indegree[target] += 1
+
+    layer = [0] * count
+    done = [False] * count
+    placed = 0
+    queue = deque(node for node in range(count) if indegree[node] == 0)
+    fallback = iter(range(count))
+    while placed < count:
+        if not queue:
+            queue.append(next(node for node in fallback if not done[node]))
+        node = queue.popleft()
+        if done[node]:
+            continue
+        done[node] = True
+        placed += 1
+        for target in outgoing[node]:
+            if done[target]:
+                continue  # Closes a cycle
+            layer[target] = max(layer[target], layer[node] + 1)
+            indegree[target] -= 1
+            if indegree[target] == 0:
+                queue.append(target)
+    return layer
+
+
+def count_crossings(layers, down, position):
+    """Number of crossing edge segments between neighbouring layers"""
+    crossings = 0
+    for nodes in layers[:-1]:
+        segments = [(position[source], position[target]) for source in nodes for target in down[source]]
+        for i, (a_source, a_target) in enumerate(segments):
+            for b_source, b_target in segments[i + 1:]:
+                if (a_source - b_source) * (a_target - b_target) < 0:
+                    crossings += 1
+    return crossings
+
+
+def order_layers(layers, up, down, sweeps=DEFAULT_SWEEPS):
+    """Reorder the nodes of each layer in place by barycenter sweeps to reduce crossings"""
+    position = {}
+
+    def renumber():
+        for nodes in layers:
+            for index, node in enumerate(nodes):
+                position[node] = index
+
+    def sweep(indices, neighbours):
+        for index in indices:
+            nodes = layers[index]
+            # Nodes without neighbours on that side keep their current place
+            keys = {node: (sum(position[n] for n in neighbours[node]) / len(neighbours[node])
+                           if neighbours[node] else position[node]) for node in nodes}
+            nodes.sort(key=lambda node: keys[node])
+            for rank, node in enumerate(nodes):
+                position[node] = rank
+
+    renumber()
+    best = [list(nodes) for nodes in layers]
+    fewest = count_crossings(layers, down, position)
+    for iteration in range(sweeps):
+        if fewest == 0:
+            break
+        if iteration % 2 == 0:
+            sweep(range(1, len(layers)), up)
+        else:
+            sweep(range(len(layers) - 2, -1, -1), down)
+        crossings = count_crossings(layers, down, position)
+        if crossings < fewest:
+            fewest = crossings
+            best = [list(nodes) for nodes in layers]
+    layers[:] = best
+    return fewest
+
+
+def layout_graph(json_data, column_spacing=DEFAULT_COLUMN_SPACING, row_spacing=DEFAULT_ROW_SPACING,
+                 sweeps=DEFAULT_SWEEPS):
+    """
+    Set "position": {"x", "y"} on every component of the graph from its
+    connections and return the graph. Anything that is not a component or a
+    connection between known ids is left alone.
+    """
+    if not isinstance(json_data, dict) or not isinstance(json_data.get("components"), list):
+        return json_data
+    components = [comp for comp in json_data["components"] if isinstance(comp, dict)]
+    node_of = {}
+    for node, comp in enumerate(components):
+        node_of.setdefault(id_key(comp.get("id")), node)
+
+    edges = []
+    for conn in json_data.get("connections") or []:
+        if not isinstance(conn, dict):
+            continue
+        source = node_of.get(id_key(conn.get("fromComponent")))
+        target = node_of.get(id_key(conn.get("toComponent")))
+        if source is not None and target is not None and source != target:
+            edges.append((source, target))
+
+    layer = assign_layers(len(components), edges)
+
+    # Split long edges into one-layer segments through placeholder nodes
+    up = defaultdict(list)
+    down = defaultdict(list)
+    next_node = len(components)
+    for source, target in edges:
+        if layer[source] >= layer[target]:
+            continue  # Closes a cycle
+        previous = source
+        for between in range(layer[source] + 1, layer[target]):
+            layer.append(between)
+            up[next_node].append(previous)
+            down[previous].append(next_node)
+            previous = next_node
+            next_node += 1
+        up[target].append(previous)
+        down[previous].append(target)
+
+    layers = [[] for _ in range(max(layer) + 1 if layer else 0)]
+    for node, index in enumerate(layer):
+        layers[index].append(node)
+    order_layers(layers, up, down, sweeps)
+
+    for index, nodes in enumerate(layers):
+        for row, node in enumerate(nodes):
+            if node < len(components):
+                components[node]["position"] = {"x": index * column_spacing, "y": row * row_spacing}
+    return json_data
@@ -0,0 +1,187 @@
+"""
+Grasshopper Graph Repair
+
+Plans targeted repairs of LLM graphs that fail to parse or to validate, so a
+broken response costs one small follow-up request instead of a full rerun:
+
+    - entries flagged by graph_validator (unknown components or parameters,
+      dangling connections, cycles) are sent back with their diagnostics, and
+      the corrected entries replace them in the graph
+    - for a response that is not valid JSON, the entries that did parse are
+      kept (IncrementalGraphParser) and only the unreadable rest is re-asked
+
+This module only builds the repair message and merges the answer; the request
+itself is sent by grasshopper_component_finder.repair_llm_result, which bounds
+the number of rounds and the time they may take.
+
+Usage:
+    import graph_repair
+    repair = graph_repair.plan_repair(result)
+    if repair is not None:
+        json_data = repair.apply(fixed_json_data)
+"""
+
+import json
+import re
+
+from graph_validator import id_key
+from llm_stream import IncrementalGraphParser
+
+DEFAULT_MAX_REPAIRS = 2
+DEFAULT_REPAIR_BUDGET = 30.0
+
+# Fields the validator adds, not part of the schema the model writes
+ANNOTATIONS = ("guid", "inputIndex", "fromOutputIndex", "toInputIndex")
+
+REPLY_INSTRUCTIONS = ("Reply with only a JSON object with \"components\" and \"connections\" lists holding the "
+                      "corrected entries, in the same format as before. Keep the existing ids, leave an entry out "
+                      "to remove it, and only use components from the list you were given.")
+
+_EXPLANATION_RE = re.compile(r'"explanation"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+def _plain(entry):
+    """Copy of a graph entry without validator annotations"""
+    if not isinstance(entry, dict):
+        return entry
+    plain = {key: value for key, value in entry.items() if key not in ANNOTATIONS}
+    if isinstance(plain.get("parameters"), list):
+        plain["parameters"] = [_plain(parameter) for parameter in plain["parameters"]]
+    return plain
+
+
+def _component_summary(components):
+    names = [f"{comp.get('id')} ({comp.get('name')})" for comp in components if isinstance(comp, dict)]
+    return f"Components in the graph: {', '.join(names) if names else 'none'}\n"
+
+
+def recover_graph(content):
+    """
+    Salvage the complete entries of a response that is not valid JSON.
+    Returns (graph, tail) where tail is the text after the last entry recovered.
+    """
+    parser = IncrementalGraphParser()
+    graph = {"explanation": "", "components": [], "connections": []}
+    for kind, entry in parser.feed(content):
+        graph[kind + "s"].append(entry)
+    match = _EXPLANATION_RE.search(content)
+    if match:
+        try:
+            graph["explanation"] = json.loads(match.group(1))
+        except ValueError:
+            pass
+    return graph, content[parser.entries_end:]
+
+
+class Repair:
+    """One repair round: the message asking for the fix and how to merge the answer"""
+
+    def __init__(self, graph, message, component_ids=(), connection_positions=()):
+        self.graph = graph
+        self.message = message
+        self.component_ids = set(component_ids)
+        self.connection_positions = set(connection_positions)
+
+    def apply(self, fix):
+        """Merge the corrected entries into the graph and return the new graph"""
+        fixed_components = [comp for comp in fix.get("components", []) if isinstance(comp, dict)]
+        fixed_connections = [conn for conn in fix.get("connections", []) if isinstance(conn, dict)]
+        replacements = {id_key(comp.get("id")): comp for comp in fixed_components}
+
+        # Replaced components keep their place, ones left out of the fix are removed
+        components = []
+        removed = set()
+        for comp in self.graph.get("components", []):
+            comp_id = id_key(comp.get("id")) if isinstance(comp, dict) else None
+            if comp_id in self.component_ids:
+                if comp_id in replacements:
+                    components.append(replacements.pop(comp_id))
+                else:
+                    removed.add(comp_id)
+            else:
+                components.append(comp)
+        components.extend(replacements.values())
+
+        connections = [
+            conn for position, conn in enumerate(self.graph.get("connections", []))
+            if position not in self.connection_positions
+            and not (isinstance(conn, dict) and (id_key(conn.get("fromComponent")) in removed
+                                                 or id_key(conn.get("toComponent")) in removed))
+        ]
+        connections.extend(fixed_connections)
+        return dict(self.graph, components=components, connections=connections)
+
+
+def plan_validation_repair(json_data, validation):
+    """Return a Repair for the entries with validation errors, or None if none can be targeted"""
+    if not isinstance(json_data, dict):
+        return None
+    components = json_data.get("components", [])
+    connections = json_data.get("connections", [])
+    component_ids = set()
+    connection_positions = set()
+    problems = []
+    for diagnostic in validation.get("diagnostics", []):
+        if diagnostic.get("level") != "error":
+            continue
+        if "connection" in diagnostic:
+            connection_positions.add(diagnostic["connection"])
+        elif "component" in diagnostic:
+            component_ids.add(diagnostic["component"])
+        elif "components" in diagnostic:
+            # A cycle: every edge between its components is suspect
+            cycle = set(diagnostic["components"])
+            connection_positions.update(
+                position for position, conn in enumerate(connections)
+                if isinstance(conn, dict) and id_key(conn.get("fromComponent")) in cycle
+                and id_key(conn.get("toComponent")) in cycle)
+        else:
+            continue
+        problems.append(f"- {diagnostic['message']}")
+    if not component_ids and not connection_positions:
+        return None
+
+    # Connections of a broken component usually need the same fix
+    connection_positions.update(
+        position for position, conn in enumerate(connections)
+        if isinstance(conn, dict) and (id_key(conn.get("fromComponent")) in component_ids
+                                       or id_key(conn.get("toComponent")) in component_ids))
+
+    fragment = {
+        "components": [_plain(comp) for comp in components
+                       if isinstance(comp, dict) and id_key(comp.get("id")) in component_ids],
+        "connections": [_plain(connections[position]) for position in sorted(connection_positions)],
+    }
+    message = (
+        "Some entries of the graph you returned are invalid:\n"
+        + "\n".join(problems) + "\n\n"
+        + _component_summary(components)
+        + f"\nInvalid entries:\n```json\n{json.dumps(fragment)}\n```\n\n"
+        + REPLY_INSTRUCTIONS
+    )
+    return Repair(json_data, message, component_ids, connection_positions)
+
+
+def plan_parse_repair(content, json_error):
+    """Return a Repair that keeps the entries recovered from content and re-asks for the rest"""
+    graph, tail = recover_graph(content)
+    recovered = len(graph["components"]) + len(graph["connections"])
+    message = (
+        f"Your previous response was not valid JSON ({json_error}).\n"
+        + (f"{recovered} entries were recovered. " if recovered else "")
+        + _component_summary(graph["components"])
+        + f"\nThe part that could not be read:\n```\n{tail.strip()}\n```\n\n"
+        + "Reply with only a JSON object with \"components\" and \"connections\" lists holding the entries "
+        + "from that part, corrected and complete. Do not repeat the entries that were recovered."
+    )
+    return Repair(graph, message)
+
+
+def plan_repair(result):
+    """Return the Repair a parsed LLM result needs, or None when it is fine or cannot be repaired"""
+    if "json_error" in result:
+        return plan_parse_repair(result.get("response", ""), result["json_error"])
+    validation = result.get("validation")
+    if "json_data" in result and validation is not None and not validation.get("valid", True):
+        return plan_validation_repair(result["json_data"], validation)
+    return None
@@ -0,0 +1,367 @@
+"""
+Grasshopper Graph Validator
+
+Checks the component graph returned by the LLM against the catalog before it
+reaches the C# host. Lookups are plain dictionaries built once per catalog
+(name, nickname and type_full_name to catalog entries, and each entry's input
+and output names to their indices), so a whole response is checked in time
+linear in its size.
+
+Every component that resolves gets its "guid", and every connection gets
+"fromOutputIndex" / "toInputIndex", so the host never has to look anything up
+by name. A component name that matches nothing exactly is corrected to the
+closest catalog name when it is similar enough and clearly closer than any
+differently named entry (see name_index.py), with a "corrected_component"
+warning; anything less is an "unknown_component" error left to repair. Connections are checked by parameter type (see
+param_compatibility.py); one that feeds the wrong type is moved to a
+compatible free input or output of the same components when there is one
+("rewired_connection" warning) and reported as "type_mismatch" otherwise.
+Problems are reported as structured diagnostics:
+
+    {"level": "error", "code": "unknown_component", "message": "...", "component": "c1"}
+
+Usage:
+    import graph_validator
+    report = graph_validator.validate_graph(json_data, graph_validator.get_lookup(catalog))
+    if not report["valid"]:
+        print(report["diagnostics"])
+"""
+
+import json
+from collections import defaultdict, deque
+
+from catalog_canonical import is_obsolete
+from name_index import get_name_index, DEFAULT_MIN_MARGIN, DEFAULT_MIN_SIMILARITY
+from param_compatibility import get_compatibility
+
+ERROR = "error"
+WARNING = "warning"
+
+
+def _key(value):
+    return str(value).strip().lower() if value is not None else ""
+
+
+def is_valid_id(value):
+    """Check whether a component id from the model is usable: a string or a number"""
+    return isinstance(value, (str, int)) and not isinstance(value, bool)
+
+
+def id_key(value):
+    """Hashable form of any id the model wrote, so malformed ids can still be reported and repaired"""
+    if value is None or is_valid_id(value):
+        return value
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class ComponentLookup:
+    """Hash lookups from component and parameter names to catalog entries"""
+
+    def __init__(self, components, names=None, types=None):
+        self.components = components
+        # Callables returning the fuzzy name index, only built when a name does not
+        # resolve, and the parameter type compatibility index
+        self._names = names
+        self.types = types
+        self.by_name = defaultdict(list)
+        self.by_guid = {}
+        for doc_id, component in enumerate(components):
+            for field in ("name", "nickname", "type_full_name", "type_name"):
+                value = component.get(field)
+                if value:
+                    entries = self.by_name[_key(value)]
+                    if doc_id not in entries:
+                        entries.append(doc_id)
+            if component.get("guid"):
+                self.by_guid[_key(component["guid"])] = doc_id
+        self.by_name = dict(self.by_name)
+        self._params = {}
+
+    def resolve(self, name, category=None, subcategory=None, guid=None):
+        """
+        Return the catalog position of the component a suggestion refers to, or
+        None. A matching category and non-obsolete entries are preferred when a
+        name is shared by several components.
+        """
+        if guid and _key(guid) in self.by_guid:
+            return self.by_guid[_key(guid)]
+        candidates = self.by_name.get(_key(name))
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+
+        def preference(doc_id):
+            component = self.components[doc_id]
+            return (
+                category is not None and _key(component.get("category")) != _key(category),
+                subcategory is not None and _key(component.get("subcategory")) != _key(subcategory),
+                is_obsolete(component),
+                _key(component.get("name")) != _key(name),
+            )
+        return min(candidates, key=preference)
+
+    def correct(self, name, category=None, subcategory=None, min_similarity=DEFAULT_MIN_SIMILARITY,
+                min_margin=DEFAULT_MIN_MARGIN):
+        """
+        Return (catalog position, similarity) of the closest catalog name to a
+        name that does not resolve, or None when nothing is similar enough or
+        a differently named entry comes within min_margin of it. Equally
+        similar entries of the same name are told apart like in resolve.
+        """
+        if self._names is None or not name:
+            return None
+        matches = self._names().search(name, k=8)
+        if not matches or matches[0][0] < min_similarity:
+            return None
+
+        def preference(match):
+            score, doc_id = match
+            component = self.components[doc_id]
+            return (
+                -score,
+                category is not None and _key(component.get("category")) != _key(category),
+                subcategory is not None and _key(component.get("subcategory")) != _key(subcategory),
+                is_obsolete(component),
+            )
+        score, doc_id = min(matches, key=preference)
+        chosen = _key(self.components[doc_id].get("name"))
+        runner_up = max((other for other, other_id in matches
+                         if _key(self.components[other_id].get("name")) != chosen), default=0.0)
+        if score - runner_up < min_margin:
+            return None
+        return doc_id, score
+
+    def params(self, doc_id):
+        """Return ({input name: index}, {output name: index}) for a catalog entry"""
+        params = self._params.get(doc_id)
+        if params is None:
+            component = self.components[doc_id]
+            params = (self._param_map(component.get("inputs", [])), self._param_map(component.get("outputs", [])))
+            self._params[doc_id] = params
+        return params
+
+    @staticmethod
+    def _param_map(params):
+        mapping = {}
+        for index, param in enumerate(params):
+            if isinstance(param, dict):
+                for field in ("name", "nickname"):
+                    if param.get(field):
+                        mapping.setdefault(_key(param[field]), index)
+            else:
+                mapping.setdefault(_key(param), index)
+        return mapping
+
+
+def get_lookup(catalog):
+    """Return the lookup tables of a ComponentCatalog, building them once"""
+    return catalog.derived("lookup", lambda c: ComponentLookup(c.components, names=lambda: get_name_index(c),
+                                                               types=lambda: get_compatibility(c)))
+
+
+def find_cycle(nodes, edges):
+    """Return the nodes that lie on or behind a cycle (Kahn's algorithm), empty if acyclic"""
+    incoming = {node: 0 for node in nodes}
+    outgoing = defaultdict(list)
+    for source, target in edges:
+        outgoing[source].append(target)
+        incoming[target] += 1
+    queue = deque(node for node, count in incoming.items() if count == 0)
+    visited = 0
+    while queue:
+        node = queue.popleft()
+        visited += 1
+        for target in outgoing[node]:
+            incoming[target] -= 1
+            if incoming[target] == 0:
+                queue.append(target)
+    if visited == len(incoming):
+        return []
+    return [node for node, count in incoming.items() if count > 0]
+
+
+def _param_name(param):
+    return param.get("name") if isinstance(param, dict) else param
+
+
+def check_types(connections, resolved, lookup, report):
+    """
+    Check the parameter types of every connection whose ends and parameters
+    resolved. A wrong connection is moved to a compatible input of its target
+    that nothing feeds yet, or else to a compatible output of its source.
+    """
+    index = lookup.types()
+    fed = {(conn.get("toComponent"), conn.get("toInputIndex")) for conn in connections
+           if isinstance(conn, dict) and "toInputIndex" in conn}
+    for position, connection in enumerate(connections):
+        if not isinstance(connection, dict) or "fromOutputIndex" not in connection or "toInputIndex" not in connection:
+            continue
+        source_doc = resolved.get(connection.get("fromComponent"))
+        target_doc = resolved.get(connection.get("toComponent"))
+        if source_doc is None or target_doc is None:
+            continue
+        output_index = connection["fromOutputIndex"]
+        input_index = connection["toInputIndex"]
+        if index.is_edge_valid(source_doc, output_index, target_doc, input_index):
+            continue
+
+        source, target = lookup.components[source_doc], lookup.components[target_doc]
+        source_type = index.type_name(index.output_type(source_doc, output_index))
+        target_type = index.type_name(index.input_type(target_doc, input_index))
+        original = f"{source.get('name')}.{connection.get('fromOutput')} -> {target.get('name')}.{connection.get('toInput')}"
+        inputs = [i for i in index.compatible_inputs(source_doc, output_index, target_doc)
+                  if (connection["toComponent"], i) not in fed]
+        if inputs:
+            fed.discard((connection["toComponent"], input_index))
+            fed.add((connection["toComponent"], inputs[0]))
+            connection["toInput"] = _param_name(target["inputs"][inputs[0]])
+            connection["toInputIndex"] = inputs[0]
+        else:
+            outputs = index.compatible_outputs(source_doc, target_doc, input_index)
+            if not outputs:
+                report(ERROR, "type_mismatch",
+                       f"{original} connects {source_type} to {target_type}, which it cannot convert to",
+                       connection=position)
+                continue
+            connection["fromOutput"] = _param_name(source["outputs"][outputs[0]])
+            connection["fromOutputIndex"] = outputs[0]
+        report(WARNING, "rewired_connection",
+               f"{original} connected {source_type} to {target_type}, rewired to "
+               f"{source.get('name')}.{connection['fromOutput']} -> {target.get('name')}.{connection['toInput']}",
+               connection=position)
+
+
+def validate_graph(json_data, lookup):
+    """
+    Validate the LLM graph in place and return {"valid": bool, "diagnostics": [...]}.
+    Resolved components get "guid"; parameters get "inputIndex"; connections
+    get "fromOutputIndex" and "toInputIndex".
+    """
+    diagnostics = []
+
+    def report(level, code, message, **where):
+        diagnostics.append(dict({"level": level, "code": code, "message": message}, **where))
+
+    if not isinstance(json_data, dict):
+        report(ERROR, "invalid_structure", "The response is not a JSON object")
+        return {"valid": False, "diagnostics": diagnostics}
+    components = json_data.get("components", [])
+    connections = json_data.get("connections", [])
+    if not isinstance(components, list) or not isinstance(connections, list):
+        report(ERROR, "invalid_structure", "\"components\" and \"connections\" must be lists")
+        return {"valid": False, "diagnostics": diagnostics}
+    # Indices from an earlier pass may point at parameters of another component
+    for connection in connections:
+        if isinstance(connection, dict):
+            connection.pop("fromOutputIndex", None)
+            connection.pop("toInputIndex", None)
+
+    # component id -> catalog position (None when it did not resolve)
+    resolved = {}
+    for position, component in enumerate(components):
+        if not isinstance(component, dict):
+            report(ERROR, "invalid_structure", f"Component #{position} is not an object")
+            continue
+        component_id = component.get("id")
+        if component_id is None:
+            report(ERROR, "missing_id", f"Component #{position} ({component.get('name')}) has no id")
+        elif not is_valid_id(component_id):
+            report(ERROR, "invalid_structure",
+                   f"Component #{position} ({component.get('name')}) has id {id_key(component_id)}, "
+                   f"which is not a string or number", component=id_key(component_id))
+            continue
+        elif component_id in resolved:
+            report(ERROR, "duplicate_id", f"Component id {component_id} is used more than once", component=component_id)
+            continue
+        parameters = component.get("parameters") or []
+        if not isinstance(parameters, list) or not all(isinstance(parameter, dict) for parameter in parameters):
+            report(ERROR, "invalid_structure",
+                   f"Component {component_id} ({component.get('name')}) needs \"parameters\" as a list of objects",
+                   component=component_id)
+            parameters = parameters if isinstance(parameters, list) else []
+
+        doc_id = lookup.resolve(component.get("name"), component.get("category"), component.get("subcategory"),
+                                component.get("guid"))
+        if doc_id is None:
+            correction = lookup.correct(component.get("name"), component.get("category"),
+                                        component.get("subcategory"))
+            if correction is not None:
+                doc_id, similarity = correction
+                entry = lookup.components[doc_id]
+                report(WARNING, "corrected_component",
+                       f"Unknown component {component.get('name')}, using {entry.get('name')} "
+                       f"(similarity {similarity:.2f})", component=component_id)
+                for field in ("name", "category", "subcategory"):
+                    if entry.get(field) is not None:
+                        component[field] = entry[field]
+        if component_id is not None:
+            resolved[component_id] = doc_id
+        if doc_id is None:
+            report(ERROR, "unknown_component", f"Unknown component {component.get('name')}", component=component_id)
+            continue
+
+        entry = lookup.components[doc_id]
+        if entry.get("guid"):
+            component["guid"] = entry["guid"]
+        inputs, outputs = lookup.params(doc_id)
+        for parameter in parameters:
+            if not isinstance(parameter, dict):
+                continue
+            index = inputs.get(_key(parameter.get("name")))
+            if index is not None:
+                parameter["inputIndex"] = index
+            elif inputs:
+                report(ERROR, "unknown_input", f"{entry.get('name')} has no input named {parameter.get('name')}",
+                       component=component_id)
+
+    edges = []
+    for position, connection in enumerate(connections):
+        if not isinstance(connection, dict):
+            report(ERROR, "invalid_structure", f"Connection #{position} is not an object")
+            continue
+        source = connection.get("fromComponent")
+        target = connection.get("toComponent")
+        if not all(end is None or is_valid_id(end) for end in (source, target)):
+            report(ERROR, "invalid_structure",
+                   f"Connection #{position} refers to components {id_key(source)} and {id_key(target)}; "
+                   f"ids must be strings or numbers", connection=position)
+            continue
+        dangling = False
+        for end in (source, target):
+            if end not in resolved:
+                report(ERROR, "dangling_connection", f"Connection #{position} refers to missing component {end}",
+                       connection=position)
+                dangling = True
+        if dangling:
+            continue
+        edges.append((source, target))
+
+        for end, field, index_field, side in ((source, "fromOutput", "fromOutputIndex", 1),
+                                              (target, "toInput", "toInputIndex", 0)):
+            doc_id = resolved[end]
+            if doc_id is None:
+                continue
+            names = lookup.params(doc_id)[side]
+            index = names.get(_key(connection.get(field)))
+            if index is not None:
+                connection[index_field] = index
+            elif names:
+                kind = "output" if side else "input"
+                report(ERROR, f"unknown_{kind}",
+                       f"{lookup.components[doc_id].get('name')} has no {kind} named {connection.get(field)}",
+                       connection=position, component=end)
+            else:
+                report(WARNING, "no_parameter_data",
+                       f"The catalog has no parameters for {lookup.components[doc_id].get('name')}",
+                       connection=position, component=end)
+
+    if lookup.types is not None:
+        check_types(connections, resolved, lookup, report)
+
+    cycle = find_cycle(resolved.keys(), edges)
+    if cycle:
+        report(ERROR, "cycle", f"Connections form a cycle through {', '.join(str(node) for node in cycle)}",
+               components=cycle)
+
+    return {"valid": not any(d["level"] == ERROR for d in diagnostics), "diagnostics": diagnostics}
@@ -5,8 +5,15 @@ Grasshopper Component Finder
 This script uses an LLM to suggest appropriate Grasshopper components for a given task.
 It takes a natural language prompt and returns component suggestions with explanations.
 
+Importing the module is cheap: requests, numpy and argparse are imported and the
+catalog and its indexes are built on first use, so a host embedding the
+interpreter does not pay for them on its first solve. warm_up does that work
+on a background thread ahead of the first prompt (startup_check.py keeps the
+import time within budget).
+
 Usage:
     import grasshopper_component_finder
+    grasshopper_component_finder.warm_up("path/to/components.json")
     grasshopper_component_finder.main(prompt="Create a grid of circles", 
                                       components_file="path/to/components.json", 
                                       api_key="your_api_key")
@@ -14,366 +21,801 @@ Usage:
 Requirements:
     - requests
     - argparse (for command-line usage)
+    - numpy (optional, for the semantic ranker)
 """
 
 import json
-import requests
 import os
 import sys
-import argparse
+import sqlite3
+import threading
+import time
 
-class grasshopper_component_finder:
+from catalog_canonical import get_rank_weights, rank_weights
+from compact_schema import expand_graph, is_compact
+from component_catalog import get_catalog
+from component_index import (BM25Index, NAME_MATCH_POOL, boost_name_matches, get_bm25_index, get_component_names,
+                             tokenize)
+import semantic_index
+from response_cache import get_cache as get_response_cache, make_key as make_cache_key
+from prompt_builder import build_system, instruction_block, get_snippet_table, DEFAULT_INPUT_BUDGET, DEFAULT_MAX_TOKENS
+import finder_metrics
+from finder_metrics import Metrics, record as record_metrics
+from graph_layout import layout_graph
+from graph_repair import plan_repair, DEFAULT_MAX_REPAIRS, DEFAULT_REPAIR_BUDGET
+from graph_validator import get_lookup, validate_graph
+from llm_stream import IncrementalGraphParser, iter_sse_events, iter_text_deltas
+from llm_transport import (get_transport, configure_transport, DEFAULT_CONNECT_TIMEOUT,
+                           DEFAULT_READ_TIMEOUT, DEFAULT_MAX_RETRIES)
+from name_index import get_name_index
+from param_compatibility import get_compatibility
 
-    def load_component_database(file_path):
-        """Load component information from JSON file"""
-        try:
-            if not os.path.exists(file_path):
-                return {"error": f"File not found: {file_path}"}
-        
-            with open(file_path, 'r') as f:
-                components = json.load(f)
-        
-            # Check if we have a meaningful JSON structure
-            if isinstance(components, list) and len(components) > 0:
-                print(f"Loaded {len(components)} components")
-                return {"components": components}
-            else:
-                return {"error": "Invalid component data structure"}
-        except Exception as e:
-            return {"error": f"Error loading component database: {str(e)}"}
-
-    def select_relevant_components(components, prompt, max_components=15):
-        """
-        Select the most relevant components based on the prompt.
-        This is a simple keyword matching approach.
-        A more sophisticated approach could use embeddings for semantic matching.
-        """
-        # Define some common keywords that might appear in prompts
-        keyword_map = {
-            "circle": ["Circle", "Radius", "Center"],
-            "line": ["Line", "Start", "End"],
-            "point": ["Point", "Construct Point"],
-            "curve": ["Curve", "Interpolate", "Divide Curve"],
-            "surface": ["Surface", "Boundary Surface", "Extrude"],
-            "move": ["Move", "Transform"],
-            "rotate": ["Rotate", "Orient"],
-            "scale": ["Scale", "Transform"],
-            "slider": ["Number Slider", "Slider"],
-            "panel": ["Panel"],
-            "divide": ["Divide", "Divide Curve", "Split"],
-            "boolean": ["Boolean", "Difference", "Union", "Intersection"],
-            "intersection": ["Intersection", "Brep|Brep", "Curve|Curve"],
-            "extrude": ["Extrude", "ExtrudeCrv"],
-            "loft": ["Loft", "LoftSrf"],
-            "random": ["Random", "Jitter", "Populate"],
-            "grid": ["Grid", "Rectangular", "Hexagonal"],
-            "vector": ["Vector", "Direction", "Vector XYZ"],
-            "array": ["Series", "Range", "Repeat"],
-            "color": ["Color", "Gradient", "ColourRGB"],
-            "mesh": ["Mesh", "MeshSrf", "MeshPlane"],
-            "text": ["Text", "TextTag", "FontList"],
-        }
-    
-        # Convert prompt to lowercase for case-insensitive matching
-        prompt_lower = prompt.lower()
-    
-        # Score components based on keyword relevance
-        scored_components = []
-        for component in components:
-            score = 0
-            component_name = component.get("name", "").lower()
-            component_description = component.get("description", "").lower()
-        
-            # Check if component name or description directly contains words from the prompt
-            for word in prompt_lower.split():
-                if word in component_name or word in component_description:
-                    score += 3
-        
-            # Check for relevant keywords
-            for keyword, related_components in keyword_map.items():
-                if keyword in prompt_lower:
-                    for related in related_components:
-                        if related.lower() in component_name:
-                            score += 5
-        
-            # Only include components with a positive score
-            if score > 0:
-                scored_components.append((score, component))
-    
-        # Sort by score (descending) and take top N
-        scored_components.sort(reverse=True, key=lambda x: x[0])
-        return [component for score, component in scored_components[:max_components]]
-
-    def call_llm_api(prompt, components_data, api_key):
-        """Call LLM API with the prompt and component information"""
-        # You can replace this with any LLM API you have access to
-        # This example uses Anthropic's Claude API
-        url = "https://api.anthropic.com/v1/messages"
-        headers = {
-            "x-api-key": api_key,
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json"
-        }
-    
-        if "error" in components_data:
-            # If we couldn't load components, let the LLM know
-            components_info = f"[ERROR LOADING COMPONENTS: {components_data['error']}]"
-            relevant_components = []
+# Model used for every request
+MODEL = "claude-3-opus-20240229"  # Or use a different model as needed
+
+# Bump whenever the system prompt changes so cached responses are not reused
+SYSTEM_PROMPT_VERSION = "2"
+
+# "local" lays components out with graph_layout, "model" asks the LLM for positions
+LAYOUTS = ("local", "model")
+DEFAULT_LAYOUT = "local"
+
+# "compact" numbers the candidates and asks for the terse compact_schema reply
+SCHEMAS = ("full", "compact")
+DEFAULT_SCHEMA = "full"
+
+# Common keywords that might appear in prompts, mapped to the components they refer to
+KEYWORD_MAP = {
+    "circle": ["Circle", "Radius", "Center"],
+    "line": ["Line", "Start", "End"],
+    "point": ["Point", "Construct Point"],
+    "curve": ["Curve", "Interpolate", "Divide Curve"],
+    "surface": ["Surface", "Boundary Surface", "Extrude"],
+    "move": ["Move", "Transform"],
+    "rotate": ["Rotate", "Orient"],
+    "scale": ["Scale", "Transform"],
+    "slider": ["Number Slider", "Slider"],
+    "panel": ["Panel"],
+    "divide": ["Divide", "Divide Curve", "Split"],
+    "boolean": ["Boolean", "Difference", "Union", "Intersection"],
+    "intersection": ["Intersection", "Brep|Brep", "Curve|Curve"],
+    "extrude": ["Extrude", "ExtrudeCrv"],
+    "loft": ["Loft", "LoftSrf"],
+    "random": ["Random", "Jitter", "Populate"],
+    "grid": ["Grid", "Rectangular", "Hexagonal"],
+    "vector": ["Vector", "Direction", "Vector XYZ"],
+    "array": ["Series", "Range", "Repeat"],
+    "color": ["Color", "Gradient", "ColourRGB"],
+    "mesh": ["Mesh", "MeshSrf", "MeshPlane"],
+    "text": ["Text", "TextTag", "FontList"],
+}
+
+# Query weight of terms added through KEYWORD_MAP, relative to words in the prompt
+KEYWORD_WEIGHT = 1.5
+
+# Background warm-ups by (components_file, ranker), see warm_up
+_warm_ups = {}
+_warm_ups_lock = threading.Lock()
+
+
+def load_component_database(file_path):
+    """
+    Load component information from JSON file.
+    The parsed catalog is cached for the lifetime of the interpreter and only
+    re-read when the file's modification time or size changes. A compiled
+    binary catalog next to the JSON file is used instead when it is current.
+    """
+    try:
+        catalog = get_catalog(file_path)
+        print(f"Loaded {len(catalog.components)} components")
+        return {"components": catalog.components, "catalog": catalog}
+    except FileNotFoundError as e:
+        return {"error": str(e)}
+    except ValueError as e:
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": f"Error loading component database: {str(e)}"}
+
+
+def rank_components(components, prompt, max_components=15, catalog=None, ranker="bm25"):
+    """
+    Rank components against the prompt and return the positions of the best
+    ones in the component list, best first.
+    By default components are ranked with BM25 over an inverted index of their
+    name, nickname, description, category and subcategory, and common keywords
+    in the prompt are expanded to the component names they usually refer to.
+    With ranker="semantic" (requires numpy) a hashed n-gram vector index is
+    used instead, which also matches prompts that share no exact words.
+    Either way obsolete components and components without parameter data
+    are down-ranked (see catalog_canonical.rank_weight). BM25 results whose
+    whole component name is written in the prompt are boosted
+    (see component_index.boost_name_matches).
+    Indexes are built once per catalog when one is given.
+    """
+    weights = get_rank_weights(catalog) if catalog is not None else rank_weights(components)
+    if ranker == "semantic" and semantic_index.is_available():
+        if catalog is not None:
+            index = semantic_index.get_semantic_index(catalog)
         else:
-            # Find relevant components based on the prompt
-            all_components = components_data.get("components", [])
-            relevant_components = select_relevant_components(all_components, prompt)
-        
-            # Format component information for the prompt
-            components_info = []
-            for comp in relevant_components:
-                comp_info = f"Component: {comp.get('name', 'Unknown')} (Category: {comp.get('category', 'Unknown')}"
-                if comp.get('subcategory'):
-                    comp_info += f", Subcategory: {comp.get('subcategory')}"
-                comp_info += ")\n"
-            
-                if comp.get('description'):
-                    comp_info += f"Description: {comp.get('description')}\n"
-            
-                # Format inputs
-                inputs = []
-                for inp in comp.get('inputs', []):
-                    if isinstance(inp, dict):
-                        input_name = inp.get('name', 'Unknown')
-                        input_desc = inp.get('description', '')
-                        input_type = inp.get('type', '')
-                        inputs.append(f"{input_name} ({input_type}): {input_desc}")
-                    else:
-                        inputs.append(str(inp))
-            
-                if inputs:
-                    comp_info += f"Inputs: {', '.join(inputs)}\n"
-            
-                # Format outputs
-                outputs = []
-                for out in comp.get('outputs', []):
-                    if isinstance(out, dict):
-                        output_name = out.get('name', 'Unknown')
-                        output_desc = out.get('description', '')
-                        output_type = out.get('type', '')
-                        outputs.append(f"{output_name} ({output_type}): {output_desc}")
-                    else:
-                        outputs.append(str(out))
-            
-                if outputs:
-                    comp_info += f"Outputs: {', '.join(outputs)}\n"
-            
-                components_info.append(comp_info)
-        
-            components_info = "\n".join(components_info)
-    
-        # Create the system prompt with component information
-        system_prompt = f"""You are an assistant that helps users find and use the right Grasshopper components.
-    When given a task description, suggest the appropriate Grasshopper components to accomplish it.
-    Only suggest components that exist in the Grasshopper ecosystem.
-
-    Here are Grasshopper components that might be relevant to the user's request:
-
-    {components_info}
-
-    Your task is to provide a JSON response that a C# program can use to automatically create and connect 
-    Grasshopper components on the canvas. Your response MUST include a valid JSON object with this structure:
-
-    ```json
-    {{
-      "explanation": "A brief explanation of the approach",
-      "components": [
-        {{
-          "id": "unique_id_1",
-          "name": "ComponentName",
-          "category": "Category",
-          "subcategory": "Subcategory",
-          "position": {{
-            "x": 0,
-            "y": 0
-          }},
-          "parameters": [
-            {{
-              "name": "ParameterName",
-              "value": "Value"
-            }}
-          ]
-        }}
-      ],
-      "connections": [
-        {{
-          "fromComponent": "unique_id_1",
-          "fromOutput": "OutputName",
-          "toComponent": "unique_id_2",
-          "toInput": "InputName"
-        }}
-      ]
-    }}
-    ```
-
-    Follow these guidelines:
-    1. Only suggest components that exist in the provided list
-    2. Position components logically on the canvas (left to right, data flow)
-    3. Make sure all connections are valid (outputs connect to appropriate inputs)
-    4. For simple number parameters, use the "parameters" field
-    5. Canvas positions should use relative coordinates, with the first component at (0,0) and subsequent components at reasonable distances (e.g., 100 units apart)
-
-    Be sure your output is a VALID JSON object. Do not include any text before or after the JSON. The entire response must be parseable as a single JSON object.
+            index = semantic_index.SemanticIndex.build(components)
+        results = index.search(prompt, k=max_components, weights=weights)
+        return [doc_id for score, doc_id in results]
+
+    if catalog is not None:
+        index = get_bm25_index(catalog)
+    else:
+        index = BM25Index(components)
+
+    # Expand known keywords to the names of related components
+    prompt_lower = prompt.lower()
+    expansions = {}
+    for keyword, related_components in KEYWORD_MAP.items():
+        if keyword in prompt_lower:
+            for related in related_components:
+                for term in tokenize(related):
+                    expansions[term] = KEYWORD_WEIGHT
+
+    # Rescore a wider pool so a component named in the prompt can rise into the top
+    results = index.search(prompt, k=max(max_components, NAME_MATCH_POOL), extra_terms=expansions, weights=weights)
+    names = get_component_names(catalog) if catalog is not None else [comp.get("name") for comp in components]
+    results = boost_name_matches(results, prompt, names, max_components)
+    return [doc_id for score, doc_id in results]
+
+
+def select_relevant_components(components, prompt, max_components=15, catalog=None, ranker="bm25"):
     """
+    Select the most relevant components based on the prompt.
+    See rank_components for how they are ranked.
+    """
+    if catalog is not None:
+        components = catalog.components
+    doc_ids = rank_components(components, prompt, max_components, catalog, ranker)
+    return [components[doc_id] for doc_id in doc_ids]
+
+
+def build_llm_request(prompt, components_data, ranker="bm25", input_budget=DEFAULT_INPUT_BUDGET,
+                      max_tokens=DEFAULT_MAX_TOKENS, layout=DEFAULT_LAYOUT, schema=DEFAULT_SCHEMA,
+                      doc_ids=None, metrics=None):
+    """
+    Select the relevant components for the prompt and build the API request.
+    The fixed instructions and the component descriptions go in two system
+    blocks, the prefix marked for prompt caching once it is long enough (see
+    prompt_builder), and the descriptions are shortened by rank to fit
+    input_budget estimated tokens.
+    With layout="local" the model is not asked for canvas positions, and with
+    schema="compact" the candidates are numbered for the compact reply format.
+    doc_ids skips ranking when the candidate positions are already known.
+    The "select" and "format" stages are timed on metrics when one is given.
+    Returns the request payload and the list of components it describes.
+    """
+    metrics = metrics if metrics is not None else Metrics()
+    user_message = f"I want to accomplish this in Grasshopper: {prompt}"
+
+    if "error" in components_data:
+        # If we couldn't load components, let the LLM know
+        error_info = f"[ERROR LOADING COMPONENTS: {components_data['error']}]"
+        system_blocks, relevant_components = build_system([], input_budget, user_message,
+                                                          positions=layout != "local", compact=schema == "compact")
+        system_blocks[-1]["text"] += error_info
+    else:
+        # Find relevant components based on the prompt
+        catalog = components_data.get("catalog")
+        all_components = catalog.components if catalog is not None else components_data.get("components", [])
+        with metrics.stage("select"):
+            if doc_ids is None:
+                doc_ids = rank_components(all_components, prompt, catalog=catalog, ranker=ranker)
+            candidates = [all_components[doc_id] for doc_id in doc_ids]
     
-        data = {
-            "model": "claude-3-opus-20240229",  # Or use a different model as needed
-            "system": system_prompt,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": f"I want to accomplish this in Grasshopper: {prompt}"
-                }
-            ],
-            "max_tokens": 1000
-        }
-    
+        # Format component information for the prompt within the budget, using
+        # the snippets rendered once per catalog when there is one
+        with metrics.stage("format"):
+            snippets = None
+            if catalog is not None:
+                table = get_snippet_table(catalog)
+                snippets = [table.get(doc_id) for doc_id in doc_ids]
+            system_blocks, relevant_components = build_system(candidates, input_budget, user_message,
+                                                              snippets=snippets, positions=layout != "local",
+                                                              compact=schema == "compact")
+
+    data = {
+        "model": MODEL,
+        "system": system_blocks,
+        "messages": [
+            {
+                "role": "user",
+                "content": user_message
+            }
+        ],
+        "max_tokens": max_tokens
+    }
+    return data, relevant_components
+
+
+def parse_llm_content(content):
+    """Extract and validate the JSON object in a completion"""
+    try:
+        # Remove any markdown code block indicators if present
+        if "```json" in content and "```" in content:
+            content = content.split("```json", 1)[1].split("```", 1)[0].strip()
+        elif "```" in content:
+            content = content.split("```", 1)[1].split("```", 1)[0].strip()
+        
+        # Parse the JSON to validate it
+        json_data = json.loads(content)
+        return {"response": content, "json_data": json_data}
+    except json.JSONDecodeError as e:
+        return {"response": content, "json_error": str(e)}
+
+
+def lookup_cached_response(cache, prompt, relevant_components, layout=DEFAULT_LAYOUT, schema=DEFAULT_SCHEMA,
+                           input_budget=DEFAULT_INPUT_BUDGET, max_tokens=DEFAULT_MAX_TOKENS):
+    """Return (cache_key, cached result or None); the key is None without a cache"""
+    if cache is None:
+        return None, None
+    guids = [comp.get("guid", "") for comp in relevant_components]
+    # Every layout and schema uses its own system prompt
+    prompt_version = SYSTEM_PROMPT_VERSION
+    if schema != "full":
+        prompt_version += f"-{schema}"
+    elif layout != "model":
+        prompt_version += f"-{layout}"
+    cache_key = make_cache_key(prompt, guids, MODEL, prompt_version, input_budget, max_tokens)
+    cached = cache.get(cache_key)
+    if cached is None:
+        return cache_key, None
+    return cache_key, {"response": cached["response"], "json_data": cached["json_data"], "cache": "hit"}
+
+
+def expand_result(result, candidates):
+    """Expand a compact_schema reply into the components/connections JSON"""
+    if is_compact(result.get("json_data")):
+        result["json_data"] = expand_graph(result["json_data"], candidates)
+    return result
+
+
+def validate_result(result, components_data):
+    """
+    Check the graph in a result against the catalog and store the report under
+    "validation". Resolved GUIDs and parameter indices are added to json_data.
+    """
+    catalog = components_data.get("catalog")
+    if catalog is not None and "json_data" in result:
+        result["validation"] = validate_graph(result["json_data"], get_lookup(catalog))
+    return result
+
+
+def is_cacheable(result):
+    """
+    Check whether a result may be stored in the response cache: only graphs
+    that passed validation, with no failed repair. Anything else would be
+    replayed unrepaired on every hit.
+    """
+    return ("json_data" in result and result.get("validation", {}).get("valid") is True
+            and "error" not in result.get("repair", {}))
+
+
+def layout_result(result, layout=DEFAULT_LAYOUT):
+    """Place the components of a result on the canvas locally when layout is local"""
+    if layout == "local" and "json_data" in result:
+        layout_graph(result["json_data"])
+    return result
+
+
+def attach_metrics(result, metrics):
+    """Store the metrics of a prompt under "metrics" and hand them to the registered sinks"""
+    result["metrics"] = metrics.as_dict()
+    record_metrics(result["metrics"])
+    return result
+
+
+def repair_llm_result(result, request, components_data, api_key, transport=None, max_repairs=DEFAULT_MAX_REPAIRS,
+                      repair_budget=DEFAULT_REPAIR_BUDGET, schema=DEFAULT_SCHEMA, metrics=None, deadline=None):
+    """
+    Fix a result that failed to parse or to validate by asking the LLM only
+    for the broken fragment (see graph_repair) and merging its answer.
+    At most max_repairs requests are made, and none after repair_budget
+    seconds. request is the payload of the original call; its system blocks
+    are reused so a prefix marked for caching is read from the cache. When a repair was attempted the
+    result reports "repair" with the rounds made and the time they took.
+    Repairs always use the full schema, so a compact request has its
+    instruction block swapped. Rounds and token usage are counted on metrics.
+    deadline (a time.monotonic() value) ends the repairs earlier than the budget.
+    """
+    transport = transport or get_transport()
+    if schema == "compact":
+        instructions, _ = instruction_block(positions=False)
+        request = dict(request, system=[instructions] + request["system"][1:])
+    started = time.monotonic()
+    deadline = started + repair_budget if deadline is None else min(deadline, started + repair_budget)
+    rounds = 0
+    error = None
+    while rounds < max_repairs and time.monotonic() < deadline:
+        repair = plan_repair(result)
+        if repair is None:
+            break
+        rounds += 1
+        question = f"{request['messages'][0]['content']}\n\n{repair.message}"
+        payload = dict(request, messages=[{"role": "user", "content": question}])
         try:
-            response = requests.post(url, headers=headers, json=data)
-            response.raise_for_status()
+            response = transport.post(payload, api_key, deadline=deadline)
             response_data = response.json()
-            content = response_data["content"][0]["text"]
-        
-            # Try to extract and validate JSON from the response
-            try:
-                # Remove any markdown code block indicators if present
-                if "```json" in content and "```" in content:
-                    content = content.split("```json", 1)[1].split("```", 1)[0].strip()
-                elif "```" in content:
-                    content = content.split("```", 1)[1].split("```", 1)[0].strip()
-                
-                # Parse the JSON to validate it
-                json_data = json.loads(content)
-                return {"response": content, "json_data": json_data}
-            except json.JSONDecodeError as e:
-                return {"response": content, "json_error": str(e)}
-            
+            if metrics is not None:
+                metrics.count("repair_rounds")
+                metrics.add_usage(response_data.get("usage"))
+            fix = parse_llm_content(response_data["content"][0]["text"])
         except Exception as e:
-            return {"error": f"Error calling LLM API: {str(e)}"}
+            error = f"Error calling LLM API: {str(e)}"
+            break
+        if not isinstance(fix.get("json_data"), dict):
+            continue
+        json_data = repair.apply(fix["json_data"])
+        result = validate_result({"response": json.dumps(json_data), "json_data": json_data}, components_data)
 
-    def main(prompt=None, components_file=None, api_key=None, output_file=None, json_only=False):
-        """
-        Main function that can be called directly with parameters or from command line
-    
-        Args:
-            prompt (str): Natural language prompt describing the task
-            components_file (str): Path to the component database JSON file
-            api_key (str): LLM API key
-            output_file (str, optional): Output file path (default is None, prints to stdout)
-            json_only (bool, optional): Output only the JSON data (default is False)
+    if rounds:
+        result["repair"] = {"rounds": rounds, "seconds": round(time.monotonic() - started, 3)}
+        if error is not None:
+            result["repair"]["error"] = error
+    return result
+
+
+def call_llm_api(prompt, components_data, api_key, ranker="bm25", cache=None, transport=None,
+                 input_budget=DEFAULT_INPUT_BUDGET, max_tokens=DEFAULT_MAX_TOKENS,
+                 max_repairs=DEFAULT_MAX_REPAIRS, repair_budget=DEFAULT_REPAIR_BUDGET, layout=DEFAULT_LAYOUT,
+                 schema=DEFAULT_SCHEMA, metrics=None, deadline=None):
+    """
+    Call LLM API with the prompt and component information.
+    When a ResponseCache is given, a stored response for the same prompt,
+    components, model, system prompt version and token limits is returned
+    without a request.
+    The result reports "cache" as "hit" or "miss", and "validation" holds the
+    diagnostics of checking the graph against the catalog (see graph_validator).
+    Requests go through the shared pooled transport unless one is given.
+    input_budget caps the estimated input tokens and max_tokens the output.
+    Invalid graphs get up to max_repairs targeted repair requests within
+    repair_budget seconds (see repair_llm_result). With layout="local" the
+    component positions are computed by graph_layout instead of the model.
+    schema="compact" asks for the terse compact_schema reply, which is
+    expanded locally and always laid out locally.
+    Stage timings and counters are returned under "metrics" (see
+    finder_metrics); pass a Metrics to include stages timed by the caller.
+    deadline is an optional time.monotonic() value no request may run past.
+    """
+    # You can replace this with any LLM API you have access to
+    # This example uses Anthropic's Claude API
+    transport = transport or get_transport()
+    metrics = metrics if metrics is not None else Metrics()
+    if schema == "compact":
+        layout = "local"
+    data, relevant_components = build_llm_request(prompt, components_data, ranker, input_budget, max_tokens,
+                                                  layout, schema, metrics=metrics)
+    metrics.count("candidates", len(relevant_components))
+
+    cache_key, cached = lookup_cached_response(cache, prompt, relevant_components, layout, schema,
+                                               input_budget, max_tokens)
+    if cached is not None:
+        metrics.count("cache_hits")
+        with metrics.stage("validate"):
+            validate_result(cached, components_data)
+        with metrics.stage("layout"):
+            layout_result(cached, layout)
+        return attach_metrics(cached, metrics)
+    if cache_key is not None:
+        metrics.count("cache_misses")
+
+    try:
+        with metrics.stage("request"):
+            response = transport.post(data, api_key, deadline=deadline)
+            response_data = response.json()
+        # Headers arrive with the first byte of the reply
+        metrics.add_time("first_byte", response.elapsed.total_seconds())
+        metrics.add_usage(response_data.get("usage"))
+        content = response_data["content"][0]["text"]
     
-        Returns:
-            dict: Result of the operation including any JSON data or errors
-        """
-        # Check if being called from command line
-        if prompt is None and components_file is None and api_key is None and len(sys.argv) > 1:
-            # Set up command line arguments
-            parser = argparse.ArgumentParser(description='Grasshopper Component Finder')
-            parser.add_argument('--prompt', type=str, required=True, help='Natural language prompt describing the task')
-            parser.add_argument('--components', type=str, required=True, help='Path to the component database JSON file')
-            parser.add_argument('--api-key', type=str, required=True, help='LLM API key')
-            parser.add_argument('--output', type=str, help='Output file path (optional, default is stdout)')
-            parser.add_argument('--json-only', action='store_true', help='Output only the JSON data')
+        # Try to extract and validate JSON from the response
+        with metrics.stage("parse"):
+            result = expand_result(parse_llm_content(content), relevant_components)
+        with metrics.stage("validate"):
+            result = validate_result(result, components_data)
+        with metrics.stage("repair"):
+            result = repair_llm_result(result, data, components_data, api_key, transport, max_repairs,
+                                       repair_budget, schema, metrics, deadline)
+        with metrics.stage("layout"):
+            result = layout_result(result, layout)
+        if cache_key is not None and is_cacheable(result):
+            cache.put(cache_key, result["response"], result["json_data"])
+        result["cache"] = "miss"
+        return attach_metrics(result, metrics)
         
-            args = parser.parse_args()
-        
-            prompt = args.prompt
-            components_file = args.components
-            api_key = args.api_key
-            output_file = args.output
-            json_only = args.json_only
+    except Exception as e:
+        metrics.count("errors")
+        return attach_metrics({"error": f"Error calling LLM API: {str(e)}"}, metrics)
+
+
+def stream_llm_api(prompt, components_data, api_key, ranker="bm25", cache=None, transport=None, on_event=None,
+                   input_budget=DEFAULT_INPUT_BUDGET, max_tokens=DEFAULT_MAX_TOKENS,
+                   max_repairs=DEFAULT_MAX_REPAIRS, repair_budget=DEFAULT_REPAIR_BUDGET, layout=DEFAULT_LAYOUT,
+                   schema=DEFAULT_SCHEMA, metrics=None):
+    """
+    Streaming variant of call_llm_api.
+    Yields {"type": "component" | "connection", "data": {...}} for every entry of
+    the response as soon as it is complete, then {"type": "result", "data": result}
+    where result is what call_llm_api would have returned (including any repair).
+    Locally computed positions are only in the final result. Compact replies
+    cannot be expanded before they are complete, so with schema="compact"
+    the entries are emitted together just before the result. Every event is also
+    passed to on_event when a callback is given.
+    """
+    def emit(event_type, payload):
+        event = {"type": event_type, "data": payload}
+        if on_event is not None:
+            on_event(event)
+        return event
+
+    transport = transport or get_transport()
+    metrics = metrics if metrics is not None else Metrics()
+    if schema == "compact":
+        layout = "local"
+    data, relevant_components = build_llm_request(prompt, components_data, ranker, input_budget, max_tokens,
+                                                  layout, schema, metrics=metrics)
+    metrics.count("candidates", len(relevant_components))
+
+    cache_key, cached = lookup_cached_response(cache, prompt, relevant_components, layout, schema,
+                                               input_budget, max_tokens)
+    if cached is not None:
+        metrics.count("cache_hits")
+        with metrics.stage("validate"):
+            validate_result(cached, components_data)
+        with metrics.stage("layout"):
+            layout_result(cached, layout)
+        for component in cached["json_data"].get("components", []):
+            yield emit("component", component)
+        for connection in cached["json_data"].get("connections", []):
+            yield emit("connection", connection)
+        yield emit("result", attach_metrics(cached, metrics))
+        return
+    if cache_key is not None:
+        metrics.count("cache_misses")
+
+    parser = IncrementalGraphParser()
+    usage = {}
+    # The request stage excludes the time spent in the caller between events
+    started = time.perf_counter()
+    try:
+        response = transport.post(dict(data, stream=True), api_key, stream=True)
+        try:
+            for text in iter_text_deltas(iter_sse_events(response.iter_lines(decode_unicode=True)), usage):
+                if "first_byte" not in metrics.stages:
+                    metrics.add_time("first_byte", time.perf_counter() - started)
+                completed = parser.feed(text)
+                metrics.add_time("request", time.perf_counter() - started)
+                for kind, entry in completed:
+                    yield emit(kind, entry)
+                started = time.perf_counter()
+        finally:
+            response.close()
+    except Exception as e:
+        metrics.count("errors")
+        yield emit("result", attach_metrics({"error": f"Error calling LLM API: {str(e)}"}, metrics))
+        return
+    metrics.add_time("request", time.perf_counter() - started)
+    metrics.add_usage(usage)
+
+    with metrics.stage("parse"):
+        result = expand_result(parse_llm_content(parser.text), relevant_components)
+    with metrics.stage("validate"):
+        result = validate_result(result, components_data)
+    with metrics.stage("repair"):
+        result = repair_llm_result(result, data, components_data, api_key, transport, max_repairs, repair_budget,
+                                   schema, metrics)
+    with metrics.stage("layout"):
+        result = layout_result(result, layout)
+    if cache_key is not None and is_cacheable(result):
+        cache.put(cache_key, result["response"], result["json_data"])
+    result["cache"] = "miss"
+    if schema == "compact" and isinstance(result.get("json_data"), dict):
+        for component in result["json_data"].get("components", []):
+            yield emit("component", component)
+        for connection in result["json_data"].get("connections", []):
+            yield emit("connection", connection)
+    yield emit("result", attach_metrics(result, metrics))
+
+
+def open_response_cache(use_cache=True, cache_file=None, quiet=False):
+    """Return the shared response cache, or None if it is disabled or cannot be opened"""
+    if not use_cache:
+        return None
+    try:
+        return get_response_cache(cache_file)
+    except (OSError, sqlite3.Error) as e:
+        if not quiet:
+            print(f"Warning: Response cache unavailable: {str(e)}")
+        return None
+
+
+def find_components(prompt, components_file, api_key, ranker="bm25", use_cache=True, cache_file=None,
+                    input_budget=DEFAULT_INPUT_BUDGET, max_tokens=DEFAULT_MAX_TOKENS,
+                    max_repairs=DEFAULT_MAX_REPAIRS, repair_budget=DEFAULT_REPAIR_BUDGET, layout=DEFAULT_LAYOUT,
+                    schema=DEFAULT_SCHEMA, session_id=None, deadline=None):
+    """
+    Run one prompt end to end without printing a report.
+    Used by the finder server; returns the same dict as call_llm_api or {"error": ...}.
+    With a session_id the prompt refines the graph of that session (see finder_session).
+    deadline is an optional time.monotonic() value no request may run past.
+    """
+    if session_id is not None:
+        # Imported here because the session module imports this module
+        import finder_session
+        return finder_session.ask(session_id, prompt, components_file, api_key, deadline=deadline, ranker=ranker,
+                                  input_budget=input_budget, max_tokens=max_tokens, max_repairs=max_repairs,
+                                  repair_budget=repair_budget, layout=layout)
+    metrics = Metrics()
+    with metrics.stage("load"):
+        component_data = load_component_database(components_file)
+    if "error" in component_data:
+        return {"error": component_data["error"]}
+    cache = open_response_cache(use_cache, cache_file, quiet=True)
+    return call_llm_api(prompt, component_data, api_key, ranker=ranker, cache=cache, metrics=metrics,
+                        input_budget=input_budget, max_tokens=max_tokens,
+                        max_repairs=max_repairs, repair_budget=repair_budget, layout=layout,
+                        schema=schema, deadline=deadline)
+
+
+def warm_up(components_file, ranker="bm25", use_cache=True, cache_file=None, background=True):
+    """
+    Do the one-time work of the first prompt ahead of it: load the catalog, build
+    the ranking index, prompt snippets and validator tables, open the response
+    cache and import the HTTP stack. Meant to be called by the host when the
+    component is placed or a file is opened.
+    With background (the default) the work runs on a daemon thread, which is
+    returned; a warm-up of the same catalog that is still running is reused.
+    Otherwise the work is done here and {"components", "seconds"} is returned.
+    """
+    if not background:
+        return _warm_up(components_file, ranker, use_cache, cache_file)
+    key = (components_file, ranker)
+    with _warm_ups_lock:
+        thread = _warm_ups.get(key)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=_warm_up, args=(components_file, ranker, use_cache, cache_file),
+                                      name="finder-warm-up", daemon=True)
+            _warm_ups[key] = thread
+            thread.start()
+    return thread
+
+
+def _warm_up(components_file, ranker, use_cache, cache_file):
+    started = time.perf_counter()
+    component_data = load_component_database(components_file)
+    if "error" in component_data:
+        return component_data
+    catalog = component_data["catalog"]
+    if ranker == "semantic" and semantic_index.is_available():
+        semantic_index.get_semantic_index(catalog)
+    else:
+        get_bm25_index(catalog)
+    get_rank_weights(catalog)
+    get_snippet_table(catalog)
+    get_lookup(catalog)
+    get_name_index(catalog)
+    get_compatibility(catalog)
+    open_response_cache(use_cache, cache_file, quiet=True)
+    # Imports requests and creates the connection pool; no connection is opened
+    get_transport().session
+    return {"components": len(catalog.components), "seconds": round(time.perf_counter() - started, 3)}
+
+
+def main(prompt=None, components_file=None, api_key=None, output_file=None, json_only=False, ranker="bm25",
+         use_cache=True, cache_file=None, batch_file=None, concurrency=4, rate_limit=None,
+         input_budget=DEFAULT_INPUT_BUDGET, max_tokens=DEFAULT_MAX_TOKENS,
+         max_repairs=DEFAULT_MAX_REPAIRS, repair_budget=DEFAULT_REPAIR_BUDGET, layout=DEFAULT_LAYOUT,
+         schema=DEFAULT_SCHEMA, session_id=None):
+    """
+    Main function that can be called directly with parameters or from command line
+
+    Args:
+        prompt (str): Natural language prompt describing the task
+        components_file (str): Path to the component database JSON file
+        api_key (str): LLM API key
+        output_file (str, optional): Output file path (default is None, prints to stdout)
+        json_only (bool, optional): Output only the JSON data (default is False)
+        ranker (str, optional): Component ranking, "bm25" or "semantic" (default is "bm25")
+        use_cache (bool, optional): Reuse stored responses for repeated prompts (default is True)
+        cache_file (str, optional): Response cache database path (default is the user cache folder)
+        batch_file (str, optional): JSONL file of prompts to run concurrently instead of prompt
+        concurrency (int, optional): Prompts in flight at once in batch mode (default is 4)
+        rate_limit (float, optional): Maximum requests started per second in batch mode (default is no limit)
+        input_budget (int, optional): Estimated input tokens the request may use (default is 4000)
+        max_tokens (int, optional): Maximum tokens the LLM may generate (default is 1000)
+        max_repairs (int, optional): Repair requests for an invalid graph, 0 to disable (default is 2)
+        repair_budget (float, optional): Seconds the repair requests may take in total (default is 30)
+        layout (str, optional): Component placement, "local" or "model" (default is "local")
+        schema (str, optional): Reply format, "full" or the terse "compact" (default is "full")
+        session_id (str, optional): Refine the graph of this session instead of starting over
+            (see finder_session; the session is created on first use, default is no session)
+
+    Returns:
+        dict: Result of the operation including any JSON data or errors
+    """
+    # Check if being called from command line
+    if prompt is None and batch_file is None and components_file is None and api_key is None and len(sys.argv) > 1:
+        # Set up command line arguments
+        import argparse
+        parser = argparse.ArgumentParser(description='Grasshopper Component Finder')
+        parser.add_argument('--prompt', type=str, help='Natural language prompt describing the task')
+        parser.add_argument('--components', type=str, required=True, help='Path to the component database JSON file')
+        parser.add_argument('--api-key', type=str, required=True, help='LLM API key')
+        parser.add_argument('--output', type=str, help='Output file path (optional, default is stdout)')
+        parser.add_argument('--json-only', action='store_true', help='Output only the JSON data')
+        parser.add_argument('--ranker', type=str, choices=['bm25', 'semantic'], default='bm25',
+                            help='Component ranking method (semantic requires numpy)')
+        parser.add_argument('--connect-timeout', type=float, default=DEFAULT_CONNECT_TIMEOUT, help='Seconds to wait for the API connection')
+        parser.add_argument('--read-timeout', type=float, default=DEFAULT_READ_TIMEOUT, help='Seconds to wait for the API response')
+        parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES, help='Retries for rate-limited or failed API requests')
+        parser.add_argument('--no-cache', action='store_true', help='Always call the API, ignoring stored responses')
+        parser.add_argument('--cache-file', type=str, help='Response cache database path (optional)')
+        parser.add_argument('--batch', type=str, help='JSONL file of {"id", "prompt"} lines to run instead of --prompt')
+        parser.add_argument('--concurrency', type=int, default=4, help='Prompts in flight at once in batch mode')
+        parser.add_argument('--rate-limit', type=float, help='Maximum requests started per second in batch mode')
+        parser.add_argument('--input-budget', type=int, default=DEFAULT_INPUT_BUDGET, help='Estimated input tokens the request may use')
+        parser.add_argument('--max-tokens', type=int, default=DEFAULT_MAX_TOKENS, help='Maximum tokens the LLM may generate')
+        parser.add_argument('--max-repairs', type=int, default=DEFAULT_MAX_REPAIRS, help='Repair requests for an invalid graph (0 to disable)')
+        parser.add_argument('--repair-budget', type=float, default=DEFAULT_REPAIR_BUDGET, help='Seconds the repair requests may take in total')
+        parser.add_argument('--layout', type=str, choices=LAYOUTS, default=DEFAULT_LAYOUT,
+                            help='Place components locally or ask the LLM for positions')
+        parser.add_argument('--metrics-log', type=str, help='Append the metrics of every prompt to this JSONL file')
+        parser.add_argument('--metrics-prom', type=str, help='Write Prometheus text metrics to this file')
+        parser.add_argument('--schema', type=str, choices=SCHEMAS, default=DEFAULT_SCHEMA,
+                            help='Reply format; compact numbers the candidates and expands the reply locally')
     
-        # Validate required parameters
-        if prompt is None or components_file is None or api_key is None:
-            error_msg = "Missing required parameters: prompt, components_file, and api_key are required"
-            if json_only:
-                error_json = json.dumps({"error": error_msg})
-                print(error_json)
-            else:
-                print(f"Error: {error_msg}")
-            return {"error": error_msg}
+        args = parser.parse_args()
+        if args.prompt is None and args.batch is None:
+            parser.error('one of --prompt or --batch is required')
     
-        # Load component database
-        if not json_only:
-            print(f"Loading component database from {components_file}...")
+        prompt = args.prompt
+        components_file = args.components
+        api_key = args.api_key
+        output_file = args.output
+        json_only = args.json_only
+        ranker = args.ranker
+        use_cache = not args.no_cache
+        cache_file = args.cache_file
+        batch_file = args.batch
+        concurrency = args.concurrency
+        rate_limit = args.rate_limit
+        input_budget = args.input_budget
+        max_tokens = args.max_tokens
+        max_repairs = args.max_repairs
+        repair_budget = args.repair_budget
+        layout = args.layout
+        schema = args.schema
+        if args.metrics_log:
+            finder_metrics.add_sink(finder_metrics.JsonlSink(args.metrics_log))
+        if args.metrics_prom:
+            finder_metrics.add_sink(finder_metrics.PrometheusSink(args.metrics_prom))
+        configure_transport(connect_timeout=args.connect_timeout, read_timeout=args.read_timeout,
+                            max_retries=args.max_retries)
+
+    # Validate required parameters
+    if (prompt is None and batch_file is None) or components_file is None or api_key is None:
+        error_msg = "Missing required parameters: prompt, components_file, and api_key are required"
+        if json_only:
+            error_json = json.dumps({"error": error_msg})
+            print(error_json)
+        else:
+            print(f"Error: {error_msg}")
+        return {"error": error_msg}
+
+    # Load component database
+    if not json_only:
+        print(f"Loading component database from {components_file}...")
+    metrics = Metrics()
+    with metrics.stage("load"):
         component_data = load_component_database(components_file)
+
+    if "error" in component_data:
+        error_msg = f"Error: {component_data['error']}"
+        if json_only:
+            error_json = json.dumps({"error": component_data['error']})
+            print(error_json)
+        else:
+            print(error_msg)
+        return {"error": component_data['error']}
+
+    cache = open_response_cache(use_cache, cache_file, quiet=json_only)
+
+    if batch_file is not None:
+        # Imported here because the batch runner imports this module
+        import finder_batch
+        output_file = output_file or os.path.splitext(batch_file)[0] + ".results.jsonl"
+        if not json_only:
+            print(f"Running prompts from {batch_file} with concurrency {concurrency}...")
+        summary = finder_batch.run_batch(batch_file, component_data, api_key, output_file,
+                                         concurrency=concurrency, rate_limit=rate_limit,
+                                         ranker=ranker, cache=cache, input_budget=input_budget,
+                                         max_tokens=max_tokens, max_repairs=max_repairs,
+                                         repair_budget=repair_budget, layout=layout, schema=schema)
+        if json_only:
+            print(json.dumps(summary))
+        else:
+            print(f"Completed {summary['completed']} of {summary['prompts']} prompts "
+                  f"({summary['errors']} errors), results written to {output_file}")
+        return summary
+
+    # Call LLM API with the component data
+    if not json_only:
+        print(f"Analyzing prompt: '{prompt}'")
+    if session_id is not None:
+        import finder_session
+        result = finder_session.ask(session_id, prompt, components_file, api_key, metrics=metrics,
+                                    ranker=ranker, input_budget=input_budget, max_tokens=max_tokens,
+                                    max_repairs=max_repairs, repair_budget=repair_budget, layout=layout)
+    else:
+        result = call_llm_api(prompt, component_data, api_key, ranker=ranker, cache=cache, metrics=metrics,
+                              input_budget=input_budget, max_tokens=max_tokens,
+                              max_repairs=max_repairs, repair_budget=repair_budget, layout=layout,
+                              schema=schema)
+
+    if "error" in result:
+        error_msg = f"Error: {result['error']}"
+        if json_only:
+            error_json = json.dumps({"error": result['error']})
+            print(error_json)
+        else:
+            print(error_msg)
+        return {"error": result['error']}
+
+    # Handle JSON output
+    if "json_data" in result:
+        json_output = json.dumps(result["json_data"], indent=2)
     
-        if "error" in component_data:
-            error_msg = f"Error: {component_data['error']}"
-            if json_only:
-                error_json = json.dumps({"error": component_data['error']})
-                print(error_json)
+        if json_only:
+            # Only output the JSON data
+            if output_file:
+                with open(output_file, 'w') as f:
+                    f.write(json_output)
             else:
-                print(error_msg)
-            return {"error": component_data['error']}
-    
-        # Call LLM API with the component data
+                print(json_output)
+            return result["json_data"]
+    elif "json_error" in result:
         if not json_only:
-            print(f"Analyzing prompt: '{prompt}'")
-        result = call_llm_api(prompt, component_data, api_key)
+            print(f"Warning: Could not parse LLM output as JSON: {result['json_error']}")
+
+    if not json_only:
+        for diagnostic in result.get("validation", {}).get("diagnostics", []):
+            print(f"Warning: {diagnostic['message']}")
+
+    # Parse the response for human-readable output
+    response_text = result["response"]
+
+    # If we have valid JSON, format it nicely
+    if "json_data" in result:
+        json_data = result["json_data"]
+        explanation = json_data.get("explanation", "No explanation provided")
     
-        if "error" in result:
-            error_msg = f"Error: {result['error']}"
-            if json_only:
-                error_json = json.dumps({"error": result['error']})
-                print(error_json)
-            else:
-                print(error_msg)
-            return {"error": result['error']}
+        components_text = []
+        for i, comp in enumerate(json_data.get("components", [])):
+            components_text.append(f"{i+1}. {comp.get('name', 'Unknown')} (Category: {comp.get('category', 'Unknown')}, Subcategory: {comp.get('subcategory', 'Unknown')})")
     
-        # Handle JSON output
-        if "json_data" in result:
-            json_output = json.dumps(result["json_data"], indent=2)
-        
-            if json_only:
-                # Only output the JSON data
-                if output_file:
-                    with open(output_file, 'w') as f:
-                        f.write(json_output)
-                else:
-                    print(json_output)
-                return result["json_data"]
-        elif "json_error" in result:
-            if not json_only:
-                print(f"Warning: Could not parse LLM output as JSON: {result['json_error']}")
+        suggested_components = "\n".join(components_text)
     
-        # Parse the response for human-readable output
-        response_text = result["response"]
+        connections_text = []
+        for conn in json_data.get("connections", []):
+            connections_text.append(f"- Connect {conn.get('fromComponent', 'Unknown')} ({conn.get('fromOutput', 'Unknown')}) to {conn.get('toComponent', 'Unknown')} ({conn.get('toInput', 'Unknown')})")
     
-        # If we have valid JSON, format it nicely
-        if "json_data" in result:
-            json_data = result["json_data"]
-            explanation = json_data.get("explanation", "No explanation provided")
-        
-            components_text = []
-            for i, comp in enumerate(json_data.get("components", [])):
-                components_text.append(f"{i+1}. {comp.get('name', 'Unknown')} (Category: {comp.get('category', 'Unknown')}, Subcategory: {comp.get('subcategory', 'Unknown')})")
-        
-            suggested_components = "\n".join(components_text)
-        
-            connections_text = []
-            for conn in json_data.get("connections", []):
-                connections_text.append(f"- Connect {conn.get('fromComponent', 'Unknown')} ({conn.get('fromOutput', 'Unknown')}) to {conn.get('toComponent', 'Unknown')} ({conn.get('toInput', 'Unknown')})")
-        
-            connections = "\n".join(connections_text)
+        connections = "\n".join(connections_text)
+    else:
+        # Fallback to simple text parsing
+        parts = response_text.split("\n\n", 1)
+        if len(parts) > 1:
+            suggested_components = parts[0]
+            explanation = parts[1]
         else:
-            # Fallback to simple text parsing
-            parts = response_text.split("\n\n", 1)
-            if len(parts) > 1:
-                suggested_components = parts[0]
-                explanation = parts[1]
-            else:
-                suggested_components = "Component Suggestions:"
-                explanation = response_text
-            connections = "No connection information available"
-    
-        # Format the output
-        output = f"""
+            suggested_components = "Component Suggestions:"
+            explanation = response_text
+        connections = "No connection information available"
+
+    # Format the output
+    output = f"""
     === GRASSHOPPER COMPONENT FINDER ===
 
     PROMPT:
@@ -388,23 +830,47 @@ class grasshopper_component_finder:
     DETAILED EXPLANATION:
     {explanation}
     """
-    
-        if "json_data" in result:
-            output += f"""
+
+    if "json_data" in result:
+        output += f"""
     JSON DATA:
     {json.dumps(result["json_data"], indent=2)}
     """
-    
-        # Output the result
-        if output_file:
-            with open(output_file, 'w') as f:
-                f.write(output)
-            print(f"Results written to {output_file}")
-        else:
-            print(output)
-    
-        # Return the result
-        return result
+
+    # Output the result
+    if output_file:
+        with open(output_file, 'w') as f:
+            f.write(output)
+        print(f"Results written to {output_file}")
+    else:
+        print(output)
+
+    # Return the result
+    return result
+
+
+class grasshopper_component_finder:
+    """Namespace the functions used to live in, kept for hosts that still call them through it"""
+
+    load_component_database = staticmethod(load_component_database)
+    rank_components = staticmethod(rank_components)
+    select_relevant_components = staticmethod(select_relevant_components)
+    build_llm_request = staticmethod(build_llm_request)
+    parse_llm_content = staticmethod(parse_llm_content)
+    lookup_cached_response = staticmethod(lookup_cached_response)
+    expand_result = staticmethod(expand_result)
+    validate_result = staticmethod(validate_result)
+    is_cacheable = staticmethod(is_cacheable)
+    layout_result = staticmethod(layout_result)
+    attach_metrics = staticmethod(attach_metrics)
+    repair_llm_result = staticmethod(repair_llm_result)
+    call_llm_api = staticmethod(call_llm_api)
+    stream_llm_api = staticmethod(stream_llm_api)
+    open_response_cache = staticmethod(open_response_cache)
+    find_components = staticmethod(find_components)
+    warm_up = staticmethod(warm_up)
+    main = staticmethod(main)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,156 @@
+"""
+Grasshopper LLM Streaming
+
+Helpers for streamed completions:
+
+    - iter_sse_events parses a server-sent event stream into (event, data) pairs
+    - iter_text_deltas turns Anthropic message stream events into text chunks
+    - IncrementalGraphParser scans the text as it arrives and hands back every
+      entry of "components" and "connections" as soon as its object is closed
+
+Usage:
+    parser = IncrementalGraphParser()
+    for text in iter_text_deltas(iter_sse_events(response.iter_lines(decode_unicode=True))):
+        for kind, entry in parser.feed(text):
+            print(kind, entry)
+"""
+
+import json
+
+
+class StreamError(Exception):
+    """Raised when the API reports an error in the middle of a stream"""
+
+
+def iter_sse_events(lines):
+    """Yield (event, data) pairs from the lines of a server-sent event stream"""
+    event = None
+    data = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line:
+            if data:
+                yield event or "message", "\n".join(data)
+            event = None
+            data = []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "event":
+            event = value
+        elif field == "data":
+            data.append(value)
+    if data:
+        yield event or "message", "\n".join(data)
+
+
+def iter_text_deltas(events, usage=None):
+    """
+    Yield the text chunks of an Anthropic messages stream.
+    When a dict is given as usage it is updated with the token counts reported
+    by the message_start and message_delta events.
+    """
+    for event, data in events:
+        if event == "ping":
+            continue
+        payload = json.loads(data)
+        kind = payload.get("type", event)
+        if kind == "content_block_delta":
+            delta = payload.get("delta", {})
+            if delta.get("type") == "text_delta":
+                yield delta.get("text", "")
+        elif kind == "message_start" and usage is not None:
+            usage.update(payload.get("message", {}).get("usage", {}))
+        elif kind == "message_delta" and usage is not None:
+            usage.update(payload.get("usage", {}))
+        elif kind == "error":
+            error = payload.get("error", {})
+            raise StreamError(f"{error.get('type', 'error')}: {error.get('message', data)}")
+        elif kind == "message_stop":
+            return
+
+
+class IncrementalGraphParser:
+    """
+    Incremental scanner for the graph JSON returned by the LLM.
+    Text before the first "{" (such as a ```json fence) is ignored. Only the
+    structure needed to find complete list entries is tracked, so every chunk
+    is scanned once. entries_end is the offset just past the last entry handed
+    back, so the text after it is what a broken response failed to deliver.
+    """
+
+    LIST_KINDS = {"components": "component", "connections": "connection"}
+
+    def __init__(self):
+        self._text = ""
+        self._position = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None
+        self._pending_key = None
+        self._list_kind = None
+        self._entry_start = None
+        self.entries_end = 0
+        self.done = False
+
+    @property
+    def text(self):
+        """All text received so far"""
+        return self._text
+
+    def feed(self, chunk):
+        """Consume a chunk of text and return the (kind, entry) pairs it completed"""
+        self._text += chunk
+        completed = []
+        text = self._text
+        stack = self._stack
+        i = self._position
+        end = len(text)
+        while i < end and not self.done:
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if len(stack) == 1:
+                        self._last_string = text[self._string_start + 1:i]
+            elif not stack:
+                if c == "{":
+                    stack.append(c)
+            elif c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == ":":
+                if len(stack) == 1:
+                    self._pending_key = self._last_string
+            elif c in "{[":
+                if len(stack) == 1 and c == "[":
+                    self._list_kind = self.LIST_KINDS.get(self._pending_key)
+                elif len(stack) == 2 and c == "{" and self._list_kind:
+                    self._entry_start = i
+                stack.append(c)
+            elif c in "}]":
+                stack.pop()
+                if len(stack) == 2 and self._entry_start is not None:
+                    try:
+                        completed.append((self._list_kind, json.loads(text[self._entry_start:i + 1])))
+                        self.entries_end = i + 1
+                    except ValueError:
+                        pass  # Left for the full parse to report
+                    self._entry_start = None
+                elif len(stack) == 1:
+                    self._list_kind = None
+                elif not stack:
+                    self.done = True
+            i += 1
+        self._position = i
+        return completed
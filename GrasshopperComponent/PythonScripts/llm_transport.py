@@ -0,0 +1,200 @@
+"""
+Grasshopper LLM Transport
+
+HTTP layer for the LLM API. One pooled requests.Session is kept per transport
+so that consecutive prompts reuse the same keep-alive connection instead of
+paying a new TCP and TLS handshake. Every request has a connect and a read
+timeout, and 429/5xx responses and dropped connections are retried with
+jittered exponential backoff, honouring the Retry-After header.
+
+The endpoint defaults to Anthropic's API and can be pointed at a proxy or a
+local stand-in server with the ANTHROPIC_BASE_URL environment variable.
+
+requests is only imported when the first session is created: it is the
+largest part of the finder's import time, which the host pays on the first
+solve otherwise.
+
+Usage:
+    import llm_transport
+    llm_transport.configure_transport(read_timeout=30, max_retries=2)
+    response = llm_transport.get_transport().post(payload, api_key)
+
+Requirements:
+    - requests
+"""
+
+import os
+import random
+import threading
+import time
+
+DEFAULT_BASE_URL = "https://api.anthropic.com"
+API_VERSION = "2023-06-01"
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 120.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30.0
+
+# 529 is Anthropic's "overloaded" status
+RETRY_STATUSES = frozenset([408, 429, 500, 502, 503, 504, 529])
+
+
+def messages_url(base_url=None):
+    """Return the messages endpoint for a base URL (default from ANTHROPIC_BASE_URL)"""
+    base_url = base_url or os.environ.get("ANTHROPIC_BASE_URL") or DEFAULT_BASE_URL
+    return base_url.rstrip("/") + "/v1/messages"
+
+
+def parse_retry_after(value):
+    """Return the delay in seconds requested by a Retry-After header, or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    import email.utils
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment is None:
+        return None
+    return max(0.0, moment.timestamp() - time.time())
+
+
+class Transport:
+    """Pooled HTTP session with timeouts and bounded retries"""
+
+    def __init__(self, base_url=None, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX,
+                 pool_size=10):
+        self.url = messages_url(base_url)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self._session = None
+        self._lock = threading.Lock()
+
+    def copy(self, **overrides):
+        """Return a new transport with the same settings (and its own pool)"""
+        options = {
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "max_retries": self.max_retries,
+            "backoff_base": self.backoff_base,
+            "backoff_max": self.backoff_max,
+            "pool_size": self.pool_size,
+        }
+        options.update(overrides)
+        transport = Transport(**options)
+        transport.url = self.url
+        return transport
+
+    @property
+    def session(self):
+        """The pooled session, created on first use"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update({
+                        "anthropic-version": API_VERSION,
+                        "content-type": "application/json",
+                    })
+                    self._session = session
+        return self._session
+
+    def backoff(self, attempt, retry_after=None):
+        """Delay before retry number attempt (0-based), with full jitter"""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def post(self, payload, api_key, headers=None, stream=False, deadline=None):
+        """
+        POST a JSON payload to the messages endpoint and return the response.
+        Retryable failures are retried up to max_retries times; the last
+        failure is raised as a requests exception.
+        deadline is an optional time.monotonic() value: the read timeout is
+        shortened to meet it and no retry is started after it.
+        """
+        import requests
+        request_headers = {"x-api-key": api_key}
+        if headers:
+            request_headers.update(headers)
+
+        attempt = 0
+        while True:
+            read_timeout = self.read_timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise requests.Timeout("Deadline passed before the request could be sent")
+                read_timeout = min(read_timeout, remaining)
+            try:
+                response = self.session.post(self.url, headers=request_headers, json=payload, stream=stream,
+                                             timeout=(self.connect_timeout, read_timeout))
+            except requests.ConnectionError:
+                delay = self.backoff(attempt)
+                if attempt >= self.max_retries or not self._in_time(delay, deadline):
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = self.backoff(attempt, parse_retry_after(response.headers.get("retry-after")))
+                if self._in_time(delay, deadline):
+                    response.close()
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+
+            response.raise_for_status()
+            return response
+
+    @staticmethod
+    def _in_time(delay, deadline):
+        return deadline is None or time.monotonic() + delay < deadline
+
+    def close(self):
+        """Close the pooled connections"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """Return the module-level transport shared by every request"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = Transport()
+    return _transport
+
+
+def configure_transport(**options):
+    """Replace the shared transport with one built from the given Transport options"""
+    global _transport
+    with _transport_lock:
+        if _transport is not None:
+            _transport.close()
+        _transport = Transport(**options)
+    return _transport
@@ -0,0 +1,178 @@
+"""
+Grasshopper Component Name Index
+
+Character-trigram index over the names, nicknames and type names of the
+catalog, for resolving the near-miss names an LLM produces ("DivideCurve",
+"Divide Crv", a nickname instead of the name) without another round trip.
+
+Strings are normalized to lowercase letters and digits, so spacing and
+punctuation never matter, and padded before they are cut into trigrams.
+Similarity is the Dice coefficient of the trigram sets; an exact match
+scores 1.0. Queries are also tried with the usual Grasshopper abbreviations
+spelled out ("Crv" -> "Curve"). A name needs a minimum number of shared
+trigrams and a similar length to reach min_score, so candidates only come
+from the posting lists of the query's rarest trigrams (prefix filtering),
+names of the wrong length are skipped and the rest are scored exactly.
+
+Usage:
+    import name_index
+    index = name_index.get_name_index(catalog)
+    for score, doc_id in index.search("Divide Crv", k=3):
+        print(score, catalog.components[doc_id]["name"])
+"""
+
+import heapq
+import math
+import re
+from array import array
+from collections import defaultdict
+
+# Catalog fields that are indexed
+NAME_FIELDS = ("name", "nickname", "type_name")
+
+# Minimum similarity for a name to be corrected automatically
+DEFAULT_MIN_SIMILARITY = 0.75
+
+# Lead a correction needs over the closest differently named entry; a closer
+# runner-up makes the name ambiguous and it is left to the repair round
+DEFAULT_MIN_MARGIN = 0.15
+
+# Matches below this similarity are not returned
+DEFAULT_MIN_SCORE = 0.4
+
+# Abbreviations common in Grasshopper nicknames and in model output
+ABBREVIATIONS = {
+    "crv": "curve", "crvs": "curves", "pt": "point", "pts": "points", "srf": "surface", "vec": "vector",
+    "pln": "plane", "ln": "line", "rec": "rectangle", "num": "number", "int": "integer", "msh": "mesh",
+    "geo": "geometry", "dist": "distance", "div": "divide", "dom": "domain", "seg": "segment",
+}
+
+_NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+_WORD_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+")
+
+
+def normalize(text):
+    return _NON_ALNUM_RE.sub("", str(text).lower()) if text is not None else ""
+
+
+def variants(text):
+    """Normalized forms a query is looked up as: as written and with abbreviations spelled out"""
+    key = normalize(text)
+    words = _WORD_RE.findall(str(text)) if text is not None else []
+    expanded = "".join(ABBREVIATIONS.get(word.lower(), word.lower()) for word in words)
+    return [key, expanded] if expanded and expanded != key else [key] if key else []
+
+
+def trigrams(normalized):
+    """Distinct trigrams of a normalized string, padded so short strings and word edges count"""
+    padded = f"$${normalized}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Trigram postings over distinct normalized names, each mapped to its catalog entries"""
+
+    def __init__(self, components, fields=NAME_FIELDS):
+        self.components = components
+        key_ids = {}
+        self.keys = []
+        self.key_docs = []
+        self.key_grams = []
+        self.key_sizes = array('I')
+        postings = defaultdict(lambda: array('I'))
+        for doc_id, component in enumerate(components):
+            for field in fields:
+                key = normalize(component.get(field))
+                if not key:
+                    continue
+                key_id = key_ids.get(key)
+                if key_id is None:
+                    key_id = key_ids[key] = len(self.keys)
+                    self.keys.append(key)
+                    self.key_docs.append([])
+                    grams = frozenset(trigrams(key))
+                    self.key_grams.append(grams)
+                    self.key_sizes.append(len(grams))
+                    for gram in grams:
+                        postings[gram].append(key_id)
+                if doc_id not in self.key_docs[key_id]:
+                    self.key_docs[key_id].append(doc_id)
+        self.key_ids = key_ids
+        self.postings = dict(postings)
+
+    def search(self, text, k=5, min_score=DEFAULT_MIN_SCORE):
+        """
+        Return up to k (similarity, doc_id) pairs with a similarity of at least
+        min_score, best first. Entries score by their best matching name.
+        """
+        scored = []
+        # Min-heap of the k best (score, doc_id) so far; once full, its smallest score is the bar
+        top = []
+        in_top = {}
+        key_grams = self.key_grams
+        sizes = self.key_sizes
+        empty = ()
+        for key in variants(text):
+            grams = trigrams(key)
+            size = len(grams)
+            postings = sorted((self.postings.get(gram, empty) for gram in grams), key=len)
+            seen = set()
+            for position, posting in enumerate(postings):
+                bar = max(min_score, top[0][0]) if len(top) >= k else min_score
+                # 2 * min(size, other) / (size + other) >= bar bounds the other length, and
+                # 2 * shared >= bar * (size + other) the shared trigrams; a name sharing
+                # that many shares one of the size - needed + 1 rarest
+                shortest = size * bar / (2.0 - bar)
+                longest = size * (2.0 - bar) / bar
+                needed = max(1, math.ceil(bar * (size + max(1.0, shortest)) / 2.0))
+                if position > size - needed:
+                    break
+                for key_id in posting:
+                    if key_id in seen or not shortest <= sizes[key_id] <= longest:
+                        continue
+                    seen.add(key_id)
+                    score = 2.0 * len(grams & key_grams[key_id]) / (size + sizes[key_id])
+                    if score < bar:
+                        continue
+                    scored.append((-score, key_id))
+                    for doc_id in self.key_docs[key_id]:
+                        if doc_id in in_top:
+                            if score > in_top[doc_id]:
+                                in_top[doc_id] = score
+                                top = [(value, doc) for doc, value in in_top.items()]
+                                heapq.heapify(top)
+                        elif len(top) < k:
+                            heapq.heappush(top, (score, doc_id))
+                            in_top[doc_id] = score
+                        elif score > top[0][0]:
+                            del in_top[heapq.heapreplace(top, (score, doc_id))[1]]
+                            in_top[doc_id] = score
+
+        # Best names first; an entry takes the score of the first of its names seen
+        scored.sort()
+        results = []
+        seen = set()
+        for score, key_id in scored:
+            score = -score
+            if score < min_score or len(results) >= k:
+                break
+            for doc_id in sorted(self.key_docs[key_id]):
+                if doc_id not in seen and len(results) < k:
+                    seen.add(doc_id)
+                    results.append((round(score, 4), doc_id))
+        return results
+
+    def resolve(self, text, k=5):
+        """Return the best matches as dicts with the catalog identity and the similarity"""
+        matches = []
+        for score, doc_id in self.search(text, k):
+            component = self.components[doc_id]
+            matches.append({"score": score, "name": component.get("name"), "nickname": component.get("nickname"),
+                            "category": component.get("category"), "subcategory": component.get("subcategory"),
+                            "guid": component.get("guid")})
+        return matches
+
+
+def get_name_index(catalog):
+    """Return the name index of a ComponentCatalog, building it on first use"""
+    return catalog.derived("names", lambda c: TrigramIndex(c.components))
@@ -0,0 +1,240 @@
+"""
+Grasshopper Parameter Type Compatibility
+
+Precomputed index of which parameter types can feed which, built from the
+param_type (and, for script variables, type_hint) of every catalog input and
+output. Everything is stored as flat arrays:
+
+    - a type x type byte matrix, so "can this output feed this input" is one
+      index operation
+    - per source type, the list of target types it can feed (offsets + ids)
+    - per target type, every (component, input index) of that type
+    - per component, the type id of each of its inputs and outputs
+
+Types follow Grasshopper's own conversions: Number feeds Integer, Line feeds
+Curve, Surface feeds Brep, and anything feeds Generic Data and script inputs.
+Parameter types the table does not know (plugin types) are treated as
+compatible with everything, so they never cause false errors.
+
+Usage:
+    import param_compatibility
+    index = param_compatibility.get_compatibility(catalog)
+    index.is_edge_valid(source_doc, output_index, target_doc, input_index)
+    for doc_id, input_index in index.consumers(source_doc, output_index):
+        ...
+"""
+
+from array import array
+
+# Parameters that take any data
+UNIVERSAL_TYPES = ("GenericObject", "ScriptVariable")
+
+GEOMETRY_TYPES = ("Point", "Vector", "Plane", "Line", "Circle", "Arc", "Rectangle", "Curve", "Surface", "Brep",
+                  "Box", "Mesh", "SubD", "Geometry")
+
+# Source type -> the other types it converts to
+CONVERSIONS = {
+    "Number": ("Integer", "Boolean", "Interval", "Complex", "String"),
+    "Integer": ("Number", "Boolean", "Interval", "Complex", "String"),
+    "Boolean": ("Number", "Integer", "String"),
+    "String": ("Number", "Integer", "Boolean", "Colour", "Interval", "Point", "Vector", "Guid", "FilePath",
+               "StructurePath", "Time", "Complex", "Culture"),
+    "Interval": ("String",),
+    "Complex": ("String",),
+    "Colour": ("String",),
+    "Time": ("String",),
+    "Guid": ("String",),
+    "FilePath": ("String",),
+    "StructurePath": ("String",),
+    "Culture": ("String",),
+    "Point": ("Vector", "Plane", "Geometry", "String"),
+    "Vector": ("Point", "Geometry", "String"),
+    "Plane": ("Point", "Geometry", "String"),
+    "Line": ("Curve", "Vector", "Geometry", "String"),
+    "Circle": ("Curve", "Plane", "Geometry"),
+    "Arc": ("Curve", "Plane", "Geometry"),
+    "Rectangle": ("Curve", "Plane", "Geometry"),
+    "Curve": ("Geometry",),
+    "Surface": ("Brep", "Mesh", "Geometry"),
+    "Brep": ("Mesh", "Geometry"),
+    "Box": ("Brep", "Mesh", "Geometry"),
+    "Mesh": ("Geometry",),
+    "SubD": ("Brep", "Mesh", "Geometry"),
+    # Generic geometry may hold any kind of geometry
+    "Geometry": GEOMETRY_TYPES,
+    "Transform": ("Matrix",),
+    "Matrix": ("Transform",),
+    "Field": (),
+}
+
+KNOWN_TYPES = tuple(sorted(set(CONVERSIONS) | set(UNIVERSAL_TYPES)))
+
+# Other spellings of param types and script type hints
+ALIASES = {
+    "color": "Colour", "double": "Number", "float": "Number", "int": "Integer", "bool": "Boolean",
+    "str": "String", "text": "String", "point3d": "Point", "vector3d": "Vector", "object": "GenericObject",
+}
+
+_LOWER_TYPES = {name.lower(): name for name in KNOWN_TYPES}
+
+
+def _canonical(name):
+    key = name.lower()
+    return _LOWER_TYPES.get(key) or ALIASES.get(key)
+
+
+def param_type_name(param):
+    """
+    Return the type of a catalog parameter without the "Param_" prefix, or
+    None when it is unknown. Script variables take the type of their hint.
+    """
+    if not isinstance(param, dict):
+        return None
+    raw = param.get("param_type") or ""
+    name = raw[6:] if raw.startswith("Param_") else raw
+    if name in UNIVERSAL_TYPES:
+        # e.g. "GhPython.Component.NewFloatHint" -> "float"
+        hint = str(param.get("type_hint") or "").rsplit(".", 1)[-1].lower()
+        if hint.endswith("hint"):
+            hint = hint[:-4]
+        if hint.startswith("new"):
+            hint = hint[3:]
+        hinted = _canonical(hint) if hint else None
+        if hinted:
+            return hinted
+    if not name:
+        return None
+    return _canonical(name) or name
+
+
+class CompatibilityIndex:
+    """Type ids, the compatibility matrix and the adjacency arrays of a catalog"""
+
+    def __init__(self, components):
+        self.type_names = list(KNOWN_TYPES)
+        self.type_ids = {name: type_id for type_id, name in enumerate(self.type_names)}
+
+        # Parameter type ids per component, as offsets into flat arrays (0 means unknown)
+        self.input_offsets = array('I', [0])
+        self.output_offsets = array('I', [0])
+        self.input_types = array('I')
+        self.output_types = array('I')
+        for component in components:
+            for params, offsets, types in ((component.get("inputs", []), self.input_offsets, self.input_types),
+                                           (component.get("outputs", []), self.output_offsets, self.output_types)):
+                for param in params:
+                    name = param_type_name(param)
+                    types.append(self._intern(name) + 1 if name else 0)
+                offsets.append(len(types))
+
+        size = len(self.type_names)
+        self.size = size
+        self.matrix = bytearray(size * size)
+        for source in range(size):
+            for target in range(size):
+                if self._convertible(self.type_names[source], self.type_names[target]):
+                    self.matrix[source * size + target] = 1
+
+        # Source type -> target types it feeds
+        self.target_offsets = array('I', [0])
+        self.targets = array('I')
+        for source in range(size):
+            row = source * size
+            self.targets.extend(target for target in range(size) if self.matrix[row + target])
+            self.target_offsets.append(len(self.targets))
+
+        # Target type -> (component, input index) of that type, grouped by type
+        counts = [0] * (size + 1)
+        for type_id in self.input_types:
+            if type_id:
+                counts[type_id] += 1
+        self.consumer_offsets = array('I', [0] * (size + 1))
+        for type_id in range(size):
+            self.consumer_offsets[type_id + 1] = self.consumer_offsets[type_id] + counts[type_id + 1]
+        fill = list(self.consumer_offsets[:size])
+        self.consumer_docs = array('I', [0] * self.consumer_offsets[size])
+        self.consumer_inputs = array('I', [0] * self.consumer_offsets[size])
+        for doc_id in range(len(self.input_offsets) - 1):
+            start = self.input_offsets[doc_id]
+            for index in range(self.input_offsets[doc_id + 1] - start):
+                type_id = self.input_types[start + index]
+                if type_id:
+                    slot = fill[type_id - 1]
+                    self.consumer_docs[slot] = doc_id
+                    self.consumer_inputs[slot] = index
+                    fill[type_id - 1] = slot + 1
+
+    def _intern(self, name):
+        type_id = self.type_ids.get(name)
+        if type_id is None:
+            type_id = self.type_ids[name] = len(self.type_names)
+            self.type_names.append(name)
+        return type_id
+
+    @staticmethod
+    def _convertible(source, target):
+        if source == target or target in UNIVERSAL_TYPES or source in UNIVERSAL_TYPES:
+            return True
+        if source not in CONVERSIONS or target not in CONVERSIONS:
+            # A plugin type we know nothing about
+            return True
+        return target in CONVERSIONS[source]
+
+    def type_name(self, type_id):
+        return self.type_names[type_id] if type_id is not None else None
+
+    def _param_type(self, offsets, types, doc_id, index):
+        start = offsets[doc_id]
+        if index < 0 or start + index >= offsets[doc_id + 1]:
+            return None
+        type_id = types[start + index]
+        return type_id - 1 if type_id else None
+
+    def input_type(self, doc_id, index):
+        """Type id of an input, or None when unknown"""
+        return self._param_type(self.input_offsets, self.input_types, doc_id, index)
+
+    def output_type(self, doc_id, index):
+        """Type id of an output, or None when unknown"""
+        return self._param_type(self.output_offsets, self.output_types, doc_id, index)
+
+    def compatible(self, source_type, target_type):
+        """Check whether data of source_type can feed a parameter of target_type (unknown types can)"""
+        if source_type is None or target_type is None:
+            return True
+        return bool(self.matrix[source_type * self.size + target_type])
+
+    def is_edge_valid(self, source_doc, output_index, target_doc, input_index):
+        """Check a connection between catalog parameters by type"""
+        return self.compatible(self.output_type(source_doc, output_index), self.input_type(target_doc, input_index))
+
+    def accepted_types(self, source_type):
+        """Type ids that data of source_type can feed"""
+        return self.targets[self.target_offsets[source_type]:self.target_offsets[source_type + 1]]
+
+    def consumers(self, doc_id, output_index):
+        """Yield every (component, input index) in the catalog that an output can plug into"""
+        source_type = self.output_type(doc_id, output_index)
+        types = range(self.size) if source_type is None else self.accepted_types(source_type)
+        for target_type in types:
+            for slot in range(self.consumer_offsets[target_type], self.consumer_offsets[target_type + 1]):
+                yield self.consumer_docs[slot], self.consumer_inputs[slot]
+
+    def compatible_inputs(self, source_doc, output_index, target_doc):
+        """Input indices of target_doc that an output of source_doc can feed"""
+        source_type = self.output_type(source_doc, output_index)
+        count = self.input_offsets[target_doc + 1] - self.input_offsets[target_doc]
+        return [index for index in range(count)
+                if self.compatible(source_type, self.input_type(target_doc, index))]
+
+    def compatible_outputs(self, source_doc, target_doc, input_index):
+        """Output indices of source_doc that can feed an input of target_doc"""
+        target_type = self.input_type(target_doc, input_index)
+        count = self.output_offsets[source_doc + 1] - self.output_offsets[source_doc]
+        return [index for index in range(count)
+                if self.compatible(self.output_type(source_doc, index), target_type)]
+
+
+def get_compatibility(catalog):
+    """Return the compatibility index of a ComponentCatalog, building it on first use"""
+    return catalog.derived("compatibility", lambda c: CompatibilityIndex(c.components))
@@ -0,0 +1,277 @@
+"""
+Grasshopper Prompt Builder
+
+Assembles the system prompt for the LLM request.
+
+The fixed instruction block is sent first, as its own system block, and the
+candidate components follow in a second block. Anthropic only caches a prefix
+of at least MIN_CACHEABLE_TOKENS, which the instructions alone do not reach, so
+the cache breakpoint goes on the first block that ends a long enough prefix:
+normally the candidate block, which repair rounds and session turns resend
+unchanged. A request too small to be cached gets no breakpoint. The candidates
+are fitted into an input token budget: every candidate starts with its full description and parameter list,
+and the lowest-ranked ones are shortened first (brief, then name only, then
+dropped) until the estimate fits.
+
+When components are laid out locally (graph_layout) the instructions leave
+the canvas positions out of the schema, saving output tokens. In compact mode
+the candidates are numbered and the compact_schema reply format is requested.
+
+Component snippets are rendered once per catalog version (SnippetTable, or the
+snippet section of a binary catalog) so assembling a prompt only joins strings.
+
+Usage:
+    import prompt_builder
+    system, included = prompt_builder.build_system(components, budget=4000)
+"""
+
+import re
+from string import Template
+
+from compact_schema import COMPACT_INSTRUCTIONS, label
+
+DEFAULT_INPUT_BUDGET = 4000
+DEFAULT_MAX_TOKENS = 1000
+
+# Shortest prefix Anthropic caches, in tokens (Haiku models need 2048)
+MIN_CACHEABLE_TOKENS = 1024
+
+# Detail levels of a component description, richest first
+DETAIL_LEVELS = ("full", "brief", "name")
+BRIEF_DESCRIPTION_LENGTH = 120
+
+# Bump whenever format_component changes so stored snippets are rebuilt
+SNIPPET_VERSION = 1
+
+_INSTRUCTIONS_TEMPLATE = Template("""You are an assistant that helps users find and use the right Grasshopper components.
+When given a task description, suggest the appropriate Grasshopper components to accomplish it.
+Only suggest components that exist in the Grasshopper ecosystem.
+
+Your task is to provide a JSON response that a C# program can use to automatically create and connect
+Grasshopper components on the canvas. Your response MUST include a valid JSON object with this structure:
+
+```json
+{
+  "explanation": "A brief explanation of the approach",
+  "components": [
+    {
+      "id": "unique_id_1",
+      "name": "ComponentName",
+      "category": "Category",
+      "subcategory": "Subcategory",
+$position      "parameters": [
+        {
+          "name": "ParameterName",
+          "value": "Value"
+        }
+      ]
+    }
+  ],
+  "connections": [
+    {
+      "fromComponent": "unique_id_1",
+      "fromOutput": "OutputName",
+      "toComponent": "unique_id_2",
+      "toInput": "InputName"
+    }
+  ]
+}
+```
+
+Follow these guidelines:
+$guidelines
+
+Be sure your output is a VALID JSON object. Do not include any text before or after the JSON. The entire response must be parseable as a single JSON object.
+""")
+
+_POSITION_SCHEMA = """      "position": {
+        "x": 0,
+        "y": 0
+      },
+"""
+
+# The model places the components itself
+SYSTEM_INSTRUCTIONS = _INSTRUCTIONS_TEMPLATE.substitute(position=_POSITION_SCHEMA, guidelines="""\
+1. Only suggest components that exist in the provided list
+2. Position components logically on the canvas (left to right, data flow)
+3. Make sure all connections are valid (outputs connect to appropriate inputs)
+4. For simple number parameters, use the "parameters" field
+5. Canvas positions should use relative coordinates, with the first component at (0,0) and subsequent components at reasonable distances (e.g., 100 units apart)""")
+
+# Components are placed locally by graph_layout, so no positions are asked for
+LAYOUT_SYSTEM_INSTRUCTIONS = _INSTRUCTIONS_TEMPLATE.substitute(position="", guidelines="""\
+1. Only suggest components that exist in the provided list
+2. Make sure all connections are valid (outputs connect to appropriate inputs)
+3. For simple number parameters, use the "parameters" field
+4. Do not include positions, the components are laid out on the canvas automatically""")
+
+COMPONENTS_HEADER = "Here are Grasshopper components that might be relevant to the user's request:\n\n"
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """
+    Rough local token count: one token per word or symbol, plus one for every
+    further six characters of long words. Close enough to budget a prompt.
+    """
+    return sum(1 + (len(piece) - 1) // 6 for piece in _TOKEN_RE.findall(text))
+
+
+# Fixed part of every request, counted once
+INSTRUCTION_TOKENS = estimate_tokens(SYSTEM_INSTRUCTIONS) + estimate_tokens(COMPONENTS_HEADER)
+LAYOUT_INSTRUCTION_TOKENS = estimate_tokens(LAYOUT_SYSTEM_INSTRUCTIONS) + estimate_tokens(COMPONENTS_HEADER)
+COMPACT_INSTRUCTION_TOKENS = estimate_tokens(COMPACT_INSTRUCTIONS) + estimate_tokens(COMPONENTS_HEADER)
+
+# Estimated cost of the "[n] " number in front of each candidate in compact mode
+LABEL_TOKENS = 3
+
+
+def _format_param(param, with_description):
+    if not isinstance(param, dict):
+        return str(param)
+    name = param.get('name', 'Unknown')
+    param_type = param.get('param_type') or param.get('type') or param.get('type_hint') or ''
+    text = f"{name} ({param_type})" if param_type else name
+    if with_description and param.get('description'):
+        text += f": {param.get('description')}"
+    return text
+
+
+def format_component(comp, level="full"):
+    """Describe one component at a detail level from DETAIL_LEVELS"""
+    comp_info = f"Component: {comp.get('name', 'Unknown')} (Category: {comp.get('category', 'Unknown')}"
+    if comp.get('subcategory'):
+        comp_info += f", Subcategory: {comp.get('subcategory')}"
+    comp_info += ")\n"
+    if level == "name":
+        return comp_info
+
+    description = comp.get('description')
+    if description:
+        if level == "brief" and len(description) > BRIEF_DESCRIPTION_LENGTH:
+            description = description[:BRIEF_DESCRIPTION_LENGTH].rstrip() + "..."
+        comp_info += f"Description: {description}\n"
+
+    with_description = level == "full"
+    inputs = [_format_param(inp, with_description) for inp in comp.get('inputs', [])]
+    if inputs:
+        comp_info += f"Inputs: {', '.join(inputs)}\n"
+    outputs = [_format_param(out, with_description) for out in comp.get('outputs', [])]
+    if outputs:
+        comp_info += f"Outputs: {', '.join(outputs)}\n"
+    return comp_info
+
+
+def render_snippets(comp):
+    """Return [(text, estimated tokens)] for a component at every level of DETAIL_LEVELS"""
+    snippets = []
+    for level in DETAIL_LEVELS:
+        text = format_component(comp, level)
+        snippets.append((text, estimate_tokens(text) + 1))
+    return snippets
+
+
+class SnippetTable:
+    """Rendered snippets of every component in a catalog, by position"""
+
+    def __init__(self, components):
+        self.snippets = [render_snippets(comp) for comp in components]
+
+    def get(self, doc_id):
+        return self.snippets[doc_id]
+
+
+def get_snippet_table(catalog):
+    """Return the snippet table of a ComponentCatalog, rendering it once per catalog version"""
+    return catalog.derived("snippets", lambda c: SnippetTable(c.components))
+
+
+def fit_components(components, budget, snippets=None):
+    """
+    Choose a detail level for each component (in rank order) so the estimated
+    total stays within budget tokens. snippets holds the render_snippets result
+    of each component when it was computed in advance. Returns a list of
+    (component, text) pairs; components that do not fit even by name are left out.
+    """
+    # variants[i][level] = (text, tokens)
+    variants = snippets if snippets is not None else [render_snippets(comp) for comp in components]
+    levels, count, total = _choose_levels(variants, budget)
+    return [(components[i], variants[i][levels[i]][0]) for i in range(count)]
+
+
+def _choose_levels(variants, budget):
+    """Return (detail level of each variant, how many are kept, estimated tokens of those kept)"""
+    levels = [0] * len(variants)
+    total = sum(options[0][1] for options in variants)
+    count = len(variants)
+
+    # Each pass shortens one more step, starting from the lowest-ranked component
+    for level in range(1, len(DETAIL_LEVELS)):
+        for position in range(count - 1, -1, -1):
+            if total <= budget:
+                break
+            total += variants[position][level][1] - variants[position][levels[position]][1]
+            levels[position] = level
+
+    # Still over budget with every name only, drop from the bottom
+    while total > budget and count > 0:
+        count -= 1
+        total -= variants[count][levels[count]][1]
+
+    return levels, count, total
+
+
+def instruction_block(positions=True, compact=False, cache_prefix=True):
+    """
+    Return the fixed instruction block for a reply format and its estimated
+    tokens. With cache_prefix it is marked for prompt caching if it is long
+    enough to be cached on its own.
+    """
+    if compact:
+        text, tokens = COMPACT_INSTRUCTIONS, COMPACT_INSTRUCTION_TOKENS
+    elif positions:
+        text, tokens = SYSTEM_INSTRUCTIONS, INSTRUCTION_TOKENS
+    else:
+        text, tokens = LAYOUT_SYSTEM_INSTRUCTIONS, LAYOUT_INSTRUCTION_TOKENS
+    block = {"type": "text", "text": text}
+    if cache_prefix and tokens >= MIN_CACHEABLE_TOKENS:
+        block["cache_control"] = {"type": "ephemeral"}
+    return block, tokens
+
+
+def build_system(components, budget=DEFAULT_INPUT_BUDGET, user_message="", cache_prefix=True, snippets=None,
+                 positions=True, compact=False):
+    """
+    Build the system blocks for a request.
+
+    Args:
+        components (list): Candidate components in rank order
+        budget (int): Input token budget for the whole request
+        user_message (str): The user turn, counted against the budget
+        cache_prefix (bool): Mark the first block that ends a cacheable prefix for prompt caching
+        snippets (list, optional): Precomputed render_snippets result for each component
+        positions (bool): Ask the model for canvas positions (False when they are laid out locally)
+        compact (bool): Number the candidates and ask for the compact_schema reply format
+
+    Returns:
+        tuple: (list of system content blocks, list of components that were included)
+    """
+    instructions, instruction_tokens = instruction_block(positions, compact, cache_prefix)
+
+    available = budget - instruction_tokens - estimate_tokens(user_message)
+    if compact:
+        available -= LABEL_TOKENS * len(components)
+    variants = snippets if snippets is not None else [render_snippets(comp) for comp in components]
+    levels, count, components_tokens = _choose_levels(variants, max(available, 0))
+    fitted = [(components[i], variants[i][levels[i]][0]) for i in range(count)]
+    if compact:
+        components_info = "\n".join(label(number) + text for number, (comp, text) in enumerate(fitted, 1))
+        components_tokens += LABEL_TOKENS * count
+    else:
+        components_info = "\n".join(text for comp, text in fitted)
+    candidates = {"type": "text", "text": COMPONENTS_HEADER + components_info}
+    if (cache_prefix and "cache_control" not in instructions
+            and instruction_tokens + components_tokens >= MIN_CACHEABLE_TOKENS):
+        candidates["cache_control"] = {"type": "ephemeral"}
+    return [instructions, candidates], [comp for comp, text in fitted]
@@ -0,0 +1,98 @@
+"""
+Grasshopper Component Finder - Prompt Cache Check
+
+Guards the prompt cache breakpoint. Anthropic ignores a cache_control marker
+that ends a prefix shorter than MIN_CACHEABLE_TOKENS. With the bundled catalog
+a single request is usually shorter than that, so requests for a set of
+prompts, in every reply format and at two budgets, must not be marked below
+the minimum; and a system prompt with enough candidates to pass it must be
+marked, so repair rounds and session turns that resend it read the cache.
+The check fails (exit status 1) when either does not hold.
+
+Usage:
+    python prompt_cache_check.py
+    python prompt_cache_check.py --components grasshopper_components.json
+
+Requirements:
+    - none (standard library only)
+"""
+
+import os
+import sys
+
+import grasshopper_component_finder as finder
+from prompt_builder import DEFAULT_INPUT_BUDGET, MIN_CACHEABLE_TOKENS, build_system, estimate_tokens
+
+DEFAULT_COMPONENTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grasshopper_components.json")
+
+PROMPTS = (
+    "create a grid of circles",
+    "loft curves",
+    "divide a curve into points",
+    "boolean union of breps",
+)
+
+# (layout, schema) of every reply format
+FORMATS = (("model", "full"), ("local", "full"), ("local", "compact"))
+
+BUDGETS = (DEFAULT_INPUT_BUDGET, 800)
+
+# Candidates given to build_system to make a prefix that can be cached
+LONG_CANDIDATE_LIST = 60
+
+
+def cached_prefix_tokens(system):
+    """Estimated tokens up to the last block marked for caching, or None when none is marked"""
+    marked = [position for position, block in enumerate(system) if "cache_control" in block]
+    if not marked:
+        return None
+    return sum(estimate_tokens(block["text"]) for block in system[:marked[-1] + 1])
+
+
+def check_prompt_cache(components_file=DEFAULT_COMPONENTS):
+    """Return the list of failures, empty when every breakpoint is on a cacheable prefix"""
+    components_data = finder.load_component_database(components_file)
+    if "error" in components_data:
+        return [components_data["error"]]
+
+    failures = []
+    for prompt in PROMPTS:
+        for layout, schema in FORMATS:
+            for budget in BUDGETS:
+                request, _ = finder.build_llm_request(prompt, components_data, input_budget=budget,
+                                                      layout=layout, schema=schema)
+                tokens = cached_prefix_tokens(request["system"])
+                if tokens is not None and tokens < MIN_CACHEABLE_TOKENS:
+                    failures.append(f"\"{prompt}\" ({layout}/{schema}, budget {budget}) marks a {tokens} token "
+                                    f"prefix, under the {MIN_CACHEABLE_TOKENS} token minimum")
+
+    candidates = components_data["catalog"].components[:LONG_CANDIDATE_LIST]
+    for layout, schema in FORMATS:
+        system, _ = build_system(candidates, positions=layout == "model", compact=schema == "compact")
+        tokens = cached_prefix_tokens(system)
+        total = sum(estimate_tokens(block["text"]) for block in system)
+        if tokens is None:
+            failures.append(f"{LONG_CANDIDATE_LIST} candidates ({layout}/{schema}) make a {total} token system "
+                            f"prompt without a cache breakpoint")
+        elif tokens < MIN_CACHEABLE_TOKENS:
+            failures.append(f"{LONG_CANDIDATE_LIST} candidates ({layout}/{schema}) mark a {tokens} token prefix, "
+                            f"under the {MIN_CACHEABLE_TOKENS} token minimum")
+    return failures
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Check that prompt cache breakpoints end a cacheable prefix')
+    parser.add_argument('--components', type=str, default=DEFAULT_COMPONENTS, help='Path to the component database JSON file')
+    args = parser.parse_args()
+
+    failures = check_prompt_cache(args.components)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"{len(PROMPTS) * len(FORMATS) * len(BUDGETS) + len(FORMATS)} requests mark only cacheable prefixes")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
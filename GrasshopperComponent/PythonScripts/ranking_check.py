@@ -0,0 +1,101 @@
+"""
+Grasshopper Component Finder - Ranking Check
+
+Guards the BM25 ranking against regressions: a set of simple prompts must keep
+their top hit, ranked both with the in-memory index and with the index, rank
+weights and names read from a compiled binary catalog. Every expected hit is
+the component a Grasshopper user would pick for the prompt, so a change to the
+scoring that reorders obvious matches fails here (exit status 1).
+
+Usage:
+    python ranking_check.py
+    python ranking_check.py --components grasshopper_components.json
+
+Requirements:
+    - none (standard library only)
+"""
+
+import os
+import sys
+import tempfile
+
+import binary_catalog
+import grasshopper_component_finder as finder
+from component_catalog import read_catalog_file
+
+DEFAULT_COMPONENTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grasshopper_components.json")
+
+# Prompt -> name of the component it must rank first
+EXPECTED_TOP_HITS = {
+    "divide a curve into points": "Divide Curve",
+    "extrude a surface": "Extrude",
+    "loft curves": "Loft",
+    "move geometry along a vector": "Move",
+    "boolean union of breps": "Solid Union",
+    "rotate geometry": "Rotate",
+    "create a grid of circles": "Circle",
+    "draw a line between two points": "Line",
+    "offset a curve": "Offset Curve",
+    "closest point on curve": "Curve Closest Point",
+}
+
+
+class _Catalog:
+    """Just enough of a ComponentCatalog for rank_components"""
+
+    def __init__(self, components, derived):
+        self.components = components
+        self._derived = dict(derived)
+
+    def derived(self, key, factory):
+        if key not in self._derived:
+            self._derived[key] = factory(self)
+        return self._derived[key]
+
+
+def top_hits(components, derived):
+    """Top hit name of every expected prompt, ranked with the given index and any stored tables"""
+    catalog = _Catalog(components, derived)
+    hits = {}
+    for prompt in EXPECTED_TOP_HITS:
+        doc_ids = finder.rank_components(components, prompt, max_components=1, catalog=catalog)
+        hits[prompt] = components[doc_ids[0]].get("name") if doc_ids else None
+    return hits
+
+
+def check_ranking(components_file=DEFAULT_COMPONENTS):
+    """Return the list of failures, empty when every prompt keeps its top hit"""
+    components = read_catalog_file(components_file)
+    rankings = {"memory": top_hits(components, {"bm25": finder.BM25Index(components)})}
+    # The mapped file stays open, which Windows does not let the cleanup delete
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+        binary_path = os.path.join(directory, "components.ghcat")
+        binary_catalog.compile_catalog(components_file, binary_path)
+        mapped = binary_catalog.open_catalog(binary_path)
+        rankings["mapped"] = top_hits(mapped.components, {"bm25": mapped.bm25_index(), "weights": mapped.weights,
+                                                          "component_names": mapped.names})
+
+    failures = []
+    for source, hits in rankings.items():
+        for prompt, expected in EXPECTED_TOP_HITS.items():
+            if hits[prompt] != expected:
+                failures.append(f"{source}: \"{prompt}\" ranks {hits[prompt]!r} first, expected {expected!r}")
+    return failures
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Check that simple prompts keep their top ranked component')
+    parser.add_argument('--components', type=str, default=DEFAULT_COMPONENTS, help='Path to the component database JSON file')
+    args = parser.parse_args()
+
+    failures = check_ranking(args.components)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"{len(EXPECTED_TOP_HITS)} prompts keep their top hit")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Grasshopper LLM Response Cache
+
+Disk-backed cache of LLM responses so that re-solving the same prompt does not
+send another request. Entries live in a SQLite database and are keyed by the
+normalised prompt, the GUIDs of the components that were offered, the model,
+the version of the system prompt and the input and output token limits. Old entries are evicted by TTL, and the least
+recently used ones are dropped when the entry count or total size goes over the
+configured limits.
+
+Usage:
+    import response_cache
+    cache = response_cache.get_cache()
+    key = response_cache.make_key(prompt, guids, model, prompt_version, input_budget, max_tokens)
+    entry = cache.get(key)
+    if entry is None:
+        cache.put(key, response_text, json_data)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 30 * 24 * 3600
+
+# Caches opened in this interpreter, keyed by absolute database path
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def default_cache_path():
+    """Return the default database location in the user's local cache folder"""
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "GrasshopperCopilot", "response_cache.sqlite3")
+
+
+def normalize_prompt(prompt):
+    """Lowercase the prompt and collapse whitespace so trivial edits still hit"""
+    return re.sub(r"\s+", " ", prompt.strip().lower())
+
+
+def make_key(prompt, component_guids, model, prompt_version, input_budget=None, max_tokens=None):
+    """Build the cache key for one request; a reply cut short by a small max_tokens is not reused for a larger one"""
+    material = json.dumps([normalize_prompt(prompt), list(component_guids), model, prompt_version,
+                           input_budget, max_tokens])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with TTL and LRU eviction"""
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " json_data TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    def get(self, key):
+        """Return {"response", "json_data"} for a fresh entry, or None"""
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, json_data, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl is not None and row[2] < now - self.ttl:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return {"response": row[0], "json_data": json.loads(row[1])}
+
+    def put(self, key, response, json_data):
+        """Store a response and evict entries that are over the limits"""
+        encoded = json.dumps(json_data)
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, json_data, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, response, encoded, len(response) + len(encoded), now, now))
+            self._evict(now)
+
+    def _evict(self, now):
+        connection = self._connection
+        if self.ttl is not None:
+            connection.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        count, size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return
+        # Walk from the least recently used entry until both limits are met
+        doomed = []
+        for key, entry_size in connection.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            size -= entry_size
+        connection.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def get_cache(path=None, **limits):
+    """Return the shared cache for a database path (default is default_cache_path())"""
+    path = os.path.abspath(path or default_cache_path())
+    cache = _caches.get(path)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(path)
+            if cache is None:
+                cache = ResponseCache(path, **limits)
+                _caches[path] = cache
+    return cache
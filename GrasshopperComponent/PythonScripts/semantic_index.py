@@ -0,0 +1,225 @@
+"""
+Grasshopper Semantic Component Index
+
+Offline semantic ranking of components. Each component is turned into a hashed
+bag of character n-grams and words, weighted by inverse document frequency and
+normalised, so that one query costs a single matrix-vector product followed by
+an argpartition top-k. No network access or model download is needed, and
+near-misses such as "circles" / "Circle CNR" or "z-axis" / "Unit Z" still share
+most of their n-grams.
+
+The matrix is saved next to the catalog (<catalog>.vectors.npy plus a small
+.vectors.json with the vectorizer settings) and memory-mapped on later loads.
+numpy is imported the first time the index is needed, not with the module.
+
+Usage:
+    python semantic_index.py --components "path/to/grasshopper_components.json"
+
+Requirements:
+    - numpy
+"""
+
+import json
+import math
+import os
+import zlib
+
+from component_catalog import get_catalog
+from component_index import tokenize
+
+FORMAT_VERSION = 1
+DEFAULT_DIMENSIONS = 1024
+DEFAULT_NGRAMS = (3, 4)
+# Whole words count for more than a single n-gram
+WORD_WEIGHT = 2.0
+
+# numpy, once imported by _import_numpy
+np = None
+_numpy_checked = False
+
+
+def _import_numpy():
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:  # The finder falls back to BM25 ranking without numpy
+            pass
+        _numpy_checked = True
+    return np is not None
+
+
+def is_available():
+    """Check whether the semantic ranker can be used in this interpreter"""
+    return _import_numpy()
+
+
+def component_text(component):
+    """Text that describes a component for semantic matching"""
+    parts = [component.get(field) or "" for field in ("name", "nickname", "description", "category", "subcategory")]
+    for param in component.get("inputs", []) + component.get("outputs", []):
+        if isinstance(param, dict):
+            parts.append(param.get("name") or "")
+        else:
+            parts.append(str(param))
+    return " ".join(parts)
+
+
+class HashedNgramVectorizer:
+    """Maps text to a fixed-size vector by hashing character n-grams and words"""
+
+    def __init__(self, dimensions=DEFAULT_DIMENSIONS, ngrams=DEFAULT_NGRAMS):
+        self.dimensions = dimensions
+        self.ngrams = tuple(ngrams)
+
+    def features(self, text):
+        """Return {bucket: signed count} for the n-grams and words of text"""
+        counts = {}
+        dimensions = self.dimensions
+        for token in tokenize(text):
+            grams = [("w:" + token, WORD_WEIGHT)]
+            padded = f" {token} "
+            for n in range(self.ngrams[0], self.ngrams[1] + 1):
+                for i in range(len(padded) - n + 1):
+                    grams.append((padded[i:i + n], 1.0))
+            for gram, weight in grams:
+                digest = zlib.crc32(gram.encode("utf-8"))
+                bucket = digest % dimensions
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                counts[bucket] = counts.get(bucket, 0.0) + sign * weight
+        return counts
+
+    def vector(self, text, idf=None):
+        """Return the normalised (optionally idf-weighted) vector of text"""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for bucket, value in self.features(text).items():
+            vector[bucket] = math.copysign(math.log1p(abs(value)), value)
+        if idf is not None:
+            vector *= idf
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class SemanticIndex:
+    """Normalised component vectors searched with one matrix-vector product"""
+
+    def __init__(self, matrix, idf, vectorizer):
+        self.matrix = matrix
+        self.idf = idf
+        self.vectorizer = vectorizer
+
+    @classmethod
+    def build(cls, components, dimensions=DEFAULT_DIMENSIONS, ngrams=DEFAULT_NGRAMS):
+        """Vectorize every component of a catalog"""
+        _import_numpy()
+        vectorizer = HashedNgramVectorizer(dimensions, ngrams)
+        matrix = np.zeros((len(components), dimensions), dtype=np.float32)
+        for row, component in enumerate(components):
+            for bucket, value in vectorizer.features(component_text(component)).items():
+                matrix[row, bucket] = math.copysign(math.log1p(abs(value)), value)
+
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        idf = np.log((1.0 + len(components)) / (1.0 + document_frequency)).astype(np.float32) + 1.0
+        matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        return cls(matrix, idf, vectorizer)
+
+    def search(self, query, k=15, weights=None):
+        """
+        Return up to k (score, doc_id) pairs with a positive score, best first.
+        weights optionally holds a factor per document applied to the scores.
+        """
+        if len(self.matrix) == 0:
+            return []
+        scores = self.matrix @ self.vectorizer.vector(query, self.idf)
+        if weights is not None:
+            scores = scores * np.asarray(weights, dtype=np.float64)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((top, -scores[top]))]
+        return [(float(scores[doc_id]), int(doc_id)) for doc_id in top if scores[doc_id] > 0]
+
+
+def vector_paths_for(file_path):
+    """Return the (matrix, metadata) paths stored next to a catalog file"""
+    root = os.path.splitext(file_path)[0]
+    return root + ".vectors.npy", root + ".vectors.json"
+
+
+def _source_signature(catalog):
+    signature = catalog.signature[0] or catalog.signature[1]
+    return [signature[0], signature[1], len(catalog.components)]
+
+
+def save_semantic_index(index, catalog):
+    """Write the matrix and vectorizer settings next to the catalog file"""
+    matrix_path, metadata_path = vector_paths_for(catalog.file_path)
+    np.save(matrix_path, index.matrix)
+    metadata = {
+        "format_version": FORMAT_VERSION,
+        "dimensions": index.vectorizer.dimensions,
+        "ngrams": list(index.vectorizer.ngrams),
+        "source": _source_signature(catalog),
+        "idf": [float(value) for value in index.idf],
+    }
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f)
+    return matrix_path
+
+
+def load_semantic_index(catalog):
+    """Load the saved matrix for a catalog, or return None if it is missing or stale"""
+    matrix_path, metadata_path = vector_paths_for(catalog.file_path)
+    if not _import_numpy() or not (os.path.exists(matrix_path) and os.path.exists(metadata_path)):
+        return None
+    try:
+        with open(metadata_path, 'r') as f:
+            metadata = json.load(f)
+        if metadata.get("format_version") != FORMAT_VERSION or metadata.get("source") != _source_signature(catalog):
+            return None
+        matrix = np.load(matrix_path, mmap_mode='r')
+        if matrix.shape != (len(catalog.components), metadata["dimensions"]):
+            return None
+        idf = np.asarray(metadata["idf"], dtype=np.float32)
+        return SemanticIndex(matrix, idf, HashedNgramVectorizer(metadata["dimensions"], metadata["ngrams"]))
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _load_or_build(catalog):
+    index = load_semantic_index(catalog)
+    if index is None:
+        index = SemanticIndex.build(catalog.components)
+        try:
+            save_semantic_index(index, catalog)
+        except OSError:
+            pass  # Read-only install, keep the in-memory index
+    return index
+
+
+def get_semantic_index(catalog):
+    """Return the semantic index of a ComponentCatalog, loading or building it once"""
+    return catalog.derived("semantic", _load_or_build)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Precompute the semantic component vectors for a catalog')
+    parser.add_argument('--components', type=str, required=True, help='Path to the component database JSON file')
+    args = parser.parse_args()
+
+    if not is_available():
+        print("Error: numpy is required to build the semantic index")
+        return
+    catalog = get_catalog(args.components)
+    index = SemanticIndex.build(catalog.components)
+    print(f"Semantic index written to {save_semantic_index(index, catalog)}")
+
+
+if __name__ == "__main__":
+    main()
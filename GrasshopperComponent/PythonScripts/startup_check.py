@@ -0,0 +1,129 @@
+"""
+Grasshopper Component Finder - Startup Check
+
+Guards the cost of importing the finder, which a host embedding the
+interpreter pays on its first solve. The module is imported in fresh
+interpreters with -X importtime, and the check fails (exit status 1) when the
+median cumulative import time is over budget or when one of the modules that
+must only be imported on first use (requests, numpy, argparse) is loaded by the
+import itself. The slowest imports of the median run are listed to show what
+to defer.
+
+Python writes -X importtime to stderr as "import time: self | cumulative | name"
+in microseconds, with the name indented by nesting depth.
+
+Usage:
+    python startup_check.py
+    python startup_check.py --budget 50 --runs 9 --module finder_server
+
+Requirements:
+    - none (standard library only)
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_MODULE = "grasshopper_component_finder"
+
+# Median import time allowed, in milliseconds. Importing requests alone takes
+# about as long, so deferring it again is what this budget catches.
+DEFAULT_BUDGET_MS = 75.0
+
+DEFAULT_RUNS = 5
+
+# Modules that must not be imported as a side effect of importing the finder
+DEFERRED_MODULES = ("requests", "numpy", "argparse")
+
+# Slowest imports listed in the report
+TOP_IMPORTS = 10
+
+
+def parse_importtime(stderr):
+    """Return (self ms, cumulative ms, name, depth) for every line of -X importtime output"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # The header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        entries.append((int(fields[0]) / 1000.0, int(fields[1]) / 1000.0, stripped, depth))
+    return entries
+
+
+def measure_import(module, directory=None):
+    """
+    Import module in a fresh interpreter and return {"ms", "imports", "loaded"}:
+    its cumulative import time, the modules it imported and which of the
+    DEFERRED_MODULES ended up loaded
+    """
+    code = (f"import sys, json, {module}; "
+            f"print(json.dumps([name for name in {list(DEFERRED_MODULES)!r} if name in sys.modules]))")
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=directory,
+                             capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{process.stderr.strip()}")
+    entries = parse_importtime(process.stderr)
+    # The module's own line follows the lines of everything it imported
+    position = next(i for i in range(len(entries) - 1, -1, -1) if entries[i][2] == module and entries[i][3] == 0)
+    start = position
+    while start > 0 and entries[start - 1][3] > 0:
+        start -= 1
+    return {"ms": entries[position][1], "imports": entries[start:position],
+            "loaded": json.loads(process.stdout.strip().splitlines()[-1])}
+
+
+def check_startup(module=DEFAULT_MODULE, budget_ms=DEFAULT_BUDGET_MS, runs=DEFAULT_RUNS, directory=None):
+    """Measure the import of module runs times and return the report, with "ok" and any "failures\""""
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    samples = sorted((measure_import(module, directory) for _ in range(max(1, runs))), key=lambda s: s["ms"])
+    median = samples[len(samples) // 2]
+    slowest = sorted(median["imports"], key=lambda entry: entry[0], reverse=True)[:TOP_IMPORTS]
+
+    failures = []
+    if median["ms"] > budget_ms:
+        failures.append(f"import takes {median['ms']:.1f} ms, over the {budget_ms:.1f} ms budget")
+    loaded = sorted({name for sample in samples for name in sample["loaded"]})
+    if loaded:
+        failures.append(f"imported at load time instead of on first use: {', '.join(loaded)}")
+    return {
+        "module": module,
+        "budget_ms": budget_ms,
+        "runs": [round(sample["ms"], 3) for sample in samples],
+        "median_ms": round(median["ms"], 3),
+        "slowest": [{"module": name, "self_ms": round(self_ms, 3), "cumulative_ms": round(cumulative_ms, 3)}
+                    for self_ms, cumulative_ms, name, depth in slowest],
+        "ok": not failures,
+        "failures": failures,
+    }
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Check the import time of the Grasshopper Component Finder')
+    parser.add_argument('--module', type=str, default=DEFAULT_MODULE, help='Module to import')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_MS, help='Median import time allowed, in milliseconds')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='Fresh interpreters to measure')
+    parser.add_argument('--json-only', action='store_true', help='Only print the JSON report')
+    args = parser.parse_args()
+
+    report = check_startup(args.module, args.budget, args.runs)
+    if args.json_only:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['module']}: {report['median_ms']:.1f} ms median of {len(report['runs'])} runs "
+              f"(budget {report['budget_ms']:.1f} ms)")
+        for entry in report["slowest"]:
+            print(f"  {entry['module']:<32}{entry['self_ms']:>9.3f} ms self{entry['cumulative_ms']:>10.3f} ms total")
+        for failure in report["failures"]:
+            print(f"FAIL: {failure}")
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Grasshopper LLM Transport - Check
+
+Drives llm_transport against fake_llm_server to guard connection pooling and
+the retry policy: consecutive requests share one keep-alive connection,
+429/5xx replies are retried with backoff and honour Retry-After, retries stop
+at max_retries and at the deadline, and other errors are not retried. Every
+check runs against its own server; the check fails (exit status 1) when any of
+them does.
+
+Usage:
+    python transport_check.py
+
+Requirements:
+    - requests
+"""
+
+import email.utils
+import sys
+import time
+
+import fake_llm_server
+from llm_transport import Transport, parse_retry_after
+
+PAYLOAD = {"model": "fake", "max_tokens": 16, "messages": [{"role": "user", "content": "ping"}]}
+
+
+def _post(failures, attempts=1, **options):
+    """
+    POST attempts times to a fresh server that first replies with failures.
+    Returns (server, seconds taken, exception raised or None).
+    """
+    server = fake_llm_server.start(responses=["pong"], failures=failures)
+    transport = Transport(base_url=server.url, **options)
+    started = time.monotonic()
+    error = None
+    try:
+        for _ in range(attempts):
+            transport.post(PAYLOAD, "test-key").json()
+    except Exception as e:
+        error = e
+    elapsed = time.monotonic() - started
+    transport.close()
+    server.shutdown()
+    server.server_close()
+    return server, elapsed, error
+
+
+def _status(error):
+    response = getattr(error, "response", None)
+    return response.status_code if response is not None else None
+
+
+def check_pooling():
+    server, elapsed, error = _post([], attempts=3)
+    failures = []
+    if error is not None:
+        failures.append(f"requests failed: {error}")
+    if server.connections != 1:
+        failures.append(f"3 requests used {server.connections} connections, expected 1")
+    return failures
+
+
+def check_retry_after():
+    # No jitter, so only Retry-After can account for the wait
+    server, elapsed, error = _post([(429, "0.2"), (429, "0.2")], backoff_base=0.0)
+    failures = []
+    if error is not None:
+        failures.append(f"request failed after two 429 replies: {error}")
+    if server.requests != 3:
+        failures.append(f"{server.requests} requests sent, expected 3")
+    if not 0.4 <= elapsed < 2.0:
+        failures.append(f"took {elapsed:.2f} s, expected the 0.4 s asked for by Retry-After")
+    if server.connections != 1:
+        failures.append(f"retries used {server.connections} connections, expected 1")
+    return failures
+
+
+def check_server_errors():
+    server, elapsed, error = _post([(503, None), (500, None)], backoff_base=0.05)
+    failures = []
+    if error is not None:
+        failures.append(f"request failed after 503 and 500 replies: {error}")
+    if server.requests != 3:
+        failures.append(f"{server.requests} requests sent, expected 3")
+    return failures
+
+
+def check_retries_exhausted():
+    server, elapsed, error = _post([(503, None)] * 3, max_retries=1, backoff_base=0.0)
+    failures = []
+    if _status(error) != 503:
+        failures.append(f"expected the last 503 to be raised, got {error!r}")
+    if server.requests != 2:
+        failures.append(f"{server.requests} requests sent with max_retries=1, expected 2")
+    return failures
+
+
+def check_not_retried():
+    server, elapsed, error = _post([(400, None)], backoff_base=0.0)
+    failures = []
+    if _status(error) != 400:
+        failures.append(f"expected the 400 to be raised, got {error!r}")
+    if server.requests != 1:
+        failures.append(f"a 400 was sent {server.requests} times, expected once")
+    return failures
+
+
+def check_deadline():
+    server = fake_llm_server.start(responses=["pong"], failures=[(429, "5")])
+    transport = Transport(base_url=server.url)
+    started = time.monotonic()
+    error = None
+    try:
+        transport.post(PAYLOAD, "test-key", deadline=started + 1.0)
+    except Exception as e:
+        error = e
+    elapsed = time.monotonic() - started
+    transport.close()
+    server.shutdown()
+    server.server_close()
+
+    failures = []
+    if _status(error) != 429:
+        failures.append(f"expected the 429 to be raised when Retry-After passes the deadline, got {error!r}")
+    if elapsed >= 1.0:
+        failures.append(f"waited {elapsed:.2f} s for a retry past the deadline")
+    return failures
+
+
+def check_retry_after_parsing():
+    failures = []
+    if parse_retry_after("2") != 2.0:
+        failures.append(f"Retry-After '2' parsed as {parse_retry_after('2')!r}")
+    delay = parse_retry_after(email.utils.formatdate(time.time() + 30, usegmt=True))
+    if delay is None or not 25 <= delay <= 31:
+        failures.append(f"Retry-After as an HTTP date 30 s ahead parsed as {delay!r}")
+    if parse_retry_after("soon") is not None:
+        failures.append("an unreadable Retry-After was not ignored")
+    return failures
+
+
+CHECKS = [
+    ("pooling", check_pooling),
+    ("retry-after", check_retry_after),
+    ("server errors", check_server_errors),
+    ("retries exhausted", check_retries_exhausted),
+    ("not retried", check_not_retried),
+    ("deadline", check_deadline),
+    ("retry-after parsing", check_retry_after_parsing),
+]
+
+
+def check_transport():
+    """Return the list of failures, empty when every check passes"""
+    return [f"{name}: {failure}" for name, check in CHECKS for failure in check()]
+
+
+def main():
+    failures = check_transport()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"{len(CHECKS)} transport checks pass")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())